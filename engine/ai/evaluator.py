@@ -1,33 +1,37 @@
-from engine.utils.position import is_empty, color_of, type_of
 from engine.board import Board
-from engine.ai.pst import pst_value
+from engine.ai.pst import PIECE_VALUE, PIECE_SQUARE_VALUE
 
-PIECE_VALUE = {
-    "K": 100000,  # tướng cực lớn
-    "R": 600,
-    "C": 450,
-    "N": 350,
-    "E": 250,
-    "A": 250,
-    "P": 100,
-}
+# Điểm chiếu hết (số nguyên): bên chiếu hết sau `ply` nước (tính từ gốc) được
+# MATE_SCORE - ply, nên chiếu hết càng sớm điểm càng cao. Mọi điểm có
+# |score| >= MATE_BOUND là điểm chiếu hết.
+MATE_SCORE = 10**9
+MAX_PLY = 128
+MATE_BOUND = MATE_SCORE - MAX_PLY
 
-def evaluate_board(board: Board, perspective_color: str) -> int:
-    score = 0
-    for i in range(Board.ROWS):
-        for j in range(Board.COLS):
-            piece = board.get(i,j)
-            if is_empty(piece):
-                continue
+def mate_in(ply: int) -> int:
+    """Điểm của bên chiếu hết được đối phương ở ply."""
+    return MATE_SCORE - ply
 
-            c = color_of(piece)
-            t = type_of(piece)
-            bonus = pst_value(t,c,i,j)
-            value = PIECE_VALUE.get(t, 0) + bonus
-            
-            if c == perspective_color:
-                score += value
-            else:
-                score -= value
+def mated_in(ply: int) -> int:
+    """Điểm của bên bị chiếu hết ở ply."""
+    return ply - MATE_SCORE
 
-    return score
\ No newline at end of file
+def evaluate_board(board: Board, perspective_color: str) -> int:
+    """
+    Điểm vật chất + vị trí theo góc nhìn perspective_color. Tổng PIECE_SQUARE_VALUE
+    của từng bên được Board cập nhật tăng dần (board.psq) nên hàm này là O(1).
+    """
+    psq = board.psq
+    if perspective_color == "r":
+        return psq[0] - psq[1]
+    return psq[1] - psq[0]
+
+def evaluate_board_full(board: Board, perspective_color: str) -> int:
+    """Tính lại từ đầu bằng cách duyệt quân (để kiểm tra bản tăng dần)."""
+    score = 0
+    squares = board.squares
+    for sq in board.pieces(perspective_color):
+        score += PIECE_SQUARE_VALUE[squares[sq]][sq]
+    for sq in board.pieces("b" if perspective_color == "r" else "r"):
+        score -= PIECE_SQUARE_VALUE[squares[sq]][sq]
+    return score
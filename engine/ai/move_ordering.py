@@ -1,27 +1,127 @@
-from typing import Tuple, List
-from engine.utils.position import is_empty, type_of
+from typing import Tuple, List, Optional
+from engine.utils.position import to_sq
+from engine.utils.piece_codes import TYPE_MASK, OFFBOARD
+from engine.move import MOVED_SHIFT, CAPTURED_SHIFT
 from engine.board import Board
 
-from engine.ai.evaluator import PIECE_VALUE
+from engine.ai.pst import TYPE_VALUE
+from engine.ai.see import see, see_ge
+
+# MVV_LVA[move >> MOVED_SHIFT] = điểm sắp xếp của nước nén, index = quân đi | quân bị ăn << 6
+MVV_LVA: List[int] = [0] * ((OFFBOARD + 1) << 6)
+for _moved in range(OFFBOARD + 1):
+    for _captured in range(1, OFFBOARD + 1):
+        MVV_LVA[_moved | (_captured << 6)] = (
+            1000000 + 100 * TYPE_VALUE[_captured & TYPE_MASK] - TYPE_VALUE[_moved & TYPE_MASK]
+        )
+
+# index bảng history / countermove của nước nén: ô đích | quân đi << 8 ([quân][ô đích] trải phẳng)
+HISTORY_SIZE = (OFFBOARD + 1) << 8
+HISTORY_MAX = 1 << 20
+
+# điểm sắp xếp các loại nước (tuple API): ăn quân theo MVV_LVA (luôn > KILLER_SCORE),
+# sau đó killer, countermove, rồi nước thường theo history (< HISTORY_MAX)
+KILLER_SCORE = 900000
+COUNTERMOVE_SCORE = 800000
+
+def history_index(move: int) -> int:
+    return (move >> 8) & 0x3FFF
+
+class OrderingState:
+    """
+    Thông tin sắp xếp nước sống suốt 1 lượt tìm kiếm (mọi độ sâu của iterative deepening):
+    - killers[ply]: 2 nước không ăn quân gần nhất gây cắt beta ở ply
+    - history[quân][ô đích]: cộng depth^2 mỗi lần nước không ăn quân gây cắt beta
+    - countermoves[quân][ô đích] của nước đối phương vừa đi: nước đáp trả đã gây cắt beta
+    """
+    __slots__ = ("killers", "history", "countermoves")
+
+    def __init__(self):
+        self.killers: List[List[int]] = []
+        self.history: List[int] = [0] * HISTORY_SIZE
+        self.countermoves: List[int] = [0] * HISTORY_SIZE
+
+    def killers_at(self, ply: int) -> List[int]:
+        killers = self.killers
+        while len(killers) <= ply:
+            killers.append([0, 0])
+        return killers[ply]
+
+    def countermove(self, prev_move: int) -> int:
+        return self.countermoves[history_index(prev_move)] if prev_move else 0
+
+    def update(self, ply: int, move: int, depth: int, prev_move: int = 0) -> None:
+        """Nước move gây cắt beta ở ply (prev_move: nước đối phương vừa đi)."""
+        if move >> CAPTURED_SHIFT:
+            return
+        killers = self.killers_at(ply)
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        if prev_move:
+            self.countermoves[history_index(prev_move)] = move
+        history = self.history
+        idx = history_index(move)
+        history[idx] += depth * depth
+        if history[idx] >= HISTORY_MAX:
+            self.age()
+
+    def age(self) -> None:
+        """Giảm một nửa history (tràn ngưỡng / bắt đầu lượt tìm mới) để thông tin cũ nhạt dần."""
+        self.history[:] = [h >> 1 for h in self.history]
+
+    def quiet_score(self, move: int, ply: int, prev_move: int = 0) -> int:
+        killers = self.killers_at(ply)
+        if move == killers[0]:
+            return KILLER_SCORE + 1
+        if move == killers[1]:
+            return KILLER_SCORE
+        if prev_move and move == self.countermoves[history_index(prev_move)]:
+            return COUNTERMOVE_SCORE
+        return self.history[history_index(move)]
 
 def opponent(color: str) -> str:
     return "r" if color == "b" else "b"
 
+def capture_score(board: Board, move: int) -> int:
+    """Điểm sắp xếp nước ăn quân nén: MVV-LVA nếu không lỗ (SEE >= 0), ngược lại điểm SEE (âm, xếp sau nước thường)."""
+    if see_ge(board, move, 0):
+        return MVV_LVA[move >> MOVED_SHIFT]
+    return see(board, move)
+
 def move_score(board: Board, move: Tuple[Tuple[int, int], Tuple[int, int]], turn_color: str) -> int:
     (sr, sc), (dr, dc) = move
 
-    capture = board.get(dr, dc)
-    score = 0
-    if not is_empty(capture):
-        # score += 10000 + PIECE_VALUE.get(type_of(capture), 0)
-        moved_piece = board.get(sr, sc)
-        victim_val = PIECE_VALUE.get(type_of(capture), 0)
-        attacker_val = PIECE_VALUE.get(type_of(moved_piece), 0)
-        score += 1000000 + 100 * victim_val - attacker_val
+    squares = board.squares
+    frm = to_sq(sr, sc)
+    to = to_sq(dr, dc)
+    captured = squares[to]
+    if not captured:
+        return 0
+    return capture_score(board, frm | (to << 8) | (squares[frm] << MOVED_SHIFT) | (captured << CAPTURED_SHIFT))
+
 
-    return score
 
+def order_moves(board: Board, moves: List[Tuple[Tuple[int, int], Tuple[int, int]]], turn_color: str, ordering: Optional[OrderingState] = None, ply: int = 0) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """
+    Sắp nước dạng tuple: ăn quân không lỗ theo MVV-LVA, rồi (nếu có ordering)
+    killer, countermove của nước vừa đi trên board, history, cuối cùng là nước
+    ăn quân lỗ (SEE < 0).
+    """
+    if ordering is None:
+        return sorted(moves, key = lambda mv : move_score(board, mv, turn_color), reverse=True)
+    squares = board.squares
+    prev_move = board.undo_stack[-1] if board.undo_stack else 0
 
+    def key(mv: Tuple[Tuple[int, int], Tuple[int, int]]) -> int:
+        frm = to_sq(*mv[0])
+        to = to_sq(*mv[1])
+        move = frm | (to << 8) | (squares[frm] << MOVED_SHIFT)
+        if squares[to]:
+            return capture_score(board, move | (squares[to] << CAPTURED_SHIFT))
+        return ordering.quiet_score(move, ply, prev_move)
+    return sorted(moves, key=key, reverse=True)
 
-def order_moves(board: Board, moves: List[Tuple[Tuple[int, int], Tuple[int, int]]], turn_color: str) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
-    return sorted(moves, key = lambda mv : move_score(board, mv, turn_color), reverse=True)
+def sort_packed_moves(moves: List[int]) -> None:
+    """Sắp xếp tại chỗ buffer nước nén (ăn quân trước, MVV-LVA), giữ thứ tự sinh nước khi bằng điểm."""
+    moves.sort(key=lambda mv: MVV_LVA[mv >> MOVED_SHIFT], reverse=True)
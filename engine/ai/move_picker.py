@@ -0,0 +1,85 @@
+# Sinh nước theo từng giai đoạn cho alpha-beta
+#
+# Thay vì sinh + sắp xếp cả danh sách nước hợp lệ ngay từ đầu, pick_moves là
+# generator trả lần lượt:
+#   1. hash move (nước tốt nhất đã biết của thế cờ, nếu có)
+#   2. nước ăn quân không lỗ (SEE >= 0), theo MVV-LVA
+#   3. killer move (nước không ăn quân từng gây cắt tỉa ở cùng ply), rồi
+#      countermove (nước từng đáp trả tốt nước đối phương vừa đi)
+#   4. nước ăn quân lỗ (SEE < 0); vẫn xếp
+#      trước nước thường vì ở lá vẫn được lợi quân
+#   5. nước không ăn quân, theo điểm history
+# Giai đoạn sau chỉ được sinh khi caller đòi tiếp (tức là các nước trước chưa
+# gây cắt beta), và tính hợp lệ (tự chiếu) chỉ được kiểm tra ngay trước khi
+# trả nước về cho caller.
+#
+# Khi đang bị chiếu chỉ sinh nước giải chiếu (generate_evasions), sắp theo
+# MVV-LVA, không chia giai đoạn.
+from typing import Iterator, List, Optional, Sequence
+
+from engine.board import Board
+from engine.move import MOVED_SHIFT, CAPTURED_SHIFT, NO_MOVE
+from engine.rules.check_info import CheckInfo
+from engine.rules.movegen import gen_pseudo_moves, generate_evasions, is_pseudo_legal, is_legal
+from engine.ai.move_ordering import MVV_LVA
+from engine.ai.see import see_ge
+
+def is_winning_capture(board: Board, move: int, color: str) -> bool:
+    """Nước ăn quân không lỗ vật chất sau chuỗi ăn qua lại (SEE >= 0, engine/ai/see.py)."""
+    return bool(move >> CAPTURED_SHIFT) and see_ge(board, move, 0)
+
+def pick_moves(board: Board, color: str, captures: List[int], quiets: List[int], hash_move: int = NO_MOVE, killers: Sequence[int] = (), countermove: int = NO_MOVE, history: Optional[List[int]] = None) -> Iterator[int]:
+    """
+    Generator trả các nước hợp lệ của color theo thứ tự giai đoạn ở đầu file.
+    captures / quiets là 2 buffer rỗng caller cấp (thường theo ply), dùng để
+    chứa nước của từng giai đoạn. killers / countermove / history lấy từ
+    move_ordering.OrderingState.
+
+    Bàn cờ phải ở đúng thế cờ ban đầu mỗi khi generator chạy tiếp (caller
+    unmake xong nước vừa nhận rồi mới lấy nước sau).
+    """
+    info = CheckInfo(board, color)
+    if info.in_check:
+        generate_evasions(board, color, captures, info)
+        captures.sort(key=lambda mv: MVV_LVA[mv >> MOVED_SHIFT], reverse=True)
+        if hash_move in captures:
+            yield hash_move
+        for move in captures:
+            if move != hash_move:
+                yield move
+        return
+
+    # 1. hash move
+    if hash_move and is_pseudo_legal(board, hash_move, color) and is_legal(board, hash_move, color, info):
+        yield hash_move
+
+    # 2. nước ăn quân có lợi
+    gen_pseudo_moves(board, color, captures, True, False)
+    captures.sort(key=lambda mv: MVV_LVA[mv >> MOVED_SHIFT], reverse=True)
+    losing: List[int] = []
+    for move in captures:
+        if not is_winning_capture(board, move, color):
+            losing.append(move)
+        elif move != hash_move and is_legal(board, move, color, info):
+            yield move
+
+    # 3. killer, countermove
+    tried: List[int] = []
+    for move in (*killers, countermove):
+        if (move and move != hash_move and not move >> CAPTURED_SHIFT and move not in tried
+                and is_pseudo_legal(board, move, color) and is_legal(board, move, color, info)):
+            tried.append(move)
+            yield move
+
+    # 4. nước ăn quân còn lại
+    for move in losing:
+        if move != hash_move and is_legal(board, move, color, info):
+            yield move
+
+    # 5. nước không ăn quân
+    gen_pseudo_moves(board, color, quiets, False, True)
+    if history is not None:
+        quiets.sort(key=lambda mv: history[(mv >> 8) & 0x3FFF], reverse=True)
+    for move in quiets:
+        if move != hash_move and move not in tried and is_legal(board, move, color, info):
+            yield move
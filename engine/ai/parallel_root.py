@@ -0,0 +1,138 @@
+# Chia nước gốc cho nhiều process (ProcessPoolExecutor) ở độ sâu cố định
+#
+# Nước gốc đầu tiên (hash move / MVV-LVA) được tìm tuần tự với cửa sổ đầy đủ
+# để có cận alpha. Các nước còn lại được gửi cho pool: mỗi worker đi nước đó
+# rồi tìm với cửa sổ rỗng quanh alpha hiện có lúc gửi (giống PVS ở gốc). Kết
+# quả được xét theo đúng thứ tự nước gốc; nước nào vượt alpha lúc gửi thì
+# process chính tìm lại với cửa sổ (alpha hiện tại, +inf) như search_root.
+# alpha mới được dùng ngay cho các nước gửi sau.
+# Nước chọn được chỉ giống hệt khi tìm tuần tự nếu điểm của từng nước không
+# phụ thuộc bảng chuyển vị / thứ tự tìm, vd. tắt hết cắt tỉa (null move, LMR,
+# futility, ...) và quiescence. Với SearchOptions mặc định, mỗi worker có bảng
+# chuyển vị và killer / history riêng nên điểm ở gốc, đôi khi cả nước chọn,
+# có thể khác tìm tuần tự.
+#
+# Pool được tạo 1 lần theo số worker và dùng lại giữa các lượt (shutdown_pools
+# được đăng ký với atexit); mỗi worker có bảng chuyển vị riêng sống qua các
+# lượt, mỗi lần parallel_search_root là 1 lượt tìm kiếm mới (new_search) của bảng.
+import atexit
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+from engine.board import Board
+from engine.rules.check_rules import is_in_check
+from engine.ai.evaluator import mated_in
+from engine.ai.search import SearchOptions, SearchState, INF, negamax, make_root_moves, opponent
+from engine.ai.transposition import TranspositionTable
+
+# bảng chuyển vị của mỗi worker (MB)
+WORKER_TT_MB = 8
+
+_POOLS: Dict[int, ProcessPoolExecutor] = {}
+# số lượt tìm kiếm đã gửi cho pool (process chính) / lượt mà bảng của worker đang ở
+_SEARCH_GENERATION = 0
+_WORKER_TT: Optional[TranspositionTable] = None
+_WORKER_GENERATION = 0
+
+def _init_worker(tt_mb: float) -> None:
+    global _WORKER_TT
+    _WORKER_TT = TranspositionTable(tt_mb)
+
+def _search_move(cells: List[List[str]], color: str, move: int, depth: int, alpha: int, options: Optional[SearchOptions], generation: int) -> Tuple[int, int]:
+    """Chạy trong worker: (điểm theo góc nhìn color của nước move với cửa sổ rỗng (alpha, alpha + 1), số node)."""
+    global _WORKER_GENERATION
+    if generation != _WORKER_GENERATION:
+        # lượt tìm kiếm mới: entry của các lượt trước được ưu tiên thay thế
+        _WORKER_GENERATION = generation
+        _WORKER_TT.new_search()
+    board = Board(cells, color)
+    state = SearchState(None, _WORKER_TT, options)
+    board.make_move(move)
+    score = -negamax(board, opponent(color), depth - 1, -alpha - 1, -alpha, 1, state)
+    return score, state.nodes
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    pool = _POOLS.get(workers)
+    if pool is None:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"),
+            initializer=_init_worker, initargs=(WORKER_TT_MB,),
+        )
+        _POOLS[workers] = pool
+    return pool
+
+def shutdown_pools() -> None:
+    for pool in _POOLS.values():
+        pool.shutdown(cancel_futures=True)
+    _POOLS.clear()
+
+atexit.register(shutdown_pools)
+
+def parallel_search_root(board: Board, color: str, depth: int, workers: int = 2, tt: Optional[TranspositionTable] = None, options: Optional[SearchOptions] = None, deadline: Optional[float] = None) -> Tuple[int, Optional[int]]:
+    """
+    Như search_root với cửa sổ đầy đủ, nhưng các nước gốc sau nước đầu được
+    tìm song song trên workers process. Trả về (điểm, nước nén tốt nhất).
+    deadline chỉ áp dụng cho phần tìm trong process chính.
+    """
+    if tt is None:
+        tt = TranspositionTable()
+    state = SearchState(deadline, tt, options)
+    root_moves = make_root_moves(board, color, tt)
+    if not root_moves:
+        return (mated_in(0) if is_in_check(board, color) else 0), None
+
+    them = opponent(color)
+    best_move = root_moves[0].move
+    board.make_move(best_move)
+    try:
+        best = -negamax(board, them, depth - 1, -INF, INF, 1, state)
+    finally:
+        board.unmake_move()
+    alpha = best
+
+    rest = [rm.move for rm in root_moves[1:]]
+    if not rest:
+        return best, best_move
+    global _SEARCH_GENERATION
+    _SEARCH_GENERATION += 1
+    generation = _SEARCH_GENERATION
+    pool = get_pool(workers)
+    cells = board.board
+    # future -> (index nước, alpha lúc gửi)
+    pending: Dict[object, Tuple[int, int]] = {}
+    results: Dict[int, Tuple[int, int, int]] = {}
+    next_submit = 0
+    next_resolve = 0
+    try:
+        while next_resolve < len(rest):
+            while next_submit < len(rest) and len(pending) < workers:
+                future = pool.submit(_search_move, cells, color, rest[next_submit], depth, alpha, options, generation)
+                pending[future] = (next_submit, alpha)
+                next_submit += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx, sent_alpha = pending.pop(future)
+                score, nodes = future.result()
+                results[idx] = (score, sent_alpha, nodes)
+
+            # xét theo thứ tự nước gốc (hoà điểm thì nước xếp trước thắng, như tìm tuần tự)
+            while next_resolve in results:
+                score, sent_alpha, nodes = results.pop(next_resolve)
+                state.nodes += nodes
+                if score > sent_alpha:
+                    move = rest[next_resolve]
+                    board.make_move(move)
+                    try:
+                        score = -negamax(board, them, depth - 1, -INF, -alpha, 1, state)
+                    finally:
+                        board.unmake_move()
+                    if score > best:
+                        best = score
+                        best_move = move
+                        alpha = score
+                next_resolve += 1
+    finally:
+        for future in pending:
+            future.cancel()
+    return best, best_move
@@ -0,0 +1,98 @@
+# Pondering: suy nghĩ trong giờ của đối thủ
+#
+# Sau khi AI đi, nước thứ 2 trong PV (nước AI đoán đối thủ sẽ đáp lại) được đi
+# trên 1 bản sao bàn cờ, rồi iterative deepening cho AI chạy tiếp trên thế cờ
+# đó trong 1 thread nền, tối đa PONDER_TIME_SEC giây / PONDER_MAX_DEPTH (web:
+# setting XIANGQI_PONDER_TIME_SEC).
+# Khi đối thủ đi:
+#   - đúng nước đoán (ponderhit): lần tìm đang chạy dùng hạn của 1 nước bình
+#     thường, tính cả thời gian đã ponder (TimeManager.ponderhit); đã quá hạn
+#     mềm thì dừng ngay, đã xong thì dùng luôn kết quả
+#   - nước khác: dừng thread; bảng chuyển vị của nó vẫn dùng được cho lần tìm
+#     mới (khoá zobrist chỉ phụ thuộc thế cờ, không phụ thuộc đường đi tới)
+# Thread nền tranh GIL với web thread nhưng chỉ chạy khi server đang đợi người
+# chơi và luôn có hạn; web server mặc định không ponder (setting XIANGQI_PONDER).
+import threading
+from typing import Optional
+
+from engine.board import Board
+from engine.move import move_to_tuple
+from engine.ai.search import SearchOptions, opponent
+from engine.ai.time_manager import TimeManager
+from engine.ai.time_search import SearchResult, iterative_deepening
+from engine.ai.transposition import TranspositionTable
+
+# ngân sách mặc định của 1 lần ponder (trước ponderhit)
+PONDER_TIME_SEC = 10.0
+# không sâu hơn lần tìm thật (max_depth mặc định của Game.ai_move_time): độ sâu
+# đang chạy lúc ponderhit sẽ phải tìm tiếp tới hạn cứng
+PONDER_MAX_DEPTH = 6
+
+class PonderSearch:
+    """1 lần ponder trên thế cờ sau nước đoán move, chạy trong thread riêng."""
+    __slots__ = ("board", "color", "move", "key", "max_depth", "tt", "options", "time_manager", "result", "thread")
+
+    def __init__(self, board: Board, ai_color: str, move: int, tt: Optional[TranspositionTable] = None,
+                 time_limit_sec: float = PONDER_TIME_SEC, max_depth: int = PONDER_MAX_DEPTH, options: Optional[SearchOptions] = None):
+        """board: thế cờ sau nước của AI (đối thủ tới lượt), không bị sửa; move: nước đoán (nén)."""
+        self.board = Board(board.board, opponent(ai_color))
+        self.board.make_move(move)
+        self.color = ai_color
+        self.move = move
+        self.key = self.board.zobrist
+        self.max_depth = max_depth
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.options = options
+        self.time_manager = TimeManager(time_limit_sec, pondering=True)
+        self.result: Optional[SearchResult] = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        self.result = iterative_deepening(self.board, self.color, self.max_depth, tt=self.tt, options=self.options, time_manager=self.time_manager)
+
+    def start(self) -> "PonderSearch":
+        self.thread.start()
+        return self
+
+    def is_predicted(self, src, dst) -> bool:
+        """(src, dst) (ô dạng (hàng, cột)) có phải nước đã đoán."""
+        return move_to_tuple(self.move) == (tuple(src), tuple(dst))
+
+    def matches(self, board: Board, color: str) -> bool:
+        """board / bên đi color có đúng là thế cờ đang ponder."""
+        return color == self.color and board.zobrist == self.key
+
+    def ponderhit(self, time_manager: TimeManager) -> None:
+        """Đối thủ đã đi đúng nước đoán: tìm tiếp với thời gian của time_manager."""
+        if self.time_manager.pondering:
+            self.time_manager.ponderhit(time_manager)
+
+    def stop(self) -> TranspositionTable:
+        """Dừng (nếu còn chạy) và trả về bảng chuyển vị để lần tìm sau dùng lại."""
+        self.time_manager.stop()
+        self.thread.join()
+        return self.tt
+
+    def finish(self, board: Board, color: str, time_manager: TimeManager) -> Optional[SearchResult]:
+        """
+        Kết quả cho thế cờ board (color tới lượt): đúng thế cờ đã ponder thì
+        ponderhit (nếu chưa) rồi đợi lần tìm xong; sai thì dừng ponder, None.
+        """
+        if not self.matches(board, color):
+            self.stop()
+            return None
+        self.ponderhit(time_manager)
+        self.thread.join()
+        return self.result
+
+def start_ponder(board: Board, ai_color: str, result: SearchResult, tt: Optional[TranspositionTable] = None, **kwargs) -> Optional[PonderSearch]:
+    """
+    Bắt đầu ponder sau nước AI vừa đi (board: thế cờ sau nước đó, result: kết
+    quả tìm kiếm của nước đó). PV không có nước đáp trả thì không ponder (None).
+    Độ sâu ponder không vượt quá max_depth của lần tìm đó.
+    """
+    if len(result.pv) < 2:
+        return None
+    if result.max_depth:
+        kwargs["max_depth"] = min(kwargs.get("max_depth", PONDER_MAX_DEPTH), result.max_depth)
+    return PonderSearch(board, ai_color, result.pv[1], tt, **kwargs).start()
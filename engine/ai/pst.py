@@ -1,5 +1,22 @@
 # engine/ai/pst.py
 from typing import List
+from engine.utils.position import BOARD_SIZE, ALL_SQUARES, SQ_TO_RC
+from engine.utils.piece_codes import OFFBOARD, TYPE_CHARS, TYPE_MASK, COLOR_BITS
+
+PIECE_VALUE = {
+    "K": 100000,  # tướng cực lớn
+    "R": 600,
+    "C": 450,
+    "N": 350,
+    "E": 250,
+    "A": 250,
+    "P": 100,
+}
+
+# giá trị quân theo loại mã số (index = code & TYPE_MASK)
+TYPE_VALUE: List[int] = [0] * (TYPE_MASK + 1)
+for _t, _ch in TYPE_CHARS.items():
+    TYPE_VALUE[_t] = PIECE_VALUE[_ch]
 
 # Bảng điểm theo vị trí cho RED (row 9 là nhà đỏ, row 0 là nhà đen)
 # Mỗi bảng là 10x9 (ROWS x COLS)
@@ -100,3 +117,12 @@ def pst_value(piece_type: str, color: str, row: int, col: int) -> int:
         return table[row][col]
     else:
         return table[9-row][col]
+
+# PIECE_SQUARE_VALUE[code][sq] = PIECE_VALUE + PST, tính sẵn cho mọi mã quân / ô mailbox.
+# Board cộng dồn bảng này mỗi nước đi (Board.psq) nên evaluate_board là O(1).
+PIECE_SQUARE_VALUE: List[List[int]] = [[0] * BOARD_SIZE for _ in range(OFFBOARD + 1)]
+for _color, _bit in COLOR_BITS.items():
+    for _t, _ch in TYPE_CHARS.items():
+        for _sq in ALL_SQUARES:
+            _r, _c = SQ_TO_RC[_sq]
+            PIECE_SQUARE_VALUE[_bit | _t][_sq] = PIECE_VALUE[_ch] + pst_value(_ch, _color, _r, _c)
@@ -1,83 +1,112 @@
-from typing import List, Tuple
-import time
-from engine.ai.evaluator import evaluate_board
-from engine.rules.game_rules import generate_legal_moves
-from engine.utils.position import is_empty
+# Quiescence search: ở lá của negamax chỉ tìm tiếp nước ăn quân cho tới khi thế
+# cờ "yên" rồi mới đánh giá, tránh lỗi chân trời (dừng ngay giữa 1 cuộc đổi quân).
+#
+# Mỗi node:
+#   - đang bị chiếu: không được đứng yên (stand pat), phải thử mọi nước giải
+#     chiếu; không có nước nào là bị chiếu hết
+#   - không bị chiếu: stand pat = evaluate_board (O(1), Board.psq cập nhật tăng
+#     dần), >= beta thì cắt ngay; sau đó thử nước ăn quân theo MVV-LVA, bỏ qua
+#       * delta pruning: ăn được quân đó (+ DELTA_MARGIN) vẫn không tới alpha
+#       * nước ăn quân lỗ (SEE < 0, engine/ai/see.py)
+#     tính hợp lệ (tự chiếu) chỉ được kiểm tra với nước không bị bỏ qua.
+from typing import List, Tuple, Optional
+from engine.ai.evaluator import evaluate_board, mated_in
+from engine.ai.move_ordering import MVV_LVA, TYPE_VALUE
+from engine.ai.move_picker import is_winning_capture
+from engine.rules.check_info import CheckInfo
+from engine.rules.check_rules import is_in_check
+from engine.rules.movegen import gen_pseudo_moves, generate_captures, generate_evasions, is_legal
+from engine.move import move_to_tuple, MOVED_SHIFT, CAPTURED_SHIFT
+from engine.utils.piece_codes import TYPE_MASK
 from engine.board import Board
-from engine.excaptions import SearchTimeout
+
+# số ply tối đa của quiescence dưới lá
+QS_MAX_DEPTH = 6
+# biên an toàn của delta pruning (điểm, ~2 con tốt: bù cho phần PST thay đổi)
+DELTA_MARGIN = 200
 
 def generate_capture_moves(board: Board, color: str) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
     """
     Lấy tất cả nước hợp lệ mà có ăn quân (dst đang có quân).
     """
-    
-    moves = generate_legal_moves(board, color)
-    capture:  List[Tuple[Tuple[int, int], Tuple[int, int]]] = []
-
-    for src, dst in moves:
-        if not is_empty(board.get(*dst)):
-            capture.append((src, dst))
-    
-    return capture
+    return [move_to_tuple(m) for m in generate_captures(board, color)]
 
-def quiescence(board, turn_color: str, ai_color: str, alpha: int, beta: int, maximizing: bool, deadline: float | None = None, q_depth=4) -> int:
+def quiescence(board: Board, color: str, alpha: int, beta: int, q_depth: int = QS_MAX_DEPTH, ply: int = 0, state=None) -> int:
     """
-    Quiescence search:
-    - Stand pat = evaluate hiện tại
-    - Nếu còn capture moves: thử capture và recurse
+    Quiescence search (negamax, điểm theo góc nhìn bên đi color), xem đầu file.
+    state: search.SearchState (đồng hồ, buffer theo ply, stats); None khi gọi lẻ.
     """
-    if deadline is not None and time.perf_counter() >= deadline:
-                raise SearchTimeout()
-    stand_pat = evaluate_board(board, ai_color)
+    stats = state.stats if state is not None else None
+    if stats is not None:
+        if state.nodes >= state.next_check:
+            state.check_time()
+        state.nodes += 1
+        stats["qnodes"] += 1
+    moves: List[int] = state.moves_at(ply) if state is not None else []
+    them = _opp(color)
+
+    if is_in_check(board, color):
+        if q_depth <= 0:
+            return evaluate_board(board, color)
+        generate_evasions(board, color, moves)
+        if not moves:
+            return mated_in(ply)
+        moves.sort(key=lambda mv: MVV_LVA[mv >> MOVED_SHIFT], reverse=True)
+        best = mated_in(ply)
+        for move in moves:
+            board.make_move(move)
+            try:
+                score = -quiescence(board, them, -beta, -alpha, q_depth - 1, ply + 1, state)
+            finally:
+                board.unmake_move()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
 
-    if q_depth == 0:
+    stand_pat = evaluate_board(board, color)
+    if stand_pat >= beta or q_depth <= 0:
         return stand_pat
+    if stand_pat > alpha:
+        alpha = stand_pat
 
-    if maximizing:
-        alpha = max(alpha, stand_pat)
-        if alpha >= beta:
-            return alpha
-    else:
-        beta = min(beta, stand_pat)
-        if alpha >= beta:
-            return beta
+    gen_pseudo_moves(board, color, moves, True, False)
+    moves.sort(key=lambda mv: MVV_LVA[mv >> MOVED_SHIFT], reverse=True)
 
-    capture_moves = generate_capture_moves(board, turn_color)
+    best = stand_pat
+    info: Optional[CheckInfo] = None
+    for move in moves:
+        # delta pruning: kể cả ăn không mất gì cũng không tới được alpha
+        if stand_pat + TYPE_VALUE[(move >> CAPTURED_SHIFT) & TYPE_MASK] + DELTA_MARGIN <= alpha:
+            if stats is not None:
+                stats["q_delta_pruned"] += 1
+            continue
+        # nước ăn quân lỗ sau chuỗi ăn qua lại (SEE < 0)
+        if not is_winning_capture(board, move, color):
+            if stats is not None:
+                stats["q_see_pruned"] += 1
+            continue
+        if info is None:
+            info = CheckInfo(board, color)
+        if not is_legal(board, move, color, info):
+            continue
 
-    if maximizing:
-        best = alpha
-        for src, dst in capture_moves:
-            if deadline is not None and time.perf_counter() >= deadline:
-                raise SearchTimeout()
-            undo = board.apply_move(src, dst)
-            try:
-                score = quiescence(board, _opp(turn_color), ai_color, alpha, beta, not maximizing, deadline, q_depth - 1)
-            finally:
-                board.undo_move(undo)
+        board.make_move(move)
+        try:
+            score = -quiescence(board, them, -beta, -alpha, q_depth - 1, ply + 1, state)
+        finally:
+            board.unmake_move()
 
-            best = max(best, score)
-            alpha = max(alpha, score)
-            if alpha >= beta:
-                break
-        return best
-    else:
-        best = beta
-        for src, dst in capture_moves:
-            if deadline is not None and time.perf_counter() >= deadline:
-                raise SearchTimeout()
-            undo = board.apply_move(src, dst)
-            try:
-                score = quiescence(board, _opp(turn_color), ai_color, alpha, beta, not maximizing, deadline, q_depth - 1)
-            finally:
-                board.undo_move(undo)
-
-            best = min(best, score)
-            beta = min(beta, score)
-            if alpha >= beta:
-                break
-        return best
+        if score > best:
+            best = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+    return best
 
 def _opp(color: str) -> str:
     return "b" if color == "r" else "r"
-
-
@@ -1,100 +1,399 @@
-from typing import Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List
 import time
 from engine.board import Board
-from engine.rules.game_rules import generate_legal_moves
+from engine.move import move_to_tuple, NO_MOVE, CAPTURED_SHIFT
+from engine.utils.piece_codes import TYPE_MASK, ROOK, KNIGHT, CANNON
+from engine.rules.movegen import gen_legal_moves
 from engine.rules.check_rules import is_in_check
-from engine.ai.evaluator import evaluate_board
-from engine.ai.move_ordering import order_moves
+from engine.ai.evaluator import evaluate_board, MATE_SCORE, MATE_BOUND, mated_in, mate_in
+from engine.ai.move_ordering import OrderingState, sort_packed_moves
+from engine.ai.move_picker import pick_moves
+from engine.ai.transposition import TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, score_to_tt, score_from_tt
 from engine.ai.quiescence import quiescence
+from engine.ai.time_manager import CHECK_EVERY_NODES
 from engine.excaptions import SearchTimeout
 
-MATE_SCORE = 10**9
+# cận của cửa sổ alpha-beta, lớn hơn mọi điểm (kể cả điểm chiếu hết)
+INF = MATE_SCORE + 1
+# nửa độ rộng cửa sổ aspiration ban đầu (điểm, ~1/2 con tốt)
+ASPIRATION_WINDOW = 50
+
+# null move: giảm thêm NULL_MOVE_R ply (+1 khi còn sâu), chỉ dùng khi depth >= NULL_MOVE_MIN_DEPTH
+NULL_MOVE_R = 2
+NULL_MOVE_MIN_DEPTH = 3
+# LMR: nước thường thứ LMR_MIN_MOVES trở đi ở depth >= LMR_MIN_DEPTH được tìm nông hơn 1 ply
+# (2 ply nếu đủ muộn và đủ sâu), vượt alpha thì tìm lại đủ độ sâu
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 3
+# cắt tỉa gần lá (depth 1..FRONTIER_MAX_DEPTH), biên theo depth (index = depth), thang PIECE_VALUE:
+# - reverse futility: eval - biên >= beta -> trả eval luôn
+# - razoring: eval + biên <= alpha -> quiescence xác nhận <= alpha thì trả luôn
+# - futility: eval + biên <= alpha -> bỏ nước thường (không chiếu) sau nước đầu
+FRONTIER_MAX_DEPTH = 3
+REVERSE_FUTILITY_MARGIN = (0, 150, 300, 450)
+RAZOR_MARGIN = (0, 300, 450, 600)
+FUTILITY_MARGIN = (0, 200, 350, 500)
 
 def opponent(color: str) -> str:
     return "r" if color == "b" else "b"
 
-# maximingzing: True là ai -> false là người
-def minimax(board: Board, ai_color: str, turn_color: str, maximizing: bool, depth: int, alpha: int, beta: int, deadline: float | None = None) -> int:
-    if deadline is not None and time.perf_counter() >= deadline:
-        raise SearchTimeout()
-
-    # Quiescence Search
-    if depth == 0:
-        # return quiescence(board, turn_color, ai_color, alpha, beta, maximizing, deadline)
-        return evaluate_board(board, ai_color)
-    
-    moves = generate_legal_moves(board, turn_color)
-    if not moves:
-        if is_in_check(board, turn_color):
-            if turn_color == ai_color:
-                return float('-inf')
-            else:
-                return float('inf')
-        else:
-            return 0
-    moves = order_moves(board, moves, turn_color)
-    if maximizing:
-        max_eval = float('-inf')
-        for src, dst in moves:
-            if deadline is not None and time.perf_counter() >= deadline:
-                raise SearchTimeout()
-            undo = board.apply_move(src, dst)
-            try:
-                eval = minimax(board, ai_color, opponent(turn_color), False, depth-1, alpha, beta, deadline)
-            finally:  
-                board.undo_move(undo)
-
-            max_eval = max(max_eval, eval)
-            alpha = max(alpha, eval)
-
-            if beta <= alpha:
-                break
-        return max_eval
-    else:
-        min_eval = float('inf')
-        for src, dst in moves:
-            if deadline is not None and time.perf_counter() >= deadline:
-                raise SearchTimeout()
-            
-            undo = board.apply_move(src, dst)
-            try:
-                eval = minimax(board, ai_color, opponent(turn_color), True, depth-1, alpha, beta, deadline)
-            finally:
-                board.undo_move(undo)
-
-            min_eval = min(min_eval, eval)
-            beta = min(beta, eval)
+class SearchOptions:
+    """Bật / tắt từng kỹ thuật cắt tỉa (để đo số node tiết kiệm và độ mạnh mất đi)."""
+    __slots__ = ("null_move", "lmr", "quiescence", "futility", "reverse_futility", "razoring")
 
-            if alpha >= beta:
-                break
-        return min_eval
+    def __init__(self, null_move: bool = True, lmr: bool = True, quiescence: bool = True, futility: bool = True, reverse_futility: bool = True, razoring: bool = True):
+        self.null_move = null_move
+        self.lmr = lmr
+        # tắt: lá trả thẳng evaluate_board thay vì tìm tiếp nước ăn quân
+        self.quiescence = quiescence
+        self.futility = futility
+        self.reverse_futility = reverse_futility
+        self.razoring = razoring
 
+def has_null_move_material(board: Board, color: str) -> bool:
+    """
+    Null move chỉ an toàn khi bên đi còn quân tấn công (xe / mã / pháo): tàn cuộc
+    chỉ còn tốt, sĩ, tượng dễ rơi vào thế bắt buộc phải đi (zugzwang) trong cờ tướng.
+    """
+    squares = board.squares
+    for sq in board.pieces(color):
+        if squares[sq] & TYPE_MASK in (ROOK, KNIGHT, CANNON):
+            return True
+    return False
 
-# depth là độ sâu tìm kiếm
-def find_best_move(board: Board, ai_color: str, depth: int, deadline: float | None = None) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+class SearchState:
     """
-    Trả về nước đi tốt nhất cho ai_color.
-    depth: độ sâu tìm kiếm..
+    Trạng thái sống suốt 1 lần tìm kiếm: deadline hoặc time_manager (hạn cứng,
+    đồng hồ chỉ được xem mỗi check_every node, xem check_time), số node đã duyệt,
+    buffer nước đi theo ply (dùng lại giữa các node, không tạo list mới)
+    thông tin sắp xếp nước (killer / history / countermove, move_ordering.OrderingState)
+    và bảng chuyển vị (tt), cả 2 dùng chung giữa các độ sâu.
+    pv[ply] là biến chính tính từ ply; root_best là (điểm, nước) tốt nhất đã
+    chứng minh được của lần tìm ở gốc đang chạy (dùng khi bị ngắt giữa chừng).
+    stats đếm số lần từng kỹ thuật cắt tỉa được dùng.
     """
+    __slots__ = ("deadline", "time_manager", "nodes", "check_every", "next_check", "buffers", "quiet_buffers", "ordering", "tt", "pv", "root_best", "options", "stats")
 
-    moves = generate_legal_moves(board, ai_color)
-    if not moves:
-        return None
-    moves = order_moves(board, moves, ai_color)
-    best_move: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
-    best_score = float('-inf')
+    def __init__(self, deadline: float | None = None, tt: Optional[TranspositionTable] = None, options: Optional[SearchOptions] = None, check_every: int = CHECK_EVERY_NODES):
+        self.deadline = deadline
+        # time_manager.TimeManager, thay cho deadline (hạn có thể đổi giữa chừng khi ponderhit / stop)
+        self.time_manager = None
+        self.nodes = 0
+        self.check_every = check_every
+        # số node mà tới đó thì xem đồng hồ lần tiếp theo
+        self.next_check = 0
+        self.options = options if options is not None else SearchOptions()
+        self.stats: Dict[str, int] = {
+            "null_move_tries": 0, "null_move_cutoffs": 0, "lmr_reductions": 0, "lmr_researches": 0,
+            "qnodes": 0, "q_delta_pruned": 0, "q_see_pruned": 0,
+            "reverse_futility_cutoffs": 0, "razoring_cutoffs": 0, "futility_pruned": 0,
+        }
+        self.tt = tt
+        self.buffers: List[List[int]] = []
+        self.quiet_buffers: List[List[int]] = []
+        self.ordering = OrderingState()
+        self.pv: List[List[int]] = []
+        self.root_best: Optional[Tuple[int, int]] = None
 
-    for src, dst in moves:
-        if deadline is not None and time.perf_counter() >= deadline:
+    def check_time(self) -> None:
+        """Xem đồng hồ (node gọi khi nodes >= next_check): quá hạn thì ngắt tìm kiếm."""
+        self.next_check = self.nodes + self.check_every
+        tm = self.time_manager
+        if tm is not None:
+            if tm.out_of_time():
+                raise SearchTimeout()
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
             raise SearchTimeout()
-        undo = board.apply_move(src, dst)
+
+    def pv_at(self, ply: int) -> List[int]:
+        pv = self.pv
+        while len(pv) <= ply:
+            pv.append([])
+        return pv[ply]
+
+    def moves_at(self, ply: int) -> List[int]:
+        buffers = self.buffers
+        while len(buffers) <= ply:
+            buffers.append([])
+        buf = buffers[ply]
+        buf.clear()
+        return buf
+
+    def quiets_at(self, ply: int) -> List[int]:
+        """Buffer thứ 2 của ply (nước không ăn quân cho move picker)."""
+        buffers = self.quiet_buffers
+        while len(buffers) <= ply:
+            buffers.append([])
+        buf = buffers[ply]
+        buf.clear()
+        return buf
+
+class RootMove:
+    """1 nước ở gốc, giữ lại giữa các lần lặp của iterative deepening."""
+    __slots__ = ("move", "score", "prev_score", "nodes", "pv")
+
+    def __init__(self, move: int):
+        self.move = move
+        self.score = -INF
+        self.prev_score = -INF
+        # số node của lần tìm gần nhất -> sắp thứ tự cho lần lặp sau
+        self.nodes = 0
+        self.pv: List[int] = [move]
+
+# Negamax: điểm luôn tính theo góc nhìn bên đang đi (color), đổi dấu khi xuống 1 ply.
+# PVS: nước đầu tiên (thường là nước tốt nhất nhờ hash move / sắp xếp) được tìm
+# với cửa sổ đầy đủ, các nước sau chỉ tìm với cửa sổ rỗng (alpha, alpha + 1) để
+# chứng minh chúng không tốt hơn; nước nào vượt alpha mới phải tìm lại đủ cửa sổ.
+def negamax(board: Board, color: str, depth: int, alpha: int, beta: int, ply: int = 0, state: Optional[SearchState] = None) -> int:
+    if state is None:
+        state = SearchState()
+    if state.nodes >= state.next_check:
+        state.check_time()
+    pv = state.pv_at(ply)
+    pv.clear()
+
+    # Quiescence Search (tự đếm node)
+    if depth <= 0:
+        if state.options.quiescence:
+            return quiescence(board, color, alpha, beta, ply=ply, state=state)
+        state.nodes += 1
+        return evaluate_board(board, color)
+    state.nodes += 1
+
+    # mate distance pruning: đã có chiếu hết ngắn hơn ở phía trên thì nhánh này
+    # (dù chiếu hết ngay ở nước sau) cũng không làm thay đổi kết quả
+    if ply:
+        alpha = max(alpha, mated_in(ply))
+        beta = min(beta, mate_in(ply + 1))
+        if alpha >= beta:
+            return alpha
+
+    # bảng chuyển vị (điểm lưu theo góc nhìn bên đi)
+    tt = state.tt
+    key = board.zobrist
+    hash_move = NO_MOVE
+    if tt is not None:
+        entry = tt.probe(key)
+        if entry is not None:
+            tt_depth, bound, tt_score, hash_move = entry
+            tt_score = score_from_tt(tt_score, ply)
+            if tt_depth >= depth:
+                if bound == BOUND_EXACT:
+                    return tt_score
+                if bound == BOUND_LOWER and tt_score >= beta:
+                    return tt_score
+                if bound == BOUND_UPPER and tt_score <= alpha:
+                    return tt_score
+    alpha_orig = alpha
+
+    them = opponent(color)
+    options = state.options
+    stats = state.stats
+    pv_node = beta - alpha > 1
+    prev_move = board.undo_stack[-1] if board.undo_stack else NO_MOVE
+    in_check = is_in_check(board, color)
+
+    # cắt tỉa gần lá theo eval tĩnh (không dùng ở nút PV / khi bị chiếu / quanh điểm chiếu hết)
+    futile = False
+    if not pv_node and not in_check and depth <= FRONTIER_MAX_DEPTH:
+        static_eval = evaluate_board(board, color)
+        if (options.reverse_futility and abs(beta) < MATE_BOUND
+                and static_eval - REVERSE_FUTILITY_MARGIN[depth] >= beta):
+            stats["reverse_futility_cutoffs"] += 1
+            return static_eval
+        if abs(alpha) < MATE_BOUND:
+            if options.razoring and static_eval + RAZOR_MARGIN[depth] <= alpha:
+                if options.quiescence:
+                    score = quiescence(board, color, alpha, alpha + 1, ply=ply, state=state)
+                else:
+                    score = static_eval
+                if score <= alpha:
+                    stats["razoring_cutoffs"] += 1
+                    return score
+            futile = options.futility and static_eval + FUTILITY_MARGIN[depth] <= alpha
+
+    # Null move: cho đối phương đi thêm 1 nước mà vẫn >= beta thì nước thật
+    # của mình gần như chắc chắn cũng >= beta. Không dùng ở nút PV, khi bị chiếu,
+    # ngay sau 1 null move khác, hoặc khi không còn quân tấn công (zugzwang).
+    if (options.null_move and not pv_node and not in_check and depth >= NULL_MOVE_MIN_DEPTH
+            and prev_move != NO_MOVE and abs(beta) < MATE_BOUND
+            and has_null_move_material(board, color) and evaluate_board(board, color) >= beta):
+        stats["null_move_tries"] += 1
+        r = NULL_MOVE_R + (1 if depth >= 6 else 0)
+        board.make_null_move()
         try:
-            score = minimax(board, ai_color, opponent(ai_color), False, depth-1, float('-inf'), float('inf'), deadline)
+            score = -negamax(board, them, depth - 1 - r, -beta, -beta + 1, ply + 1, state)
         finally:
-            board.undo_move(undo)
+            board.unmake_null_move()
+        if score >= beta:
+            stats["null_move_cutoffs"] += 1
+            return beta
 
-        if score > best_score:
-            best_score = score
-            best_move = (src, dst)
-    return best_move
+    best = -INF
+    best_move = NO_MOVE
+    searched = 0
+    # nước được sinh theo giai đoạn: cắt tỉa sớm thì không phải sinh / kiểm tra phần còn lại
+    ordering = state.ordering
+    killers = ordering.killers_at(ply)
+    moves = pick_moves(
+        board, color, state.moves_at(ply), state.quiets_at(ply), hash_move,
+        killers, ordering.countermove(prev_move), ordering.history,
+    )
+    lmr = options.lmr and depth >= LMR_MIN_DEPTH and not in_check
+    for move in moves:
+        board.make_move(move)
+        try:
+            # futility: nước thường không chiếu không thể kéo điểm lên tới alpha
+            if (futile and searched and not move >> CAPTURED_SHIFT and move != hash_move
+                    and move not in killers and not is_in_check(board, them)):
+                stats["futility_pruned"] += 1
+                continue
+            if not searched:
+                score = -negamax(board, them, depth - 1, -beta, -alpha, ply + 1, state)
+            else:
+                # LMR: nước thường xếp muộn (không phải hash / killer, không chiếu) tìm nông hơn trước
+                reduction = 0
+                if (lmr and searched >= LMR_MIN_MOVES and not move >> CAPTURED_SHIFT
+                        and move != hash_move and move not in killers and not is_in_check(board, them)):
+                    reduction = 2 if searched >= 2 * LMR_MIN_MOVES and depth >= 6 else 1
+                    stats["lmr_reductions"] += 1
+                score = -negamax(board, them, depth - 1 - reduction, -alpha - 1, -alpha, ply + 1, state)
+                if reduction and score > alpha:
+                    stats["lmr_researches"] += 1
+                    score = -negamax(board, them, depth - 1, -alpha - 1, -alpha, ply + 1, state)
+                if alpha < score < beta:
+                    score = -negamax(board, them, depth - 1, -beta, -alpha, ply + 1, state)
+        finally:
+            board.unmake_move()
+        searched += 1
+
+        if score > best:
+            best = score
+            best_move = move
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    ordering.update(ply, move, depth, prev_move)
+                    break
+                pv[:] = state.pv_at(ply + 1)
+                pv.insert(0, move)
+
+    if not searched:
+        best = mated_in(ply) if in_check else 0
+
+    if tt is not None:
+        if best <= alpha_orig:
+            bound = BOUND_UPPER
+        elif best >= beta:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        tt.store(key, depth, bound, score_to_tt(best, ply), best_move)
+    return best
+
+def search_root(board: Board, color: str, depth: int, alpha: int = -INF, beta: int = INF, state: Optional[SearchState] = None, root_moves: Optional[List[RootMove]] = None) -> Tuple[int, Optional[int]]:
+    """
+    Tìm ở gốc với cửa sổ (alpha, beta), trả về (điểm, nước nén tốt nhất).
+    Điểm <= alpha / >= beta ban đầu chỉ là cận (aspiration window bị trượt).
+    root_moves: danh sách nước gốc theo thứ tự cần thử (iterative deepening),
+    được cập nhật điểm / số node / PV của từng nước.
+    """
+    if state is None:
+        state = SearchState()
+    tt = state.tt
+    if root_moves is None:
+        root_moves = make_root_moves(board, color, tt)
+    if not root_moves:
+        return (mated_in(0) if is_in_check(board, color) else 0), None
+
+    them = opponent(color)
+    alpha_orig = alpha
+    best_move: Optional[int] = None
+    best = -INF
+    for rm in root_moves:
+        if state.nodes >= state.next_check:
+            state.check_time()
+        move = rm.move
+        nodes_before = state.nodes
+        board.make_move(move)
+        try:
+            if best_move is None:
+                score = -negamax(board, them, depth - 1, -beta, -alpha, 1, state)
+            else:
+                score = -negamax(board, them, depth - 1, -alpha - 1, -alpha, 1, state)
+                if alpha < score < beta:
+                    score = -negamax(board, them, depth - 1, -beta, -alpha, 1, state)
+        finally:
+            board.unmake_move()
+        rm.nodes = state.nodes - nodes_before
+        rm.score = score
+
+        if best_move is None or score > best:
+            best = score
+            best_move = move
+            if score > alpha:
+                alpha = score
+                rm.pv = [move] + state.pv_at(1)
+                # đã chứng minh tốt hơn cận dưới ban đầu -> dùng được nếu bị ngắt sau đó
+                state.root_best = (score, move)
+                if alpha >= beta:
+                    break
 
+    if tt is not None:
+        bound = BOUND_UPPER if best <= alpha_orig else BOUND_LOWER if best >= beta else BOUND_EXACT
+        tt.store(board.zobrist, depth, bound, best, best_move)
+    return best, best_move
+
+def make_root_moves(board: Board, color: str, tt: Optional[TranspositionTable] = None) -> List[RootMove]:
+    """Nước hợp lệ ở gốc: hash move trước, còn lại theo MVV-LVA."""
+    moves: List[int] = []
+    gen_legal_moves(board, color, moves)
+    sort_packed_moves(moves)
+    hash_move = tt.best_move(board.zobrist) if tt is not None else NO_MOVE
+    if hash_move in moves:
+        moves.remove(hash_move)
+        moves.insert(0, hash_move)
+    return [RootMove(m) for m in moves]
+
+def aspiration_search(board: Board, color: str, depth: int, guess: Optional[int], state: SearchState, root_moves: Optional[List[RootMove]] = None) -> Tuple[int, Optional[int]]:
+    """
+    Tìm ở gốc với cửa sổ hẹp quanh điểm của lần lặp trước (guess); trượt cửa sổ
+    thì nới rộng phía bị trượt rồi tìm lại, cho tới cửa sổ đầy đủ.
+    """
+    if guess is None or abs(guess) >= MATE_BOUND:
+        return search_root(board, color, depth, -INF, INF, state, root_moves)
+    delta = ASPIRATION_WINDOW
+    alpha = guess - delta
+    beta = guess + delta
+    while True:
+        score, move = search_root(board, color, depth, alpha, beta, state, root_moves)
+        if score >= beta and root_moves and root_moves[0].move != move:
+            # nước vừa vượt beta được thử đầu tiên khi tìm lại
+            idx = next(i for i, rm in enumerate(root_moves) if rm.move == move)
+            root_moves.insert(0, root_moves.pop(idx))
+        if score <= alpha and alpha > -INF:
+            alpha = max(-INF, score - delta)
+        elif score >= beta and beta < INF:
+            beta = min(INF, score + delta)
+        else:
+            return score, move
+        delta *= 4
+
+
+# depth là độ sâu tìm kiếm
+def find_best_move(board: Board, ai_color: str, depth: int, deadline: float | None = None, tt: Optional[TranspositionTable] = None, options: Optional[SearchOptions] = None, workers: int = 1) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """
+    Trả về nước đi tốt nhất cho ai_color.
+    depth: độ sâu tìm kiếm..
+    tt: bảng chuyển vị dùng lại giữa các lần gọi (vd. các độ sâu của iterative
+    deepening); None thì tạo bảng mới cho lần gọi này.
+    workers > 1: chia nước gốc cho workers process (engine/ai/parallel_root.py).
+    """
+    if tt is None:
+        tt = TranspositionTable()
+    if workers > 1:
+        from engine.ai.parallel_root import parallel_search_root
+        _, best_move = parallel_search_root(board, ai_color, depth, workers, tt, options, deadline)
+    else:
+        _, best_move = search_root(board, ai_color, depth, -INF, INF, SearchState(deadline, tt, options))
+    return move_to_tuple(best_move) if best_move is not None else None
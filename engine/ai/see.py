@@ -0,0 +1,162 @@
+# Static exchange evaluation (SEE): lời / lỗ vật chất của 1 nước ăn quân khi 2
+# bên lần lượt ăn lại trên cùng ô đích, mỗi lần bằng quân rẻ nhất còn ăn được,
+# và mỗi bên được dừng bất cứ lúc nào.
+#
+# Trong cờ tướng tập quân ăn được 1 ô thay đổi theo từng lần ăn: quân vừa đi
+# khỏi có thể là màn của pháo (pháo mất màn, hoặc pháo phía sau có màn mới),
+# có thể đang chặn chân mã / mắt tượng, hoặc lộ xe phía sau. Vì vậy mỗi lần ăn
+# được đi thật trên mailbox (board.squares) rồi tìm lại quân ăn rẻ nhất từ
+# bàn hiện tại; chân mã, mắt tượng, sông và cung (sĩ, tướng) lấy từ bảng nước đi của
+# engine/rules/tables.py. Tướng chỉ được ăn khi ô đích không còn bị đối
+# phương ăn lại. Không xét quân bị ghim (như SEE thông thường).
+from typing import List
+from engine.board import Board
+from engine.move import MOVED_SHIFT, CAPTURED_SHIFT
+from engine.utils.position import SQ_TO_RC, in_palace
+from engine.utils.piece_codes import (
+    EMPTY_CODE, COLOR_MASK, TYPE_MASK, ROOK, CANNON, KNIGHT, ELEPHANT, ADVISOR, KING, PAWN, RED,
+)
+from engine.rules.tables import (
+    ORTHOGONAL, NORTH, SOUTH, KNIGHT_ATTACKERS, PAWN_ATTACKERS, ELEPHANT_MOVES, ADVISOR_MOVES, KING_MOVES,
+)
+from engine.ai.pst import TYPE_VALUE
+
+def least_valuable_attacker(board: Board, sq: int, side: int) -> int:
+    """Ô của quân rẻ nhất bên side (bit màu) ăn được ô sq trên bàn hiện tại, 0 nếu không có."""
+    squares = board.squares
+    ci = 0 if side == RED else 1
+
+    pawn = side | PAWN
+    for src in PAWN_ATTACKERS[ci][sq]:
+        if squares[src] == pawn:
+            return src
+    # sĩ / tượng / tướng: bảng nước đi đối xứng khi ô đích nằm trong cung / chưa qua sông
+    row, col = SQ_TO_RC[sq]
+    palace = in_palace(row, col, "r" if side == RED else "b")
+    if palace:
+        advisor = side | ADVISOR
+        for src in ADVISOR_MOVES[ci][sq]:
+            if squares[src] == advisor:
+                return src
+    if (row >= 5) == (side == RED):
+        elephant = side | ELEPHANT
+        for src, eye in ELEPHANT_MOVES[ci][sq]:
+            if squares[src] == elephant and squares[eye] == EMPTY_CODE:
+                return src
+    knight = side | KNIGHT
+    for src, leg in KNIGHT_ATTACKERS[sq]:
+        if squares[src] == knight and squares[leg] == EMPTY_CODE:
+            return src
+
+    # pháo (quân thứ 2 sau màn) rẻ hơn xe (quân đầu tiên)
+    rook = side | ROOK
+    cannon = side | CANNON
+    rook_sq = 0
+    for step in ORTHOGONAL:
+        s = sq + step
+        code = squares[s]
+        while code == EMPTY_CODE:
+            s += step
+            code = squares[s]
+        if not code & COLOR_MASK:
+            continue  # viền
+        if code == rook and not rook_sq:
+            rook_sq = s
+        # quân đầu tiên (kể cả xe của mình) làm màn cho pháo phía sau
+        s += step
+        code = squares[s]
+        while code == EMPTY_CODE:
+            s += step
+            code = squares[s]
+        if code == cannon:
+            return s
+    if rook_sq:
+        return rook_sq
+
+    if palace:
+        king = side | KING
+        for src in KING_MOVES[ci][sq]:
+            if squares[src] == king:
+                return src
+    return 0
+
+def _faces_king(squares, sq: int, king: int) -> bool:
+    for step in (NORTH, SOUTH):
+        s = sq + step
+        while squares[s] == EMPTY_CODE:
+            s += step
+        if squares[s] == king:
+            return True
+    return False
+
+def see(board: Board, move: int) -> int:
+    """
+    Điểm vật chất (theo TYPE_VALUE) bên đi thu được sau chuỗi ăn qua lại trên ô
+    đích của nước nén move; nước không ăn quân cũng được tính (lỗ nếu quân đi
+    bị ăn mất). Bàn cờ được trả về nguyên trạng.
+    """
+    squares = board.squares
+    frm = move & 0xFF
+    to = (move >> 8) & 0xFF
+    moved = squares[frm]
+    # gain[d]: lời của bên ăn ở lần thứ d nếu đối phương ăn lại đến hết
+    gain: List[int] = [TYPE_VALUE[squares[to] & TYPE_MASK]]
+    on_square = TYPE_VALUE[moved & TYPE_MASK]
+    side = COLOR_MASK ^ (moved & COLOR_MASK)
+    # chỉ sửa squares (đủ cho least_valuable_attacker), ghi lại để trả về nguyên trạng
+    changed = [(frm, moved), (to, squares[to])]
+    squares[frm] = EMPTY_CODE
+    squares[to] = moved
+    try:
+        while True:
+            src = least_valuable_attacker(board, to, side)
+            if not src:
+                break
+            attacker = squares[src]
+            changed.append((src, attacker))
+            squares[src] = EMPTY_CODE
+            squares[to] = attacker
+            # tướng không được ăn vào ô còn bị ăn lại / đối mặt tướng địch
+            if attacker & TYPE_MASK == KING and (
+                    least_valuable_attacker(board, to, side ^ COLOR_MASK)
+                    or _faces_king(squares, to, (side ^ COLOR_MASK) | KING)):
+                break
+            gain.append(on_square - gain[-1])
+            on_square = TYPE_VALUE[attacker & TYPE_MASK]
+            side ^= COLOR_MASK
+    finally:
+        for sq, code in reversed(changed):
+            squares[sq] = code
+
+    # mỗi bên chỉ ăn tiếp nếu có lợi
+    for d in range(len(gain) - 1, 0, -1):
+        gain[d - 1] = -max(-gain[d - 1], gain[d])
+    return gain[0]
+
+def see_ge(board: Board, move: int, threshold: int = 0) -> bool:
+    """see(board, move) >= threshold, bỏ qua phần tính chuỗi khi chắc chắn đúng."""
+    captured = move >> CAPTURED_SHIFT
+    moved = (move >> MOVED_SHIFT) & 0x3F
+    victim = TYPE_VALUE[captured & TYPE_MASK]
+    # bị ăn lại ngay thì cũng chỉ mất quân đi
+    if victim - TYPE_VALUE[moved & TYPE_MASK] >= threshold:
+        return True
+    if victim < threshold:
+        return see(board, move) >= threshold
+    # ô đích không bị đối phương ăn lại: lời đúng bằng quân bị ăn. Phải dò sau
+    # khi quân đi rời frm (lộ xe / tướng phía sau, pháo đổi màn, mở chân mã)
+    squares = board.squares
+    frm = move & 0xFF
+    to = (move >> 8) & 0xFF
+    mover = squares[frm]
+    victim_code = squares[to]
+    squares[frm] = EMPTY_CODE
+    squares[to] = mover
+    try:
+        defended = least_valuable_attacker(board, to, COLOR_MASK ^ (mover & COLOR_MASK))
+    finally:
+        squares[to] = victim_code
+        squares[frm] = mover
+    if not defended:
+        return True
+    return see(board, move) >= threshold
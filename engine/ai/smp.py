@@ -0,0 +1,226 @@
+# Lazy SMP: tìm kiếm song song nhiều process trên cùng 1 bảng chuyển vị
+#
+# Process chính chạy iterative deepening như bình thường; threads - 1 process
+# helper cùng tìm từ thế cờ gốc đó, lệch độ sâu với nhau (helper lẻ bắt đầu
+# từ depth 2 và đi sâu thêm 1), không trao đổi gì ngoài bảng chuyển vị nằm
+# trong multiprocessing.shared_memory. Kết quả (điểm, hash move, cận) helper
+# ghi vào bảng giúp process chính cắt tỉa / sắp xếp nước tốt hơn. Bảng không
+# có khoá (xem transposition.py), ô bị ghi dở được coi là không có.
+#
+# Kết quả trả về luôn là của process chính; helper dừng ngay khi process
+# chính xong. Helper chạy trong process riêng nên không tranh GIL với web thread.
+#
+# Helper được tạo 1 lần theo (số helper, kích thước bảng) và dùng lại giữa các
+# lượt, như pool của parallel_root.py (shutdown_helpers được đăng ký với
+# atexit). Vùng shared memory gồm:
+#   - ô điều khiển (int 64 bit): lượt tìm hiện tại, lượt đã bị dừng, cờ thoát,
+#     độ dài payload, và lượt mà mỗi helper đã tìm xong
+#   - payload: pickle của (bàn cờ, bên đi, độ sâu, thời gian, age, options)
+#   - bảng chuyển vị
+# Helper đợi lượt mới bằng cách xem ô điều khiển mỗi IDLE_POLL_SEC giây, và
+# trong lúc tìm thì xem ô "đã dừng" mỗi lần xem đồng hồ. Có bảng chuyển vị của
+# người gọi (tt) thì nội dung của tt được chép vào bảng chung lúc bắt đầu và
+# chép ngược lại khi xong, nên tt vẫn được dùng lại giữa các nước như khi tìm
+# 1 process; không có tt thì bảng chung giữ nội dung của lần tìm trước.
+import atexit
+import pickle
+import time
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional, Tuple
+
+from engine.board import Board
+from engine.ai.search import SearchOptions
+from engine.ai.time_search import SearchResult, iterative_deepening
+from engine.ai.time_manager import TimeManager
+from engine.ai.transposition import TranspositionTable, DEFAULT_TT_MB, ENTRY_BYTES
+
+# helper rảnh xem có lượt mới sau mỗi IDLE_POLL_SEC giây
+IDLE_POLL_SEC = 0.002
+# thời gian tối đa đợi helper dừng sau khi process chính xong; quá thì bỏ cả pool
+STOP_TIMEOUT_SEC = 1.0
+# thời gian tối đa đợi helper mới tạo sẵn sàng (khởi động Python + import engine)
+START_TIMEOUT_SEC = 30.0
+PAYLOAD_BYTES = 4096
+
+# ô điều khiển
+_GENERATION = 0
+_STOPPED = 1
+_EXIT = 2
+_PAYLOAD_LEN = 3
+_DONE = 4  # _DONE + i: lượt helper i đã tìm xong (-1: chưa sẵn sàng)
+
+def _layout(helpers: int) -> Tuple[int, int]:
+    """(số byte ô điều khiển, offset của bảng chuyển vị)."""
+    control_bytes = (_DONE + helpers + 1) * 8
+    return control_bytes, control_bytes + PAYLOAD_BYTES
+
+class _HelperClock(TimeManager):
+    """Đồng hồ của helper: không có hạn mềm, dừng khi quá hạn cứng hoặc process chính đã xong lượt."""
+    __slots__ = ("control", "generation")
+
+    def __init__(self, control, generation: int, time_limit: Optional[float]):
+        limit = time_limit if time_limit is not None else float("inf")
+        super().__init__(limit, limit, pondering=True)
+        self.control = control
+        self.generation = generation
+
+    def out_of_time(self) -> bool:
+        return self.control[_STOPPED] == self.generation or super().out_of_time()
+
+def _helper_loop(shm_name: str, index: int, helpers: int, tt_bytes: int) -> None:
+    """Thân của 1 process helper: đợi lượt mới, tìm tới khi xong / hết giờ / bị dừng."""
+    # vùng nhớ do process chính tạo và unlink; helper (spawn) dùng chung
+    # resource tracker với process chính nên chỉ cần gắn vào rồi close
+    shm = SharedMemory(name=shm_name)
+    control_bytes, tt_offset = _layout(helpers)
+    control = shm.buf[:control_bytes].cast("q")
+    payload = shm.buf[control_bytes:tt_offset]
+    tt = TranspositionTable(buffer=shm.buf[tt_offset:tt_offset + tt_bytes])
+    odd = index % 2
+    seen = 0
+    control[_DONE + index] = 0
+    try:
+        while not control[_EXIT]:
+            generation = control[_GENERATION]
+            if generation == seen:
+                time.sleep(IDLE_POLL_SEC)
+                continue
+            seen = generation
+            try:
+                if control[_STOPPED] != generation:
+                    cells, color, max_depth, time_limit, age, options = pickle.loads(payload[:control[_PAYLOAD_LEN]])
+                    # cùng lượt tìm kiếm (age) với process chính
+                    tt.age = age
+                    clock = _HelperClock(control, generation, time_limit)
+                    iterative_deepening(Board(cells, color), color, max_depth + odd, tt=tt, options=options,
+                                        start_depth=1 + odd, time_manager=clock)
+            finally:
+                control[_DONE + index] = generation
+    finally:
+        tt.release()
+        for view in (tt.buffer, payload, control):
+            view.release()
+        shm.close()
+
+class _HelperPool:
+    """helpers process helper và vùng shared memory chung (bảng chuyển vị tt_bytes byte)."""
+    __slots__ = ("helpers", "shm", "control", "payload", "tt", "processes")
+
+    def __init__(self, helpers: int, tt_bytes: int):
+        control_bytes, tt_offset = _layout(helpers)
+        self.helpers = helpers
+        self.shm = SharedMemory(create=True, size=tt_offset + tt_bytes)
+        self.control = self.shm.buf[:control_bytes].cast("q")
+        self.payload = self.shm.buf[control_bytes:tt_offset]
+        self.tt = TranspositionTable(buffer=self.shm.buf[tt_offset:tt_offset + tt_bytes])
+        ctx = get_context("spawn")
+        self.processes = []
+        for i in range(1, helpers + 1):
+            self.control[_DONE + i] = -1
+            process = ctx.Process(target=_helper_loop, args=(self.shm.name, i, helpers, tt_bytes), daemon=True)
+            process.start()
+            self.processes.append(process)
+        # đợi helper sẵn sàng 1 lần ở đây, để các lượt sau không tính thời gian khởi động
+        if not self._wait_done(0, START_TIMEOUT_SEC):
+            self.close()
+            raise RuntimeError("Lazy SMP helpers failed to start")
+
+    def _wait_done(self, generation: int, timeout: float) -> bool:
+        """Đợi mọi helper báo xong lượt generation; False nếu quá timeout giây hoặc có helper chết."""
+        control = self.control
+        deadline = time.perf_counter() + timeout
+        while any(control[_DONE + i] != generation for i in range(1, self.helpers + 1)):
+            if time.perf_counter() >= deadline or not self.alive():
+                return False
+            time.sleep(IDLE_POLL_SEC / 2)
+        return True
+
+    def alive(self) -> bool:
+        return all(p.is_alive() for p in self.processes)
+
+    def start(self, board: Board, color: str, max_depth: int, time_limit: Optional[float], options: Optional[SearchOptions]) -> int:
+        """Gửi thế cờ gốc cho các helper, trả về số lượt."""
+        data = pickle.dumps((board.board, color, max_depth, time_limit, self.tt.age, options))
+        if len(data) > PAYLOAD_BYTES:
+            raise ValueError("Lazy SMP payload too large")
+        self.payload[:len(data)] = data
+        self.control[_PAYLOAD_LEN] = len(data)
+        generation = self.control[_GENERATION] + 1
+        # ghi lượt sau cùng: helper thấy lượt mới thì payload đã đủ
+        self.control[_GENERATION] = generation
+        return generation
+
+    def stop(self, generation: int) -> bool:
+        """Dừng lượt generation, đợi mọi helper dừng; False nếu có helper không dừng kịp."""
+        self.control[_STOPPED] = generation
+        return self._wait_done(generation, STOP_TIMEOUT_SEC)
+
+    def close(self) -> None:
+        self.control[_EXIT] = 1
+        for process in self.processes:
+            process.join(STOP_TIMEOUT_SEC)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.tt.release()
+        for view in (self.tt.buffer, self.payload, self.control):
+            view.release()
+        self.shm.close()
+        self.shm.unlink()
+
+_POOLS: Dict[Tuple[int, int], _HelperPool] = {}
+
+def get_helpers(helpers: int, tt_bytes: int) -> _HelperPool:
+    key = (helpers, tt_bytes)
+    pool = _POOLS.get(key)
+    if pool is not None and not pool.alive():
+        del _POOLS[key]
+        pool.close()
+        pool = None
+    if pool is None:
+        pool = _HelperPool(helpers, tt_bytes)
+        _POOLS[key] = pool
+    return pool
+
+def shutdown_helpers() -> None:
+    for pool in _POOLS.values():
+        pool.close()
+    _POOLS.clear()
+
+atexit.register(shutdown_helpers)
+
+def lazy_smp_search(board: Board, ai_color: str, max_depth: int = 6, deadline: Optional[float] = None, threads: int = 2, tt_mb: float = DEFAULT_TT_MB, options: Optional[SearchOptions] = None, time_manager: Optional[TimeManager] = None, tt: Optional[TranspositionTable] = None) -> SearchResult:
+    """
+    Iterative deepening với threads process (tính cả process chính) dùng chung
+    1 bảng chuyển vị: cùng kích thước và nội dung với tt nếu có (kết quả được
+    chép ngược lại vào tt), không thì bảng tt_mb MB của pool helper. threads <= 1
+    là tìm 1 process như cũ trên tt.
+    time_manager chỉ áp dụng cho process chính; helper dừng theo hạn cứng.
+    """
+    if deadline is None and time_manager is not None:
+        deadline = time_manager.hard_deadline
+    if threads <= 1:
+        if tt is None:
+            tt = TranspositionTable(tt_mb)
+        return iterative_deepening(board, ai_color, max_depth, deadline, tt, options, time_manager=time_manager)
+
+    size = (tt.size if tt is not None else TranspositionTable.entries_for(tt_mb)) * ENTRY_BYTES
+    pool = get_helpers(threads - 1, size)
+    shared = pool.tt
+    if tt is not None:
+        memoryview(shared.buffer)[:size] = memoryview(tt.buffer)[:size]
+        shared.age = tt.age
+    time_limit = None if deadline is None else max(0.0, deadline - time.perf_counter())
+    generation = pool.start(board, ai_color, max_depth, time_limit, options)
+    try:
+        return iterative_deepening(board, ai_color, max_depth, deadline, shared, options, time_manager=time_manager)
+    finally:
+        stopped = pool.stop(generation)
+        if tt is not None:
+            memoryview(tt.buffer)[:size] = memoryview(shared.buffer)[:size]
+            tt.age = shared.age
+        if not stopped:
+            # helper treo / chết: lần sau tạo pool mới
+            _POOLS.pop((pool.helpers, size), None)
+            pool.close()
@@ -0,0 +1,105 @@
+# Quản lý thời gian cho iterative deepening
+#
+# 2 mức thời gian:
+#   - hạn mềm (soft_limit): xong 1 độ sâu mà đã dùng quá hạn mềm thì không bắt
+#     đầu độ sâu mới. Nước tốt nhất giữ nguyên qua nhiều độ sâu (vd. ăn lại hiển
+#     nhiên) thì hạn mềm bị rút ngắn; điểm tụt mạnh so với độ sâu trước (thế cờ
+#     gay cấn) thì hạn mềm được kéo dài, không quá hạn cứng.
+#   - hạn cứng (hard_limit): ngắt ngay giữa 1 độ sâu (SearchTimeout). Đồng hồ chỉ
+#     được xem mỗi check_every node (SearchState.check_time), không phải mọi node.
+# Khi suy nghĩ trong giờ của đối thủ (pondering, engine/ai/ponder.py) hạn mềm
+# không được dùng; ponderhit() đổi sang hạn của 1 nước bình thường, tính cả
+# thời gian đã ponder, stop() (từ thread khác) ngắt tìm kiếm ở lần xem đồng hồ
+# tiếp theo.
+import time
+from typing import Optional
+
+from engine.board import Board
+
+# số node giữa 2 lần xem đồng hồ (~ vài ms)
+CHECK_EVERY_NODES = 1024
+# (số quân tối thiểu, hạn mềm, hạn cứng) theo giai đoạn ván cờ
+PHASE_LIMITS = ((24, 2.0, 5.0), (12, 1.2, 3.0), (0, 0.6, 1.5))
+# hạn mềm = SOFT_RATIO * thời gian cho trước khi chỉ có 1 mức thời gian
+SOFT_RATIO = 0.4
+# nước tốt nhất không đổi qua STABLE_ITERATIONS độ sâu -> chỉ dùng STABLE_FACTOR hạn mềm
+STABLE_ITERATIONS = 2
+STABLE_FACTOR = 0.5
+# điểm tụt >= SCORE_DROP so với độ sâu trước -> hạn mềm nhân EXTEND_FACTOR
+SCORE_DROP = 50
+EXTEND_FACTOR = 2.0
+
+class TimeManager:
+    """Hạn mềm / hạn cứng (giây, tính từ lúc tạo) của 1 lần tìm kiếm, xem đầu file."""
+    __slots__ = ("start", "soft_limit", "hard_limit", "check_every", "best_move", "best_score", "stable", "pondering", "stopped")
+
+    def __init__(self, soft_limit: float, hard_limit: Optional[float] = None, check_every: int = CHECK_EVERY_NODES, pondering: bool = False):
+        self.start = time.perf_counter()
+        self.hard_limit = hard_limit if hard_limit is not None else soft_limit
+        self.soft_limit = min(soft_limit, self.hard_limit)
+        self.check_every = check_every
+        self.pondering = pondering
+        self.stopped = False
+        self.best_move: Optional[int] = None
+        self.best_score: Optional[int] = None
+        # số độ sâu liên tiếp nước tốt nhất không đổi
+        self.stable = 0
+
+    @classmethod
+    def for_board(cls, board: Board) -> "TimeManager":
+        """Thời gian theo giai đoạn ván cờ: nhiều quân (khai cuộc / trung cuộc) nghĩ lâu hơn."""
+        piece_count = board.piece_count()
+        for min_pieces, soft, hard in PHASE_LIMITS:
+            if piece_count >= min_pieces:
+                return cls(soft, hard)
+        return cls(PHASE_LIMITS[-1][1], PHASE_LIMITS[-1][2])
+
+    @classmethod
+    def for_limit(cls, time_limit_sec: float) -> "TimeManager":
+        """Chỉ có tổng thời gian: đó là hạn cứng, hạn mềm là SOFT_RATIO của nó."""
+        hard = max(0.01, time_limit_sec)
+        return cls(hard * SOFT_RATIO, hard)
+
+    @property
+    def hard_deadline(self) -> float:
+        return self.start + self.hard_limit
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def out_of_time(self) -> bool:
+        """Đã bị stop() hoặc quá hạn cứng."""
+        return self.stopped or time.perf_counter() >= self.start + self.hard_limit
+
+    def stop(self) -> None:
+        self.stopped = True
+
+    def ponderhit(self, other: "TimeManager") -> None:
+        """
+        Đối thủ đi đúng nước đoán: tìm tiếp với hạn mềm / hạn cứng của other,
+        vẫn tính từ lúc bắt đầu ponder. Đã quá hạn mềm và đã xong ít nhất 1 độ
+        sâu thì dừng ngay.
+        """
+        self.soft_limit = other.soft_limit
+        self.hard_limit = other.hard_limit
+        self.pondering = False
+        if self.best_move is not None and self.elapsed() >= self.soft_limit:
+            self.stopped = True
+
+    def iteration_done(self, move: int, score: int) -> bool:
+        """Ghi nhận kết quả 1 độ sâu vừa xong, trả về True nếu nên dừng tại đây."""
+        if move == self.best_move:
+            self.stable += 1
+        else:
+            self.stable = 0
+        if self.best_score is not None and self.best_score - score >= SCORE_DROP:
+            self.soft_limit = min(self.hard_limit, self.soft_limit * EXTEND_FACTOR)
+        self.best_move = move
+        self.best_score = score
+        if self.pondering:
+            return False
+
+        limit = self.soft_limit
+        if self.stable >= STABLE_ITERATIONS:
+            limit *= STABLE_FACTOR
+        return self.elapsed() >= limit
@@ -1,33 +1,124 @@
 # engine/ai/time_search.py
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import time
 
-from engine.ai.search import find_best_move
+from engine.ai.search import SearchState, SearchOptions, RootMove, aspiration_search, make_root_moves
+from engine.move import move_to_tuple
+from engine.ai.transposition import TranspositionTable
+from engine.ai.time_manager import TimeManager
 from engine.board import Board
 from engine.excaptions import SearchTimeout
 
 
-def best_move_with_time_limit(board: Board, ai_color: str, max_depth: int = 6, time_limit_sec: float = 0.5) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+class SearchResult:
+    """Kết quả iterative deepening: nước tốt nhất (nén), điểm, độ sâu đã xong / tối đa, PV, số node, thống kê cắt tỉa."""
+    __slots__ = ("move", "score", "depth", "max_depth", "pv", "nodes", "root_moves", "stats")
+
+    def __init__(self):
+        self.move: Optional[int] = None
+        self.score: Optional[int] = None
+        self.depth = 0
+        self.max_depth = 0
+        self.pv: List[int] = []
+        self.nodes = 0
+        self.root_moves: List[RootMove] = []
+        self.stats: Dict[str, int] = {}
+
+    @property
+    def best_move(self) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        return move_to_tuple(self.move) if self.move is not None else None
+
+
+def iterative_deepening(board: Board, ai_color: str, max_depth: int = 6, deadline: Optional[float] = None, tt: Optional[TranspositionTable] = None, options: Optional[SearchOptions] = None, start_depth: int = 1, time_manager: Optional[TimeManager] = None) -> SearchResult:
     """
-    Iterative deepening:
-    - chạy depth 1..max_depth
-    - hết thời gian -> trả best move của depth gần nhất đã xong
+    Iterative deepening dùng lại kết quả giữa các độ sâu:
+    - 1 bảng chuyển vị + 1 SearchState (killer) cho mọi độ sâu
+    - nước tốt nhất (đầu PV) của độ sâu trước được thử đầu tiên, các nước còn
+      lại xếp theo số node đã tốn ở độ sâu trước
+    - cửa sổ aspiration quanh điểm của độ sâu trước
+    - hết giờ giữa 1 độ sâu: nếu độ sâu đó đã chứng minh được 1 nước tốt hơn
+      thì trả về nước đó thay vì nước của độ sâu trước
+    start_depth: bỏ qua các độ sâu nhỏ hơn (helper của Lazy SMP, engine/ai/smp.py)
+    time_manager: hạn mềm / hạn cứng (engine/ai/time_manager.py), dùng thay
+    cho deadline. Chỉ có 1 nước hợp lệ thì dừng sau độ sâu đầu.
     """
-    start = time.perf_counter()
-    deadline = start + max(0.01, time_limit_sec)
-
-    best: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+    if tt is None:
+        tt = TranspositionTable()
+    tt.new_search()
+    if time_manager is not None:
+        state = SearchState(None, tt, options, time_manager.check_every)
+        state.time_manager = time_manager
+    else:
+        state = SearchState(deadline, tt, options)
+    result = SearchResult()
+    result.max_depth = max_depth
+    root_moves = make_root_moves(board, ai_color, tt)
+    result.root_moves = root_moves
+    if not root_moves:
+        return result
 
-    for d in range(1, max_depth + 1):
+    for d in range(start_depth, max_depth + 1):
         # nếu hết thời gian thì dừng luôn
-        if time.perf_counter() >= deadline:
+        if time_manager is not None:
+            if time_manager.out_of_time():
+                break
+        elif deadline is not None and time.perf_counter() >= deadline:
             break
 
+        state.root_best = None
+        for rm in root_moves:
+            rm.prev_score = rm.score
         try:
-            mv = find_best_move(board, ai_color, d, deadline)
-            if mv is not None:
-                best = mv
+            score, move = aspiration_search(board, ai_color, d, result.score, state, root_moves)
         except SearchTimeout:
+            partial = state.root_best
+            if partial is not None and partial[1] != result.move:
+                result.score, result.move = partial
+                result.pv = next(rm.pv for rm in root_moves if rm.move == result.move)
             break
 
-    return best
+        result.move = move
+        result.score = score
+        result.depth = d
+        best = next(rm for rm in root_moves if rm.move == move)
+        result.pv = best.pv
+        # lần lặp sau: PV trước, còn lại theo số node (nhiều node = khó bác bỏ = đáng thử sớm)
+        root_moves.sort(key=lambda rm: rm.nodes, reverse=True)
+        root_moves.remove(best)
+        root_moves.insert(0, best)
+        if time_manager is not None and (len(root_moves) == 1 or time_manager.iteration_done(move, score)):
+            break
+
+    if result.move is None:
+        # chưa xong cả độ sâu 1: vẫn trả 1 nước hợp lệ (đã xếp theo MVV-LVA / hash move)
+        result.move = root_moves[0].move
+        result.pv = [result.move]
+    result.nodes = state.nodes
+    result.stats = dict(state.stats)
+    return result
+
+
+def search_with_time_limit(board: Board, ai_color: str, max_depth: int, time_manager: TimeManager, threads: int = 1, tt: Optional[TranspositionTable] = None) -> SearchResult:
+    """
+    Iterative deepening theo time_manager, trả về cả SearchResult (PV dùng cho
+    pondering, engine/ai/ponder.py). threads > 1: Lazy SMP (bảng chuyển vị
+    chung nằm trong shared memory, chép từ / về tt).
+    """
+    if threads > 1:
+        from engine.ai.smp import lazy_smp_search
+        return lazy_smp_search(board, ai_color, max_depth, threads=threads, time_manager=time_manager, tt=tt)
+    return iterative_deepening(board, ai_color, max_depth, tt=tt, time_manager=time_manager)
+
+
+def best_move_with_time_limit(board: Board, ai_color: str, max_depth: int = 6, time_limit_sec: float = 0.5, threads: int = 1, time_manager: Optional[TimeManager] = None) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """
+    Iterative deepening:
+    - chạy depth 1..max_depth
+    - time_manager (mặc định TimeManager.for_limit(time_limit_sec)): hết hạn
+      mềm thì không bắt đầu depth mới, hết hạn cứng -> trả best move của depth
+      gần nhất đã xong (hoặc nước tốt hơn mà depth đang chạy đã tìm được)
+    - threads > 1: Lazy SMP với threads process (engine/ai/smp.py)
+    """
+    if time_manager is None:
+        time_manager = TimeManager.for_limit(time_limit_sec)
+    return search_with_time_limit(board, ai_color, max_depth, time_manager, threads).best_move
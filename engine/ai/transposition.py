@@ -0,0 +1,168 @@
+# Bảng chuyển vị (transposition table) kích thước cố định
+#
+# Toàn bộ bảng nằm trong 1 buffer liên tục chia làm 3 mảng song song (theo
+# memoryview.cast), không dùng dict nên bộ nhớ bị chặn bởi size_mb:
+#   keys[i]   khoá zobrist 64 bit của thế cờ XOR data[i] XOR scores[i]
+#   data[i]   move (28 bit) | depth << 28 (8 bit) | bound << 36 (2 bit) | age << 38 (8 bit)
+#   scores[i] điểm (int 64 bit); điểm chiếu hết được lưu theo khoảng cách tính
+#             từ chính thế cờ đó, không phải từ gốc (score_to_tt / score_from_tt)
+# Mỗi khoá rơi vào 1 bucket 2 ô; khi đầy thì thay ô cũ (khác lượt tìm kiếm)
+# trước, sau đó tới ô có depth thấp hơn.
+#
+# Buffer có thể là shared memory dùng chung giữa nhiều process (engine/ai/smp.py)
+# mà không có khoá: 1 ô bị ghi dở (process khác đang ghi giữa chừng) sẽ không
+# khớp phép XOR ở trên, nên probe coi như không có thay vì đọc nhầm dữ liệu.
+from typing import Optional, Tuple
+
+from engine.ai.evaluator import MATE_BOUND
+
+# loại điểm
+BOUND_NONE = 0
+BOUND_EXACT = 1
+BOUND_LOWER = 2  # điểm thật >= score (cắt beta)
+BOUND_UPPER = 3  # điểm thật <= score (không nước nào vượt alpha)
+
+ENTRY_BYTES = 24
+BUCKET_SIZE = 2
+
+DEFAULT_TT_MB = 16
+
+_MOVE_MASK = (1 << 28) - 1
+_DEPTH_SHIFT = 28
+_BOUND_SHIFT = 36
+_AGE_SHIFT = 38
+_MASK64 = (1 << 64) - 1
+
+def score_to_tt(score: int, ply: int) -> int:
+    """
+    Điểm chiếu hết theo gốc (MATE_SCORE - ply tới chiếu hết) -> theo thế cờ đang
+    lưu ở ply, để dùng lại đúng khi gặp cùng thế cờ ở ply khác.
+    """
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+def score_from_tt(score: int, ply: int) -> int:
+    """Ngược của score_to_tt: điểm đọc từ bảng -> theo gốc khi thế cờ ở ply."""
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+class TranspositionTable:
+    """
+    Bảng chuyển vị có giới hạn bộ nhớ. Điểm lưu theo góc nhìn bên đi của thế cờ.
+    buffer: vùng nhớ có sẵn (vd. shared memory) thay vì tự cấp phát.
+    """
+    __slots__ = ("size", "mask", "age", "buffer", "keys", "data", "scores")
+
+    def __init__(self, size_mb: float = DEFAULT_TT_MB, buffer=None):
+        entries = self.entries_for(size_mb) if buffer is None else len(buffer) // ENTRY_BYTES
+        if entries < BUCKET_SIZE:
+            raise ValueError("Transposition table too small")
+        # số bucket là luỹ thừa của 2 để lấy index bằng & mask
+        buckets = 1 << ((entries // BUCKET_SIZE).bit_length() - 1)
+        self.size = buckets * BUCKET_SIZE
+        self.mask = buckets - 1
+        self.age = 0
+        if buffer is None:
+            buffer = bytearray(self.size * ENTRY_BYTES)
+        self.buffer = buffer
+        view = memoryview(buffer)
+        n = self.size * 8
+        self.keys = view[0:n].cast("Q")
+        self.data = view[n:2 * n].cast("Q")
+        self.scores = view[2 * n:3 * n].cast("q")
+
+    @staticmethod
+    def entries_for(size_mb: float) -> int:
+        return int(size_mb * 1024 * 1024) // ENTRY_BYTES
+
+    def release(self) -> None:
+        """Nhả các view vào buffer (bắt buộc trước khi đóng shared memory); bảng không dùng được nữa."""
+        for view in (self.keys, self.data, self.scores):
+            view.release()
+
+    def clear(self) -> None:
+        view = memoryview(self.buffer)
+        view[:self.size * ENTRY_BYTES] = bytes(self.size * ENTRY_BYTES)
+        self.age = 0
+
+    def new_search(self) -> None:
+        """Gọi đầu mỗi lượt tìm kiếm: entry của lượt trước được ưu tiên thay thế."""
+        self.age = (self.age + 1) & 0xFF
+
+    def _key_at(self, j: int) -> int:
+        """Khoá zobrist của ô j (0 nếu ô trống, giá trị rác nếu ô bị ghi dở)."""
+        return self.keys[j] ^ self.data[j] ^ (self.scores[j] & _MASK64)
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        """(depth, bound, score, move) của thế cờ key, hoặc None."""
+        i = (key & self.mask) * BUCKET_SIZE
+        keys = self.keys
+        data = self.data
+        scores = self.scores
+        for j in (i, i + 1):
+            d = data[j]
+            score = scores[j]
+            if keys[j] ^ d ^ (score & _MASK64) == key:
+                bound = (d >> _BOUND_SHIFT) & 3
+                if bound:
+                    return (d >> _DEPTH_SHIFT) & 0xFF, bound, score, d & _MOVE_MASK
+        return None
+
+    def best_move(self, key: int) -> int:
+        entry = self.probe(key)
+        return entry[3] if entry is not None else 0
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: int) -> None:
+        i = (key & self.mask) * BUCKET_SIZE
+        data = self.data
+        age = self.age
+
+        if self._key_at(i) == key:
+            slot = i
+        elif self._key_at(i + 1) == key:
+            slot = i + 1
+        else:
+            # ô trống / ô của lượt cũ trước, rồi tới ô nông hơn
+            slot = i
+            worst = None
+            for j in (i, i + 1):
+                d = data[j]
+                if not (d >> _BOUND_SHIFT) & 3:
+                    slot = j
+                    break
+                value = ((d >> _DEPTH_SHIFT) & 0xFF) - (0 if (d >> _AGE_SHIFT) & 0xFF == age else 256)
+                if worst is None or value < worst:
+                    worst = value
+                    slot = j
+
+        if self._key_at(slot) == key:
+            old = data[slot]
+            # cùng thế cờ: giữ best move cũ nếu lần này không có, không ghi đè
+            # kết quả sâu hơn của cùng lượt bằng kết quả nông (trừ khi là EXACT)
+            if not move:
+                move = old & _MOVE_MASK
+            if ((old >> _AGE_SHIFT) & 0xFF == age and ((old >> _DEPTH_SHIFT) & 0xFF) > depth
+                    and bound != BOUND_EXACT):
+                return
+
+        d = (move & _MOVE_MASK) | (min(depth, 0xFF) << _DEPTH_SHIFT) | (bound << _BOUND_SHIFT) | (age << _AGE_SHIFT)
+        data[slot] = d
+        self.scores[slot] = score
+        self.keys[slot] = key ^ d ^ (score & _MASK64)
+
+    def hashfull(self) -> int:
+        """Phần nghìn số ô đã dùng trong lượt hiện tại (lấy mẫu 1000 ô đầu)."""
+        sample = min(1000, self.size)
+        data = self.data
+        used = 0
+        for j in range(sample):
+            d = data[j]
+            if (d >> _BOUND_SHIFT) & 3 and (d >> _AGE_SHIFT) & 0xFF == self.age:
+                used += 1
+        return used * 1000 // sample
@@ -1,91 +1,314 @@
 # Bàn cờ 9x10
-from typing import Tuple, List, Optional
-from engine.move import Move
-from engine.utils.position import EMPTY, in_bounds, in_palace
+from typing import Tuple, List, Optional, Set
+from engine.move import Move, MOVE_SQ_MASK, MOVED_SHIFT, CAPTURED_SHIFT
+from engine.utils.position import (
+    EMPTY, BOARD_SIZE, ALL_SQUARES, SQ_TO_RC, SQ_BIT, SQ_FILE_BIT, in_bounds, in_palace, to_sq,
+)
+from engine.utils.piece_codes import (
+    EMPTY_CODE, OFFBOARD, KING, TYPE_MASK, CELL_TO_CODE, CODE_TO_CELL, color_index,
+)
+from engine.utils.zobrist import ZOBRIST_PIECE, ZOBRIST_SIDE
+from engine.ai.pst import PIECE_SQUARE_VALUE
+
+# mailbox rỗng: ô trong bàn = EMPTY_CODE, ô viền = OFFBOARD
+_EMPTY_SQUARES = bytearray([OFFBOARD] * BOARD_SIZE)
+for _sq in ALL_SQUARES:
+    _EMPTY_SQUARES[_sq] = EMPTY_CODE
+
 class Board:
+    """
+    Bàn cờ lưu dạng mailbox phẳng (bytearray) với mã quân số nguyên nhỏ
+    (xem engine/utils/piece_codes.py). get/set/board vẫn trả về string "rR"
+    để rules, serializer và engine_adapter dùng như cũ; AI dùng trực tiếp
+    self.squares + move_piece/unmove_piece.
+
+    piece_squares[0|1] là tập ô đang có quân đỏ/đen, cập nhật O(1) mỗi nước đi
+    để các vòng lặp chỉ đi qua quân còn sống thay vì quét 90 ô.
+
+    Song song với mailbox, Board giữ các bitboard 90 bit (bit row*9+col) cho
+    backend sinh nước bitboard (engine/rules/bitboard.py): occupancy toàn bàn,
+    file_occ theo từng cột (10 bit, bit = row), color_bb theo màu và
+    bitboards theo mã quân.
+
+    zobrist là khoá 64 bit của thế cờ (quân-ô + bên đi, engine/utils/zobrist.py),
+    cập nhật O(1) mỗi nước đi và tính lại khi gán cả bàn (board setter,
+    Board(state=...), load_fen, load_json2d). Mỗi nước đi đổi bên đi
+    (side_index: 0 = đỏ, 1 = đen).
+
+    psq[0|1] là tổng PIECE_SQUARE_VALUE (vật chất + vị trí, engine/ai/pst.py)
+    của quân đỏ/đen, cũng cập nhật tăng dần để evaluate_board là O(1).
+    """
     ROWS = 10
     COLS = 9
 
-    def __init__(self, state=None):
-        self.black_king: Optional[Tuple[int, int]] = None
-        self.red_king: Optional[Tuple[int, int]] = None
-        if state is None:
-            self.board = self._create_empty_board()
-        else:
+    def __init__(self, state=None, turn: str = "r"):
+        self.squares: bytearray = bytearray(_EMPTY_SQUARES)
+        self.side_index: int = 0 if turn == "r" else 1
+        self.zobrist: int = ZOBRIST_SIDE if self.side_index else 0
+        # ô mailbox của tướng [đỏ, đen], 0 = không có tướng
+        self.king_sq: List[int] = [0, 0]
+        # stack nước đi nén (engine/move.py) cho make_move/unmake_move
+        self.undo_stack: List[int] = []
+        # ô mailbox có quân [đỏ, đen]
+        self.piece_squares: List[Set[int]] = [set(), set()]
+        self.occupancy: int = 0
+        self.file_occ: List[int] = [0] * self.COLS
+        self.color_bb: List[int] = [0, 0]
+        self.bitboards: List[int] = [0] * (OFFBOARD + 1)
+        self.psq: List[int] = [0, 0]
+        if state is not None:
             self.board = state
-            self.update_king_positions()
 
-    def update_king_positions(self) -> None:
+    @property
+    def board(self) -> List[List[str]]:
+        """Bản sao 2D dạng string (10x9)."""
+        sq = self.squares
+        return [[CODE_TO_CELL[sq[to_sq(r, c)]] for c in range(self.COLS)] for r in range(self.ROWS)]
+
+    @board.setter
+    def board(self, state: List[List[str]]) -> None:
+        squares = bytearray(_EMPTY_SQUARES)
         for r in range(self.ROWS):
             for c in range(self.COLS):
-                if self.board[r][c] == "rK":
-                    self.red_king = (r, c)
-                elif self.board[r][c] == "bK":
-                    self.black_king = (r, c)
+                code = CELL_TO_CODE.get(state[r][c])
+                if code is None:
+                    raise ValueError(f"Unknown cell at ({r}, {c}): {state[r][c]!r}")
+                squares[to_sq(r, c)] = code
+        self.squares = bytearray(_EMPTY_SQUARES)
+        self.piece_squares = [set(), set()]
+        self.occupancy = 0
+        self.file_occ = [0] * self.COLS
+        self.color_bb = [0, 0]
+        self.bitboards = [0] * (OFFBOARD + 1)
+        self.psq = [0, 0]
+        self.zobrist = ZOBRIST_SIDE if self.side_index else 0
+        for sq in ALL_SQUARES:
+            if squares[sq]:
+                self._put(sq, squares[sq])
+        self.update_king_positions()
+
+    @property
+    def side_to_move(self) -> str:
+        return "b" if self.side_index else "r"
+
+    def set_side_to_move(self, color: str) -> None:
+        side = 0 if color == "r" else 1
+        if side != self.side_index:
+            self.side_index = side
+            self.zobrist ^= ZOBRIST_SIDE
+
+    def compute_zobrist(self) -> int:
+        """Tính lại khoá từ đầu (để kiểm tra bản cập nhật tăng dần)."""
+        key = ZOBRIST_SIDE if self.side_index else 0
+        squares = self.squares
+        for sq in ALL_SQUARES:
+            if squares[sq]:
+                key ^= ZOBRIST_PIECE[squares[sq]][sq]
+        return key
+
+    def _put(self, sq: int, code: int) -> None:
+        """Đặt quân vào ô trống sq, cập nhật mọi cấu trúc phụ."""
+        bit = SQ_BIT[sq]
+        self.squares[sq] = code
+        self.piece_squares[color_index(code)].add(sq)
+        self.occupancy |= bit
+        self.file_occ[SQ_TO_RC[sq][1]] |= SQ_FILE_BIT[sq]
+        self.color_bb[color_index(code)] |= bit
+        self.bitboards[code] |= bit
+        self.psq[color_index(code)] += PIECE_SQUARE_VALUE[code][sq]
+        self.zobrist ^= ZOBRIST_PIECE[code][sq]
+
+    def _lift(self, sq: int) -> int:
+        """Nhấc quân khỏi ô sq (nếu có), trả về mã quân."""
+        code = self.squares[sq]
+        if code:
+            bit = SQ_BIT[sq]
+            self.squares[sq] = EMPTY_CODE
+            self.piece_squares[color_index(code)].discard(sq)
+            self.occupancy &= ~bit
+            self.file_occ[SQ_TO_RC[sq][1]] &= ~SQ_FILE_BIT[sq]
+            self.color_bb[color_index(code)] &= ~bit
+            self.bitboards[code] &= ~bit
+            self.psq[color_index(code)] -= PIECE_SQUARE_VALUE[code][sq]
+            self.zobrist ^= ZOBRIST_PIECE[code][sq]
+        return code
+
+    @property
+    def red_king(self) -> Optional[Tuple[int, int]]:
+        return SQ_TO_RC[self.king_sq[0]] if self.king_sq[0] else None
+
+    @property
+    def black_king(self) -> Optional[Tuple[int, int]]:
+        return SQ_TO_RC[self.king_sq[1]] if self.king_sq[1] else None
+
+    def pieces(self, color: str) -> Set[int]:
+        """Tập ô mailbox có quân màu color (không được sửa trực tiếp)."""
+        return self.piece_squares[0 if color == "r" else 1]
+
+    def piece_count(self, color: Optional[str] = None) -> int:
+        if color is None:
+            return len(self.piece_squares[0]) + len(self.piece_squares[1])
+        return len(self.pieces(color))
+
+    def update_king_positions(self) -> None:
+        self.king_sq = [0, 0]
+        squares = self.squares
+        for idx in (0, 1):
+            for sq in self.piece_squares[idx]:
+                if squares[sq] & TYPE_MASK == KING:
+                    self.king_sq[idx] = sq
 
     def _create_empty_board(self) -> List[List[str]]:
         return [["." for _ in range(self.COLS)] for _ in range(self.ROWS)]
-    
+
     def get(self, row: int, col: int) -> str:
-        return self.board[row][col]
-    
+        return CODE_TO_CELL[self.squares[to_sq(row, col)]]
+
     def set(self, row: int, col: int, value: str) -> None:
-        self.board[row][col] = value
-        
+        sq = to_sq(row, col)
+        code = CELL_TO_CODE[value]
+        old = self._lift(sq)
+
+        if old and old & TYPE_MASK == KING and self.king_sq[color_index(old)] == sq:
+            self.king_sq[color_index(old)] = 0
+        if code:
+            self._put(sq, code)
+            if code & TYPE_MASK == KING:
+                self.king_sq[color_index(code)] = sq
+
     def in_bounds(self, row: int, col: int) -> bool:
         return in_bounds(row, col)
-    
+
     def in_palace(self, row: int, col: int, color: str) -> bool:
         return in_palace(row, col, color)
-    
+
     def setup_initial(self):
-        self.board = self._create_empty_board()
+        board = self._create_empty_board()
 
         # --- BLACK ---
-        self.board[0] = ["bR","bN","bE","bA","bK","bA","bE","bN","bR"]
-        self.board[2][1] = "bC"
-        self.board[2][7] = "bC"
+        board[0] = ["bR","bN","bE","bA","bK","bA","bE","bN","bR"]
+        board[2][1] = "bC"
+        board[2][7] = "bC"
         for c in range(0, 9, 2):
-            self.board[3][c] = "bP"
+            board[3][c] = "bP"
 
         # --- RED ---
-        self.board[9] = ["rR","rN","rE","rA","rK","rA","rE","rN","rR"]
-        self.board[7][1] = "rC"
-        self.board[7][7] = "rC"
+        board[9] = ["rR","rN","rE","rA","rK","rA","rE","rN","rR"]
+        board[7][1] = "rC"
+        board[7][7] = "rC"
         for c in range(0, 9, 2):
-            self.board[6][c] = "rP"
+            board[6][c] = "rP"
 
-        self.update_king_positions()
-        
+        self.board = board
 
-    def apply_move(self, src: Tuple[int, int], dst: Tuple[int, int]) -> Move:
-        sr, sc = src
-        dr, dc = dst
+    # --- fast path cho AI: làm việc trực tiếp với ô mailbox & mã số ---
+    def move_piece(self, frm: int, to: int) -> int:
+        """Đi quân frm -> to, trả về mã quân bị ăn (EMPTY_CODE nếu không ăn)."""
+        squares = self.squares
+        moved = squares[frm]
+        captured = squares[to]
+        squares[to] = moved
+        squares[frm] = EMPTY_CODE
 
-        moved = self.get(sr, sc)
-        captured = self.get(dr, dc)
+        us = color_index(moved)
+        mine = self.piece_squares[us]
+        mine.discard(frm)
+        mine.add(to)
+        fb = SQ_BIT[frm]
+        tb = SQ_BIT[to]
+        self.occupancy = (self.occupancy ^ fb) | tb
+        file_occ = self.file_occ
+        file_occ[SQ_TO_RC[frm][1]] ^= SQ_FILE_BIT[frm]
+        file_occ[SQ_TO_RC[to][1]] |= SQ_FILE_BIT[to]
+        self.color_bb[us] ^= fb | tb
+        self.bitboards[moved] ^= fb | tb
+        keys = ZOBRIST_PIECE[moved]
+        self.zobrist ^= keys[frm] ^ keys[to] ^ ZOBRIST_SIDE
+        self.side_index ^= 1
+        values = PIECE_SQUARE_VALUE[moved]
+        psq = self.psq
+        psq[us] += values[to] - values[frm]
+        if moved & TYPE_MASK == KING:
+            self.king_sq[us] = to
+        if captured:
+            them = color_index(captured)
+            self.piece_squares[them].discard(to)
+            self.color_bb[them] ^= tb
+            self.bitboards[captured] ^= tb
+            psq[them] -= PIECE_SQUARE_VALUE[captured][to]
+            self.zobrist ^= ZOBRIST_PIECE[captured][to]
+            if captured & TYPE_MASK == KING:
+                self.king_sq[them] = 0
+        return captured
 
-        #move
-        self.set(sr, sc, EMPTY)
-        self.set(dr, dc, moved)
+    def unmove_piece(self, frm: int, to: int, captured: int) -> None:
+        squares = self.squares
+        moved = squares[to]
+        squares[frm] = moved
+        squares[to] = captured
 
-        if moved == "rK":
-            self.red_king = (dr, dc)
-        elif moved == "bK":
-            self.black_king = (dr, dc)
+        us = color_index(moved)
+        mine = self.piece_squares[us]
+        mine.discard(to)
+        mine.add(frm)
+        fb = SQ_BIT[frm]
+        tb = SQ_BIT[to]
+        file_occ = self.file_occ
+        file_occ[SQ_TO_RC[frm][1]] |= SQ_FILE_BIT[frm]
+        self.color_bb[us] ^= fb | tb
+        self.bitboards[moved] ^= fb | tb
+        keys = ZOBRIST_PIECE[moved]
+        self.zobrist ^= keys[frm] ^ keys[to] ^ ZOBRIST_SIDE
+        self.side_index ^= 1
+        values = PIECE_SQUARE_VALUE[moved]
+        psq = self.psq
+        psq[us] += values[frm] - values[to]
+        if moved & TYPE_MASK == KING:
+            self.king_sq[us] = frm
+        if captured:
+            them = color_index(captured)
+            self.occupancy |= fb
+            self.piece_squares[them].add(to)
+            self.color_bb[them] |= tb
+            self.bitboards[captured] |= tb
+            psq[them] += PIECE_SQUARE_VALUE[captured][to]
+            self.zobrist ^= ZOBRIST_PIECE[captured][to]
+            if captured & TYPE_MASK == KING:
+                self.king_sq[them] = to
+        else:
+            self.occupancy ^= fb | tb
+            file_occ[SQ_TO_RC[to][1]] ^= SQ_FILE_BIT[to]
 
-        return Move(src=src, dst=dst, moved=moved, captured=captured)
-    
-    def undo_move(self, move:Move) -> None:
-        sr, sc = move.src
-        dr, dc = move.dst
+    def make_move(self, move: int) -> None:
+        """Đi nước nén `move`, đẩy nước kèm mã quân đi / bị ăn vào undo_stack."""
+        frm = move & MOVE_SQ_MASK
+        moved = self.squares[frm]
+        captured = self.move_piece(frm, (move >> 8) & MOVE_SQ_MASK)
+        self.undo_stack.append((move & 0xFFFF) | (moved << MOVED_SHIFT) | (captured << CAPTURED_SHIFT))
 
-        self.set(sr, sc, move.moved if move.moved is not None else EMPTY)
-        self.set(dr, dc, move.captured if move.captured is not None else EMPTY)
+    def unmake_move(self) -> int:
+        """Hoàn tác nước cuối của make_move, trả về nước nén đầy đủ."""
+        move = self.undo_stack.pop()
+        self.unmove_piece(move & MOVE_SQ_MASK, (move >> 8) & MOVE_SQ_MASK, move >> CAPTURED_SHIFT)
+        return move
 
-        if move.moved == "rK":
-            self.red_king = (sr, sc)
-        elif move.moved == "bK":
-            self.black_king = (sr, sc)
+    def make_null_move(self) -> None:
+        """Bỏ lượt (null move cho tìm kiếm): chỉ đổi bên đi, đẩy 0 vào undo_stack."""
+        self.undo_stack.append(0)
+        self.side_index ^= 1
+        self.zobrist ^= ZOBRIST_SIDE
 
+    def unmake_null_move(self) -> None:
+        self.undo_stack.pop()
+        self.side_index ^= 1
+        self.zobrist ^= ZOBRIST_SIDE
 
+    def apply_move(self, src: Tuple[int, int], dst: Tuple[int, int]) -> Move:
+        frm = to_sq(*src)
+        moved = CODE_TO_CELL[self.squares[frm]]
+        captured = CODE_TO_CELL[self.move_piece(frm, to_sq(*dst))]
+        return Move(src=src, dst=dst, moved=moved, captured=captured)
+
+    def undo_move(self, move:Move) -> None:
+        captured = CELL_TO_CODE[move.captured if move.captured is not None else EMPTY]
+        self.unmove_piece(to_sq(*move.src), to_sq(*move.dst), captured)
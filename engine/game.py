@@ -15,8 +15,32 @@ class Game:
         self.turn: Color = Color.RED # đỏ đi đầu tiên
         self.status: GameStatus = GameStatus.ONGOING
         self.history: List[Move] = []
+        # SearchResult của lần ai_move_time gần nhất
+        self.last_search = None
         self._update_status()
 
+    @classmethod
+    def from_board(cls, board: Board, turn: Color) -> "Game":
+        """Game từ 1 thế cờ có sẵn (không dựng bàn cờ ban đầu rồi bỏ đi)."""
+        game = cls.__new__(cls)
+        game.board = board
+        game.turn = turn
+        game.status = GameStatus.ONGOING
+        game.history = []
+        game.last_search = None
+        game._update_status()
+        return game
+
+    @property
+    def turn(self) -> Color:
+        return self._turn
+
+    @turn.setter
+    def turn(self, value: Color) -> None:
+        # giữ bên đi của board (và khoá zobrist) khớp với lượt của game
+        self._turn = value
+        self.board.set_side_to_move(value.value)
+
     def _update_status(self) -> None:
 
         turn_color = self.turn.value
@@ -71,38 +95,35 @@ class Game:
     def get_status(self) -> str:
         return self.status.value
     
-    def ai_move_minimax(self, depth: int = 3) -> bool:
+    def ai_move_minimax(self, depth: int = 3, workers: int = 1, tt=None) -> bool:
+        """
+        workers > 1: tìm song song các nước gốc trên workers process (xem engine/ai/parallel_root.py).
+        tt: bảng chuyển vị dùng lại giữa các nước (mỗi nước là 1 lượt tìm kiếm mới của bảng).
+        """
         from engine.ai.search import find_best_move
 
         turn_color = self.turn.value
-        src, dst = find_best_move(self.board, turn_color, depth)        
+        if tt is not None:
+            tt.new_search()
+        src, dst = find_best_move(self.board, turn_color, depth, tt=tt, workers=workers)
 
         return self.make_move(src, dst)
     
-    def get_dynamic_time_limit(self) -> float:
-        piece_count = 0
-        for r in range(self.board.ROWS):
-            for c in range(self.board.COLS):
-                if self.board.get(r, c) != ".":
-                    piece_count += 1
-                    
-        if piece_count >= 24:
-            return 5.0
-        elif piece_count >= 12:
-            return 3.0
-        else:
-            return 1.5
-
-    def ai_move_time(self, time_limit_sec: Optional[float] = None, max_depth: int = 6) -> bool:
-        from engine.ai.time_search import best_move_with_time_limit
+    def ai_move_time(self, time_limit_sec: Optional[float] = None, max_depth: int = 6, threads: int = 1, tt=None) -> bool:
+        """tt: bảng chuyển vị dùng lại giữa các nước; kết quả tìm kiếm (PV, điểm) giữ ở self.last_search."""
+        from engine.ai.time_search import search_with_time_limit
+        from engine.ai.time_manager import TimeManager
 
         turn_color = self.turn.value
         
-        # Nếu chưa truyền thời gian, tự động cấp phát thông minh
+        # Nếu chưa truyền thời gian: hạn mềm / hạn cứng theo giai đoạn ván cờ
         if time_limit_sec is None:
-            time_limit_sec = self.get_dynamic_time_limit()
+            time_manager = TimeManager.for_board(self.board)
+        else:
+            time_manager = TimeManager.for_limit(time_limit_sec)
 
-        move = best_move_with_time_limit(self.board, turn_color, max_depth=max_depth, time_limit_sec=time_limit_sec)
+        self.last_search = search_with_time_limit(self.board, turn_color, max_depth, time_manager, threads, tt)
+        move = self.last_search.best_move
         
         if move is None:
             return False
@@ -1,6 +1,8 @@
 # Định nghĩa 1 nước đi
 from typing import Tuple, Optional
 
+from engine.utils.position import SQ_TO_RC
+
 
 class Move:
     # slot là giới hạn object chỉ được có những thuộc tính này
@@ -14,6 +16,44 @@ class Move:
 
     def __repr__(self) -> str:
         return f"Move(src={self.src}, dst={self.dst}, moved={self.moved}, captured={self.captured})"
-    
 
 
+# --- Nước đi nén trong 1 số nguyên (dùng cho AI) ---
+# bit  0-7 : ô đi (mailbox)
+# bit  8-15: ô đến (mailbox)
+# bit 16-21: mã quân đi
+# bit 22-27: mã quân bị ăn (0 = không ăn)
+MOVE_SQ_MASK = 0xFF
+MOVE_CODE_MASK = 0x3F
+MOVED_SHIFT = 16
+CAPTURED_SHIFT = 22
+NO_MOVE = 0
+
+
+def encode_move(frm: int, to: int, moved: int = 0, captured: int = 0) -> int:
+    return frm | (to << 8) | (moved << MOVED_SHIFT) | (captured << CAPTURED_SHIFT)
+
+
+def move_from(move: int) -> int:
+    return move & MOVE_SQ_MASK
+
+
+def move_to(move: int) -> int:
+    return (move >> 8) & MOVE_SQ_MASK
+
+
+def move_moved(move: int) -> int:
+    return (move >> MOVED_SHIFT) & MOVE_CODE_MASK
+
+
+def move_captured(move: int) -> int:
+    return move >> CAPTURED_SHIFT
+
+
+def same_squares(a: int, b: int) -> bool:
+    """2 nước có cùng ô đi / ô đến (bỏ qua phần mã quân)."""
+    return (a & 0xFFFF) == (b & 0xFFFF)
+
+
+def move_to_tuple(move: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    return SQ_TO_RC[move & MOVE_SQ_MASK], SQ_TO_RC[(move >> 8) & MOVE_SQ_MASK]
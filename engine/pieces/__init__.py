@@ -1,6 +1,6 @@
 # engine/pieces/__init__.py
 from typing import Optional
-from engine.utils.position import is_empty, color_of, type_of
+from engine.utils.position import is_empty
 
 from engine.pieces.rook import Rook
 from engine.pieces.knight import Knight
@@ -20,12 +20,10 @@ PIECE_CLASS = {
     "P": Pawn,
 }
 
+# piece object không giữ trạng thái ngoài màu -> tạo sẵn 1 object cho mỗi ô "rR", "bN", ...
+PIECES = {color + t: cls(color) for color in ("r", "b") for t, cls in PIECE_CLASS.items()}
+
 def piece_from_cell(cell: str):
     if is_empty(cell):
         return None
-    c = color_of(cell)   
-    t = type_of(cell)    
-    cls = PIECE_CLASS.get(t)
-    if cls is None:
-        return None
-    return cls(c)
+    return PIECES.get(cell)
@@ -0,0 +1,110 @@
+# Backend bitboard cho xe / pháo
+#
+# Mỗi hàng (9 ô) và mỗi cột (10 ô) có bảng tra tính sẵn theo occupancy của
+# hàng/cột đó, nên nước trượt của xe và nước ăn nhảy màn của pháo chỉ cần
+# 1 lần tra bảng cho hàng + 1 lần cho cột. Board giữ sẵn occupancy 90 bit
+# và file_occ theo cột (xem engine/board.py).
+from typing import List, Tuple
+
+from engine.board import Board
+from engine.utils.position import BIT_TO_SQ, SQ_TO_RC, to_sq
+from engine.utils.piece_codes import TYPE_MASK, ROOK, CANNON, KING, color_index
+
+RANK_MASK = (1 << 9) - 1
+
+def _slides(pos: int, occ: int, length: int) -> Tuple[int, int]:
+    """
+    (xe, pháo) trên 1 đường thẳng dài length từ vị trí pos:
+    - xe: các ô trống + quân chặn đầu tiên mỗi phía
+    - pháo (ăn): quân đầu tiên sau màn mỗi phía
+    """
+    rook = 0
+    cannon = 0
+    for step in (-1, 1):
+        i = pos + step
+        while 0 <= i < length and not occ >> i & 1:
+            rook |= 1 << i
+            i += step
+        if 0 <= i < length:
+            rook |= 1 << i
+            i += step
+            while 0 <= i < length and not occ >> i & 1:
+                i += step
+            if 0 <= i < length:
+                cannon |= 1 << i
+    return rook, cannon
+
+def _build(length: int) -> List[List[Tuple[int, int]]]:
+    return [[_slides(pos, occ, length) for occ in range(1 << length)] for pos in range(length)]
+
+# RANK_SLIDES[col][occ hàng] = (mask xe, mask pháo ăn), bit = col
+RANK_SLIDES = _build(9)
+# FILE_SLIDES[row][occ cột] = (mask xe, mask pháo ăn), bit = row
+FILE_SLIDES = _build(10)
+# mask 10 bit theo row -> bitboard cột 0 (bit row*9)
+FILE_SPREAD = [sum(1 << (r * 9) for r in range(10) if m >> r & 1) for m in range(1 << 10)]
+
+# bitboard cột 0 (đặt vào cột c bằng << c)
+FILE_MASK = FILE_SPREAD[(1 << 10) - 1]
+
+# bit index -> (row, col)
+BIT_TO_RC = tuple(SQ_TO_RC[sq] for sq in BIT_TO_SQ)
+
+def slider_targets(board: Board, row: int, col: int) -> Tuple[int, int]:
+    """(bitboard xe, bitboard pháo ăn) từ ô (row, col), chưa lọc màu."""
+    shift = row * 9
+    rank_rook, rank_cannon = RANK_SLIDES[col][(board.occupancy >> shift) & RANK_MASK]
+    file_rook, file_cannon = FILE_SLIDES[row][board.file_occ[col]]
+    rook = (rank_rook << shift) | (FILE_SPREAD[file_rook] << col)
+    cannon = (rank_cannon << shift) | (FILE_SPREAD[file_cannon] << col)
+    return rook, cannon
+
+def _bits_to_moves(targets: int) -> List[Tuple[int, int]]:
+    moves: List[Tuple[int, int]] = []
+    while targets:
+        low = targets & -targets
+        moves.append(BIT_TO_RC[low.bit_length() - 1])
+        targets ^= low
+    return moves
+
+def rook_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
+    piece = board.squares[to_sq(*src)]
+    if piece & TYPE_MASK != ROOK:
+        return []
+    rook, _ = slider_targets(board, src[0], src[1])
+    return _bits_to_moves(rook & ~board.color_bb[color_index(piece)])
+
+def cannon_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
+    piece = board.squares[to_sq(*src)]
+    if piece & TYPE_MASK != CANNON:
+        return []
+    rook, cannon = slider_targets(board, src[0], src[1])
+    enemy = board.color_bb[color_index(piece) ^ 1]
+    return _bits_to_moves((rook & ~board.occupancy) | (cannon & enemy))
+
+def _line_lookup(board: Board, src: Tuple[int, int], dst: Tuple[int, int], kind: int) -> bool:
+    sr, sc = src
+    dr, dc = dst
+    # coi ô đích như đang có quân (giống cách mailbox đếm màn tới đích)
+    if sr == dr:
+        occ = ((board.occupancy >> (sr * 9)) & RANK_MASK) | (1 << dc)
+        return bool(RANK_SLIDES[sc][occ][kind] >> dc & 1)
+    if sc == dc:
+        occ = board.file_occ[sc] | (1 << dr)
+        return bool(FILE_SLIDES[sr][occ][kind] >> dr & 1)
+    return False
+
+def rook_attacks(board: Board, src: Tuple[int, int], dst: Tuple[int, int]) -> bool:
+    return _line_lookup(board, src, dst, 0)
+
+def cannon_attacks(board: Board, src: Tuple[int, int], dst: Tuple[int, int]) -> bool:
+    return _line_lookup(board, src, dst, 1)
+
+def line_attacked(board: Board, sq: int, attacker: int, flying_general: bool) -> bool:
+    """Bản bitboard của check_rules.line_attacked: tra bảng từ ô sq rồi giao với bitboard xe/pháo/tướng địch."""
+    row, col = SQ_TO_RC[sq]
+    rook, cannon = slider_targets(board, row, col)
+    bitboards = board.bitboards
+    if rook & bitboards[attacker | ROOK] or cannon & bitboards[attacker | CANNON]:
+        return True
+    return flying_general and bool(rook & (FILE_MASK << col) & bitboards[attacker | KING])
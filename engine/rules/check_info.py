@@ -0,0 +1,124 @@
+# Thông tin chiếu / ghim của 1 thế cờ, tính 1 lần cho cả lượt sinh nước
+from typing import List, Set
+
+from engine.board import Board
+from engine.utils.piece_codes import (
+    EMPTY_CODE, COLOR_MASK, TYPE_MASK, ROOK, CANNON, KNIGHT, PAWN, KING, color_bit,
+)
+from engine.rules.tables import ORTHOGONAL, NORTH, SOUTH, KNIGHT_ATTACKERS, PAWN_ATTACKERS
+
+class CheckInfo:
+    """
+    Tính từ ô tướng của bên `color`:
+    - checkers: các ô quân địch đang chiếu
+    - evasions: ô mà quân mình đi tới có thể giải chiếu (ăn quân chiếu, cản đường xe/pháo, chặn chân mã)
+    - screens: ô quân mình đang làm màn cho pháo chiếu (đi khỏi đó là giải chiếu)
+    - pinned: ô quân mình mà đi khỏi có thể làm lộ tướng
+      (xe / tướng đối mặt phía sau, 2 quân giữa tướng và pháo, quân chặn chân mã đang nhắm tướng)
+    - hazards: ô trống giữa tướng và pháo địch chưa có màn (đi vào là tự làm màn)
+
+    Khi không bị chiếu: nước không phải của tướng, from không thuộc pinned và to
+    không thuộc hazards thì chắc chắn hợp lệ; chỉ các nước còn lại mới cần đi thử.
+    Khi bị chiếu: chỉ nước của tướng, nước tới evasions hoặc nhấc màn (screens)
+    mới có thể giải chiếu, và các nước đó đều phải đi thử.
+    """
+    __slots__ = ("king", "checkers", "evasions", "screens", "pinned", "hazards")
+
+    def __init__(self, board: Board, color: str):
+        self.king: int = board.king_sq[0 if color == "r" else 1]
+        self.checkers: List[int] = []
+        self.evasions: Set[int] = set()
+        self.screens: Set[int] = set()
+        self.pinned: Set[int] = set()
+        self.hazards: Set[int] = set()
+        if self.king:
+            self._scan(board, color)
+
+    @property
+    def in_check(self) -> bool:
+        return bool(self.checkers)
+
+    def _scan(self, board: Board, color: str) -> None:
+        squares = board.squares
+        king = self.king
+        mine = color_bit(color)
+        enemy = COLOR_MASK ^ mine
+
+        # xe / pháo / tướng đối mặt theo 4 hướng
+        for step in ORTHOGONAL:
+            empties: List[int] = []
+            found: List[int] = []
+            sq = king + step
+            while len(found) < 3:
+                code = squares[sq]
+                if code == EMPTY_CODE:
+                    if not found:
+                        empties.append(sq)
+                elif code & COLOR_MASK:
+                    found.append(sq)
+                else:
+                    break  # viền
+                sq += step
+            if not found:
+                continue
+
+            line_attacker = (ROOK, KING) if step in (NORTH, SOUTH) else (ROOK,)
+            p1 = found[0]
+            c1 = squares[p1]
+            if c1 & enemy and c1 & TYPE_MASK in line_attacker:
+                self._add_checker(p1, empties)
+            elif c1 & enemy and c1 & TYPE_MASK == CANNON:
+                self.hazards.update(empties)
+            if len(found) < 2:
+                continue
+
+            p2 = found[1]
+            c2 = squares[p2]
+            if c2 & enemy and c2 & TYPE_MASK == CANNON:
+                # pháo chiếu qua màn p1
+                self._add_checker(p2, empties + list(range(p1 + step, p2, step)))
+                if c1 & mine:
+                    self.screens.add(p1)
+            elif c2 & enemy and c2 & TYPE_MASK in line_attacker and c1 & mine:
+                self.pinned.add(p1)
+            if len(found) < 3:
+                continue
+
+            p3 = found[2]
+            c3 = squares[p3]
+            if c3 & enemy and c3 & TYPE_MASK == CANNON:
+                # 2 quân giữa tướng và pháo: quân nào của mình đi khỏi cũng thành màn
+                if c1 & mine:
+                    self.pinned.add(p1)
+                if c2 & mine:
+                    self.pinned.add(p2)
+
+        # mã: chân mã trống -> chiếu, chân mã là quân mình -> quân đó bị ghim
+        enemy_knight = enemy | KNIGHT
+        for src, leg in KNIGHT_ATTACKERS[king]:
+            if squares[src] != enemy_knight:
+                continue
+            leg_code = squares[leg]
+            if leg_code == EMPTY_CODE:
+                self._add_checker(src, [leg])
+            elif leg_code & mine:
+                self.pinned.add(leg)
+
+        # tốt
+        enemy_pawn = enemy | PAWN
+        for src in PAWN_ATTACKERS[1 if color == "r" else 0][king]:
+            if squares[src] == enemy_pawn:
+                self._add_checker(src, [])
+
+    def _add_checker(self, sq: int, blocks: List[int]) -> None:
+        self.checkers.append(sq)
+        self.evasions.add(sq)
+        self.evasions.update(blocks)
+
+    def needs_trial(self, frm: int, to: int) -> bool:
+        """Khi không bị chiếu: True nếu nước frm -> to phải đi thử mới biết có hợp lệ không."""
+        return frm == self.king or frm in self.pinned or to in self.hazards
+
+    def may_evade(self, frm: int, to: int) -> bool:
+        """Khi đang bị chiếu: nước này có khả năng giải chiếu không (nếu không thì chắc chắn phạm luật)."""
+        return frm == self.king or to in self.evasions or frm in self.screens
@@ -1,29 +1,31 @@
 # Chiếu, chiếu bí
 from typing import Tuple, Optional
 from engine.board import Board
-from engine.utils.position import is_empty, color_of, type_of
+from engine.utils.position import BOARD_WIDTH, to_sq
+from engine.utils.piece_codes import (
+    EMPTY_CODE, OFFBOARD, RED, TYPE_MASK, ROOK, CANNON, KNIGHT, PAWN, KING, color_bit,
+)
+from engine.rules.tables import NORTH, SOUTH, WEST, EAST, KNIGHT_ATTACKERS, PAWN_ATTACKERS
 
 def find_king(board: Board, color: str) -> Optional[Tuple[int, int]]:
     return board.red_king if color == 'r' else board.black_king
 
+def _line_blockers(board: Board, src: int, dst: int, sr: int, sc: int, kr: int, kc: int) -> int:
+    """Số quân nằm giữa src và dst (cùng hàng hoặc cùng cột)."""
+    squares = board.squares
+    step = (1 if sc < kc else -1) if sr == kr else (BOARD_WIDTH if sr < kr else -BOARD_WIDTH)
+    count = 0
+    for sq in range(src + step, dst, step):
+        if squares[sq] != EMPTY_CODE:
+            count += 1
+    return count
+
 def rook_attacks(board: Board, src: Tuple[int, int], dst: Tuple[int, int]) -> bool:
     sr, sc = src
     kr, kc = dst
     if sr != kr and sc != kc:
         return False
-
-    if sr == kr:
-        step = 1 if sc < kc else -1
-        for cc in range(sc + step, kc, step):
-            if not is_empty(board.get(sr, cc)):
-                return False
-    elif sc == kc:
-        step = 1 if sr < kr else -1
-        for rr in range(sr + step, kr, step):
-            if not is_empty(board.get(rr, sc)):
-                return False
-        
-    return True
+    return _line_blockers(board, to_sq(sr, sc), to_sq(kr, kc), sr, sc, kr, kc) == 0
 
 def cannon_attacks(board: Board, src: Tuple[int, int], dst: Tuple[int, int]) -> bool:
     sr, sc = src
@@ -32,97 +34,119 @@ def cannon_attacks(board: Board, src: Tuple[int, int], dst: Tuple[int, int]) ->
         return False
 
     # đếm quân cản đường
-    count = 0
-
-    if sr == kr:
-        step = 1 if sc < kc else -1
-        for cc in range(sc + step, kc, step):
-            if not is_empty(board.get(sr, cc)):
-                count += 1
-    elif sc == kc:
-        step = 1 if sr < kr else -1
-        for rr in range(sr + step, kr, step):
-            if not is_empty(board.get(rr, sc)):
-                count += 1
-        
-    return count == 1
+    return _line_blockers(board, to_sq(sr, sc), to_sq(kr, kc), sr, sc, kr, kc) == 1
 
 def knight_attacks(board: Board, src: Tuple[int, int], dst: Tuple[int, int]) -> bool:
     sr, sc = src
     kr, kc = dst
-    offsets = [(-2,-1),(-2,1),(-1,-2),(-1,2),(1,-2),(1,2),(2,1),(2,-1)]
-
-    for dr, dc in offsets:
-        nr, nc = sr + dr, sc + dc
-        obstacle_r: int = sr
-        obstacle_c: int = sc
-        if abs(dr) == 2:
-            obstacle_r = sr + dr // 2
-        elif abs(dc) == 2:
-            obstacle_c = sc + dc // 2
-        if (nr, nc) == dst:
-            return is_empty(board.get(obstacle_r, obstacle_c))
-    return False
+    dr, dc = kr - sr, kc - sc
+    if not ((abs(dr) == 2 and abs(dc) == 1) or (abs(dr) == 1 and abs(dc) == 2)):
+        return False
+    # chân mã
+    if abs(dr) == 2:
+        leg = to_sq(sr + dr // 2, sc)
+    else:
+        leg = to_sq(sr, sc + dc // 2)
+    return board.squares[leg] == EMPTY_CODE
 
 def pawn_attacks(board: Board, src: Tuple[int, int], dst: Tuple[int, int]) -> bool:
     sr, sc = src
     kr, kc = dst
-    if color_of(board.get(sr, sc)) == "b":
-        if sr <= 4:
-            return False
-        else:
-            if sr == kr and abs(sc - kc) == 1:
-                return True
-            elif kr - sr == 1 and sc == kc:
-                return True
-            else:
-                return False     
-    if color_of(board.get(sr, sc)) == "r":
-        if sr >= 5:
-            return False
-        else:
-            if sr == kr and abs(sc - kc) == 1:
-                return True
-            elif sr - kr == 1 and sc == kc:
-                return True
-            else:
-                return False 
+    piece = board.squares[to_sq(sr, sc)]
+    if not piece:
+        return False
+    if piece & RED:
+        forward = sr - kr == 1 and sc == kc
+        crossed = sr < 5
+    else:
+        forward = kr - sr == 1 and sc == kc
+        crossed = sr > 4
+    if forward:
+        return True
+    return crossed and sr == kr and abs(sc - kc) == 1
 
+def first_piece(board: Board, sq: int, step: int) -> int:
+    """Ô đầu tiên không trống tính từ sq theo hướng step (có thể là ô viền)."""
+    squares = board.squares
+    sq += step
+    while squares[sq] == EMPTY_CODE:
+        sq += step
+    return sq
+
+def line_attacked(board: Board, sq: int, attacker: int, flying_general: bool) -> bool:
+    """
+    Dò 4 hướng từ ô sq: quân đầu tiên là xe (hoặc tướng, theo cột, nếu flying_general)
+    hay quân thứ hai (sau màn) là pháo của bên attacker (bit màu).
+    """
+    squares = board.squares
+    rook = attacker | ROOK
+    cannon = attacker | CANNON
+    king = attacker | KING
+    for step in (NORTH, SOUTH, WEST, EAST):
+        s = sq + step
+        code = squares[s]
+        while code == EMPTY_CODE:
+            s += step
+            code = squares[s]
+        if code == rook:
+            return True
+        if code == king and flying_general and (step == NORTH or step == SOUTH):
+            return True
+        if code == OFFBOARD:
+            continue
+        # code là màn -> quân kế tiếp
+        s += step
+        code = squares[s]
+        while code == EMPTY_CODE:
+            s += step
+            code = squares[s]
+        if code == cannon:
+            return True
     return False
 
-            
+# xe/pháo: mặc định mailbox, move_rules.set_move_backend("bitboard") sẽ thay bằng bản bitboard
+SLIDER_ATTACKS = {ROOK: rook_attacks, CANNON: cannon_attacks}
+LINE_ATTACKS = {"attacked": line_attacked}
+
+def is_square_attacked(board: Board, sq: int, by_color: str, flying_general: bool = True) -> bool:
+    """
+    Ô mailbox sq có bị bên by_color tấn công không, dò ngược từ ô đích:
+    tia xe/pháo (đếm màn), vị trí mã có chân trống, ô tốt, và tướng đối mặt
+    (flying_general=False để bỏ qua luật lộ mặt tướng).
+    """
+    attacker = color_bit(by_color)
+    if LINE_ATTACKS["attacked"](board, sq, attacker, flying_general):
+        return True
+
+    squares = board.squares
+    knight = attacker | KNIGHT
+    for src, leg in KNIGHT_ATTACKERS[sq]:
+        if squares[src] == knight and squares[leg] == EMPTY_CODE:
+            return True
+
+    pawn = attacker | PAWN
+    for src in PAWN_ATTACKERS[0 if attacker == RED else 1][sq]:
+        if squares[src] == pawn:
+            return True
+    return False
 
 def attacks_square(board: Board, src: Tuple[int, int], dst: Tuple[int, int]) -> bool:
-    sr, sc = src
-    piece = board.get(sr, sc)
-    if is_empty(piece):
+    piece = board.squares[to_sq(*src)]
+    if piece == EMPTY_CODE:
         return False
     
-    t = type_of(piece)
-    if t == "R":
-        return rook_attacks(board, src, dst)
-    if t == "C":
-        return cannon_attacks(board, src, dst)
-    if t == "P":
+    t = piece & TYPE_MASK
+    if t == ROOK or t == CANNON:
+        return SLIDER_ATTACKS[t](board, src, dst)
+    if t == PAWN:
         return pawn_attacks(board, src, dst)
-    if t == "N":
+    if t == KNIGHT:
         return knight_attacks(board, src, dst)
     return False
 
-# check vua có bị chiếu không
+# check vua có bị chiếu không (không tính luật lộ mặt tướng, xem king_face_rule)
 def is_in_check(board: Board, color: str) -> bool:
-    king_pos = find_king(board=board, color=color)
-    if king_pos is None:
-        return False  
-    enemy = "r" if color == "b" else "b"
-    for i in range(Board.ROWS):
-        for j in range(Board.COLS):
-            piece = board.get(i, j)
-            if is_empty(piece):
-                continue
-            if color_of(piece) != enemy:
-                continue
-
-            if attacks_square(board=board, src=(i,j), dst=king_pos):
-                return True
-    return False
+    king = board.king_sq[0 if color == "r" else 1]
+    if not king:
+        return False
+    return is_square_attacked(board, king, "b" if color == "r" else "r", flying_general=False)
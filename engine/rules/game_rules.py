@@ -1,14 +1,10 @@
 # Tổng hợp rule
 from typing import Tuple, Optional, List
 from engine.board import Board
-from engine.utils.position import is_empty, color_of, same_color
-from engine.rules.move_rules import is_legal_basic_move
-from engine.rules.king_face_rule import kings_face_each_other
-from engine.rules.check_rules import is_in_check
-from engine.rules.move_rules import (
-    rook_moves, knight_moves, cannon_moves,
-    elephant_moves, advisor_moves, king_moves, pawn_moves
-)
+from engine.utils.position import SQ_TO_RC, is_empty, color_of, to_sq
+from engine.rules.move_rules import is_legal_basic_move, pseudo_moves
+from engine.rules.movegen import move_is_safe
+from engine.rules.check_info import CheckInfo
 
 def is_legal_move(board: Board, src: Tuple[int, int], dst: Tuple[int, int], turn_color: str) -> bool:
     """
@@ -30,53 +26,37 @@ def is_legal_move(board: Board, src: Tuple[int, int], dst: Tuple[int, int], turn
     if not is_legal_basic_move(board, src, dst):
         return False
     
-    undo_info = board.apply_move(src, dst)
+    return leaves_king_safe(board, to_sq(*src), to_sq(*dst), turn_color)
 
-    if kings_face_each_other(board):
-        board.undo_move(undo_info)
-        return False
-    
-    if is_in_check(board, turn_color):
-        board.undo_move(undo_info)
-        return False
-    
-    board.undo_move(undo_info)
-    return True
+def leaves_king_safe(board: Board, frm: int, to: int, color: str) -> bool:
+    """Đi thử frm -> to (ô mailbox): không king-face và không tự đưa tướng vào chiếu."""
+    return move_is_safe(board, frm | (to << 8), color)
 
 #    Quân src có thể đi tới đâu
-def pseudo_moves_of_piece(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
-    piece = board.get(*src)
-    t = piece[1]  # "R N C E A K P"
-    if t == "R": 
-        return rook_moves(board, src)
-    if t == "N": 
-        return knight_moves(board, src)
-    if t == "C": 
-        return cannon_moves(board, src)
-    if t == "E": 
-        return elephant_moves(board, src)
-    if t == "A": 
-        return advisor_moves(board, src)
-    if t == "K": 
-        return king_moves(board, src)
-    if t == "P": 
-        return pawn_moves(board, src)
-    return []
+def pseudo_moves_of_piece(board: Board, src: Tuple[int, int], backend: Optional[str] = None) -> List[Tuple[int, int]]:
+    return pseudo_moves(board, src, backend)
 
 #   bên color được phép đi những nước nào 
-def generate_legal_moves(board: Board, color: str) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+def generate_legal_moves(board: Board, color: str, backend: Optional[str] = None) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
     legal: List[Tuple[Tuple[int, int], Tuple[int, int]]] = []
 
-    for i in range(Board.ROWS):
-        for j in range(Board.COLS):
-            piece = board.get(i, j)
-            if is_empty(piece) or color_of(piece) != color:
-                continue
+    # Tính chiếu/ghim 1 lần cho cả thế cờ: đa số nước được nhận ngay, chỉ nước
+    # của tướng, quân bị ghim, nước vào ô "tự làm màn" hoặc nước giải chiếu mới phải đi thử.
+    info = CheckInfo(board, color)
+    in_check = info.in_check
 
-            src = (i, j)
-            for dst in pseudo_moves_of_piece(board, src):
-                if is_legal_move(board, src, dst, color):
-                    legal.append((src, dst))
+    # sorted: giữ thứ tự row-major như khi quét cả bàn (và đi thử sẽ sửa tập quân)
+    for frm in sorted(board.pieces(color)):
+        src = SQ_TO_RC[frm]
+        for dst in pseudo_moves(board, src, backend):
+            to = to_sq(*dst)
+            if in_check:
+                if not info.may_evade(frm, to):
+                    continue
+            elif not info.needs_trial(frm, to):
+                legal.append((src, dst))
+                continue
+            if leaves_king_safe(board, frm, to, color):
+                legal.append((src, dst))
 
     return legal
-    
\ No newline at end of file
@@ -1,33 +1,17 @@
 # Tướng đối mặt
 from typing import Optional, Tuple
 from engine.board import Board
-from engine.utils.position import is_empty
+from engine.rules.check_rules import first_piece
+from engine.rules.tables import NORTH, SOUTH
 
-def find_king(board: Board, color: str) -> Tuple[int, int]:
-    target = color+ "K"
-    for i in range(Board.ROWS):
-        for j in range(Board.COLS):
-            if board.get(i, j) == target:
-                return (i,j)
-    return None
+def find_king(board: Board, color: str) -> Optional[Tuple[int, int]]:
+    return board.red_king if color == "r" else board.black_king
 
 def kings_face_each_other(board: Board) -> bool:
-    red_pos = find_king(board=board, color="r")
-    black_pos = find_king(board=board, color="b")
+    red_sq, black_sq = board.king_sq
 
-    if red_pos is None and black_pos is None:
+    if not red_sq or not black_sq:
         return False
 
-    red_r, red_c = red_pos
-    black_r, black_c = black_pos
-
-    if red_c != black_c:
-        return False
-    
-    start = min(red_r, black_r)+1
-    end = max(red_r, black_r)
-    for i in range(start, end):
-        if not is_empty(board.get(i, red_c)):
-            return False
-        
-    return True
+    # dò tia theo cột từ tướng đỏ: quân đầu tiên gặp là tướng đen -> đối mặt
+    return first_piece(board, red_sq, NORTH) == black_sq or first_piece(board, red_sq, SOUTH) == black_sq
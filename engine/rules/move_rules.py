@@ -1,220 +1,195 @@
 # Luật đi cơ bản của quân
-from typing import List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from engine.board import Board
-from engine.utils.position import EMPTY, color_of, same_color, is_empty, type_of
-from engine.pieces import piece_from_cell
+from engine.utils.position import SQ_TO_RC, to_sq
+from engine.utils.piece_codes import (
+    EMPTY_CODE, COLOR_MASK, TYPE_MASK, ROOK, KNIGHT, CANNON, ELEPHANT, ADVISOR, KING, PAWN,
+    CHAR_TO_TYPE, color_index,
+)
+from engine.rules.tables import (
+    ORTHOGONAL, KNIGHT_MOVES, ELEPHANT_MOVES, ADVISOR_MOVES, KING_MOVES, PAWN_MOVES,
+)
+from engine.rules import bitboard, check_rules
+from engine.pieces import PIECE_CLASS
 
 def rook_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
-    sr, sc = src
-    piece = board.get(sr, sc)
+    squares = board.squares
+    frm = to_sq(*src)
+    piece = squares[frm]
 
-    if is_empty(piece) or type_of(piece) != "R":
+    if piece & TYPE_MASK != ROOK:
         return []
     
     moves: List[Tuple[int, int]] = []
-    my_color = color_of(piece)
-
-    directions = [(-1,0), (1,0), (0,-1), (0,1)]
-    for dr, dc in directions:
-        rook_r = dr+sr
-        rook_c = dc+sc
-        while board.in_bounds(rook_r, rook_c):
-            target = board.get(rook_r, rook_c)
-            if is_empty(target):
-                moves.append((rook_r, rook_c))
-            else:
-                if not same_color(piece, target):
-                    moves.append((rook_r, rook_c))
-                break
-
-            rook_r+=dr
-            rook_c+=dc
+    enemy = COLOR_MASK ^ (piece & COLOR_MASK)
+
+    for step in ORTHOGONAL:
+        to = frm + step
+        target = squares[to]
+        while target == EMPTY_CODE:
+            moves.append(SQ_TO_RC[to])
+            to += step
+            target = squares[to]
+        if target & enemy:
+            moves.append(SQ_TO_RC[to])
 
     return moves
 
 def knight_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
-    sr, sc = src
-    piece = board.get(sr, sc)
+    squares = board.squares
+    frm = to_sq(*src)
+    piece = squares[frm]
 
-    if is_empty(piece) or type_of(piece) != "N":
+    if piece & TYPE_MASK != KNIGHT:
         return []
     
     moves: List[Tuple[int, int]] = []
-    my_color = color_of(piece)
-
-    offsets = [(-2,-1),(-2,1),(-1,-2),(-1,2),(1,-2),(1,2),(2,1),(2,-1)]
-    for dr, dc in offsets:
-        knight_r = dr+sr
-        knight_c = dc+sc
-        if board.in_bounds(knight_r, knight_c):
-            target = board.get(knight_r, knight_c)
-            obstacle_r: int = 0
-            obstacle_c: int = 0
-            if abs(dr) == 2:
-                obstacle_r, obstacle_c = sr + dr//2, sc
-            else:
-                obstacle_r, obstacle_c = sr , sc + dc//2
-            obstacle = board.get(obstacle_r, obstacle_c)
-            if is_empty(obstacle):
-                if is_empty(target) or not same_color(piece, target):
-                    moves.append((knight_r, knight_c))
+    enemy = COLOR_MASK ^ (piece & COLOR_MASK)
+
+    for to, leg in KNIGHT_MOVES[frm]:
+        if squares[leg] == EMPTY_CODE:
+            target = squares[to]
+            if target == EMPTY_CODE or target & enemy:
+                moves.append(SQ_TO_RC[to])
 
     return moves
 
 def cannon_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
-    sr, sc = src
-    piece = board.get(sr, sc)
+    squares = board.squares
+    frm = to_sq(*src)
+    piece = squares[frm]
 
-    if is_empty(piece) or type_of(piece) != "C":
+    if piece & TYPE_MASK != CANNON:
         return []
     
     moves: List[Tuple[int, int]] = []
-    my_color = color_of(piece)
-    directions = [(-1,0), (1,0), (0,-1), (0,1)]
-
-    for dr, dc in directions:
-        cannon_r = dr + sr
-        cannon_c = dc + sc
-        jump = False
-        while board.in_bounds(cannon_r, cannon_c):
-            target = board.get(cannon_r, cannon_c)
-            if not jump:
-                if is_empty(target):
-                    moves.append((cannon_r, cannon_c))
-                else:
-                    jump = True
-            else:
-                if not is_empty(target):
-                    if not same_color(piece, target):
-                        moves.append((cannon_r, cannon_c))
-                    break 
-            cannon_r+= dr
-            cannon_c+= dc
+    enemy = COLOR_MASK ^ (piece & COLOR_MASK)
+
+    for step in ORTHOGONAL:
+        to = frm + step
+        target = squares[to]
+        while target == EMPTY_CODE:
+            moves.append(SQ_TO_RC[to])
+            to += step
+            target = squares[to]
+        # target là màn (hoặc viền) -> tìm quân đầu tiên sau màn
+        if target & COLOR_MASK:
+            to += step
+            target = squares[to]
+            while target == EMPTY_CODE:
+                to += step
+                target = squares[to]
+            if target & enemy:
+                moves.append(SQ_TO_RC[to])
 
     return moves
 
 def elephant_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
-    sr, sc = src
-    piece = board.get(sr, sc)
+    squares = board.squares
+    frm = to_sq(*src)
+    piece = squares[frm]
 
-    if is_empty(piece) or type_of(piece) != "E":
+    if piece & TYPE_MASK != ELEPHANT:
         return []
     
     moves: List[Tuple[int, int]] = []
-    my_color = color_of(piece)
-    
-    offsets = [(-2,-2),(-2,2),(2,-2),(2,2)]
-    for dr, dc in offsets:
-        elephant_r = dr + sr
-        elephant_c = dc + sc
-        if my_color == "b" and elephant_r > 4:
-            continue
-        if my_color == "r" and elephant_r < 5:
-            continue
-        if board.in_bounds(elephant_r, elephant_c):
-            target = board.get(elephant_r, elephant_c)
-            obstacle_r = sr + dr//2
-            obstacle_c = sc + dc//2
-            obstacle = board.get(obstacle_r, obstacle_c)
-            if is_empty(obstacle):
-                if is_empty(target) or not same_color(piece, target):
-                    moves.append((elephant_r, elephant_c))
+    enemy = COLOR_MASK ^ (piece & COLOR_MASK)
 
-    return moves
-
-def pawn_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
-    sr, sc = src
-    piece = board.get(sr, sc)
-
-    if is_empty(piece) or type_of(piece) != "P":
-        return []
-    
-    moves: List[Tuple[int, int]] = []
-    my_color = color_of(piece)
-    offsets = [(-1,0)] if my_color == "r" else [(1,0)]
-    if (my_color == "b" and sr > 4) or (my_color == "r" and sr < 5):
-        offsets += [(0,-1), (0,1)]
-     
-    for dr, dc in offsets:
-        pawn_r = dr+sr
-        pawn_c = dc+sc
-        if board.in_bounds(pawn_r, pawn_c):
-            target = board.get(pawn_r, pawn_c)
-            if is_empty(target) or not same_color(piece, target):
-                moves.append((pawn_r, pawn_c))
+    for to, eye in ELEPHANT_MOVES[color_index(piece)][frm]:
+        if squares[eye] == EMPTY_CODE:
+            target = squares[to]
+            if target == EMPTY_CODE or target & enemy:
+                moves.append(SQ_TO_RC[to])
 
     return moves
 
-def advisor_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
-    sr, sc = src
-    piece = board.get(sr, sc)
+def _step_moves(board: Board, src: Tuple[int, int], piece_type: int, table: List[List[Tuple[int, ...]]]) -> List[Tuple[int, int]]:
+    """Quân đi 1 bước theo bảng (tốt, sĩ, tướng): không có ô cản."""
+    squares = board.squares
+    frm = to_sq(*src)
+    piece = squares[frm]
 
-    if is_empty(piece) or type_of(piece) != "A":
+    if piece & TYPE_MASK != piece_type:
         return []
-    
-    moves: List[Tuple[int, int]] = []
-    my_color = color_of(piece)
 
-    offsets = [(-1,-1),(-1,1),(1,-1),(1,1)]
+    moves: List[Tuple[int, int]] = []
+    enemy = COLOR_MASK ^ (piece & COLOR_MASK)
 
-    for dr, dc in offsets:
-        advisor_r = dr+sr
-        advisor_c = dc+sc
-        if board.in_palace(advisor_r, advisor_c, my_color):
-            target = board.get(advisor_r, advisor_c)
-            if is_empty(target) or not same_color(piece, target):
-                moves.append((advisor_r, advisor_c))
+    for to in table[color_index(piece)][frm]:
+        target = squares[to]
+        if target == EMPTY_CODE or target & enemy:
+            moves.append(SQ_TO_RC[to])
 
     return moves
 
-def king_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
-    sr, sc = src
-    piece = board.get(sr, sc)
-
-    if is_empty(piece) or type_of(piece) != "K":
-        return []
-    
-    moves: List[Tuple[int, int]] = []
-    my_color = color_of(piece)
-
-    offsets = [(-1,0),(1,0),(0,-1),(0,1)]
+def pawn_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
+    return _step_moves(board, src, PAWN, PAWN_MOVES)
 
-    for dr, dc in offsets:
-        king_r = dr+sr
-        king_c = dc+sc
-        if board.in_palace(king_r, king_c, my_color):
-            target = board.get(king_r, king_c)
-            if is_empty(target) or not same_color(piece, target):
-                moves.append((king_r, king_c))
+def advisor_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
+    return _step_moves(board, src, ADVISOR, ADVISOR_MOVES)
 
-    return moves
+def king_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
+    return _step_moves(board, src, KING, KING_MOVES)
+
+# --- Backend sinh nước ---
+# Mọi nơi cần nước đi của 1 quân đều tra bảng PIECE_MOVES[loại quân] (index =
+# code & TYPE_MASK) thay vì chuỗi if theo type_of. Có 3 backend:
+# - "reference": class trong engine/pieces, đọc bàn cờ dạng string (chậm, để đối chiếu)
+# - "mailbox": bảng tính sẵn + mailbox (mặc định)
+# - "bitboard": như mailbox, riêng xe/pháo tra bảng occupancy hàng/cột
+# Chọn backend cho cả engine bằng set_move_backend (Django: setting
+# XIANGQI_MOVEGEN_BACKEND), hoặc truyền backend=... cho từng lời gọi.
+MoveFn = Callable[[Board, Tuple[int, int]], List[Tuple[int, int]]]
+
+def _move_table(**fns: MoveFn) -> List[Optional[MoveFn]]:
+    table: List[Optional[MoveFn]] = [None] * (TYPE_MASK + 1)
+    for ch, fn in fns.items():
+        table[CHAR_TO_TYPE[ch]] = fn
+    return table
+
+# Piece.moves đọc màu từ quân trên bàn nên 1 instance dùng chung cho cả 2 màu
+MOVE_BACKENDS: Dict[str, List[Optional[MoveFn]]] = {
+    "reference": _move_table(**{ch: cls("r").moves for ch, cls in PIECE_CLASS.items()}),
+    "mailbox": _move_table(
+        R=rook_moves, N=knight_moves, C=cannon_moves, E=elephant_moves,
+        A=advisor_moves, K=king_moves, P=pawn_moves,
+    ),
+    "bitboard": _move_table(
+        R=bitboard.rook_moves, N=knight_moves, C=bitboard.cannon_moves, E=elephant_moves,
+        A=advisor_moves, K=king_moves, P=pawn_moves,
+    ),
+}
+
+# bảng của backend đang dùng (sửa tại chỗ khi đổi backend để ai import trước vẫn thấy)
+PIECE_MOVES: List[Optional[MoveFn]] = list(MOVE_BACKENDS["mailbox"])
+ACTIVE_BACKEND = {"name": "mailbox"}
+
+def set_move_backend(name: str) -> None:
+    if name not in MOVE_BACKENDS:
+        raise ValueError(f"Unknown movegen backend: {name}")
+    PIECE_MOVES[:] = MOVE_BACKENDS[name]
+    # dò tấn công không có bản "reference" riêng -> dùng mailbox
+    if name == "bitboard":
+        check_rules.SLIDER_ATTACKS.update({ROOK: bitboard.rook_attacks, CANNON: bitboard.cannon_attacks})
+        check_rules.LINE_ATTACKS["attacked"] = bitboard.line_attacked
+    else:
+        check_rules.SLIDER_ATTACKS.update({ROOK: check_rules.rook_attacks, CANNON: check_rules.cannon_attacks})
+        check_rules.LINE_ATTACKS["attacked"] = check_rules.line_attacked
+    ACTIVE_BACKEND["name"] = name
+
+def get_move_backend() -> str:
+    return ACTIVE_BACKEND["name"]
+
+def move_table(backend: Optional[str] = None) -> List[Optional[MoveFn]]:
+    """Bảng dispatch của backend (None = backend đang dùng)."""
+    return PIECE_MOVES if backend is None else MOVE_BACKENDS[backend]
 
 # moves tổng quát
-def pseudo_moves(board: Board, src: Tuple[int, int]) -> List[Tuple[int, int]]:
-    piece = board.get(*src)
-    obj = piece_from_cell(piece)
-    if obj is None:
+def pseudo_moves(board: Board, src: Tuple[int, int], backend: Optional[str] = None) -> List[Tuple[int, int]]:
+    fn = move_table(backend)[board.squares[to_sq(*src)] & TYPE_MASK]
+    if fn is None:
         return []
-    return obj.moves(board, src)
-
-def is_legal_basic_move(board: Board, src: Tuple[int, int], dst: Tuple[int, int]) -> bool:
-    sr, sc = src
-    piece = board.get(sr, sc)
+    return fn(board, src)
 
-    if is_empty(piece):
-        return False
-    
-    if type_of(piece) == "R":
-        return dst in rook_moves(board=board, src=src)
-    if type_of(piece) == "N":
-        return dst in knight_moves(board=board, src=src)
-    if type_of(piece) == "C":
-        return dst in cannon_moves(board=board, src=src)
-    if type_of(piece) == "E":
-        return dst in elephant_moves(board=board, src=src)
-    if type_of(piece) == "P":
-        return dst in pawn_moves(board=board, src=src)
-    if type_of(piece) == "A":
-        return dst in advisor_moves(board=board, src=src)
-    if type_of(piece) == "K":
-        return dst in king_moves(board=board, src=src)
\ No newline at end of file
+def is_legal_basic_move(board: Board, src: Tuple[int, int], dst: Tuple[int, int], backend: Optional[str] = None) -> bool:
+    return dst in pseudo_moves(board, src, backend)
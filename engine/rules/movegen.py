@@ -0,0 +1,243 @@
+# Sinh nước dạng số nguyên nén (engine/move.py) vào buffer dùng lại được
+#
+# Các hàm ở đây không tạo list mới: caller truyền vào 1 list (thường là buffer
+# theo ply của search), hàm chỉ append / xoá phần đuôi.
+from typing import Iterable, List, Optional
+
+from engine.board import Board
+from engine.move import MOVED_SHIFT, CAPTURED_SHIFT
+from engine.utils.position import BOARD_WIDTH, BIT_TO_SQ, SQ_TO_RC, to_sq
+from engine.utils.piece_codes import (
+    EMPTY_CODE, COLOR_MASK, TYPE_MASK, ROOK, KNIGHT, CANNON, ELEPHANT, ADVISOR, PAWN, color_bit,
+)
+from engine.rules.tables import (
+    ORTHOGONAL, KNIGHT_MOVES, ELEPHANT_MOVES, ADVISOR_MOVES, KING_MOVES, PAWN_MOVES,
+)
+from engine.rules.check_info import CheckInfo
+from engine.rules.check_rules import is_square_attacked
+from engine.rules.bitboard import slider_targets
+from engine.rules.move_rules import ACTIVE_BACKEND, MOVE_BACKENDS
+
+def gen_pseudo_moves(board: Board, color: str, buf: List[int], captures: bool = True, quiets: bool = True, sources: Optional[Iterable[int]] = None, backend: Optional[str] = None) -> None:
+    """
+    Append nước giả hợp lệ (đúng luật quân, chưa xét tự chiếu) của color vào buf.
+    captures / quiets chọn sinh nước ăn quân và/hoặc nước không ăn quân.
+    sources: chỉ sinh cho các ô này (mặc định mọi quân của color, theo thứ tự row-major).
+    backend: xem move_rules.MOVE_BACKENDS (None = backend đang dùng).
+    """
+    squares = board.squares
+    mine = color_bit(color)
+    enemy = COLOR_MASK ^ mine
+    ci = 0 if color == "r" else 1
+    # sorted: thứ tự row-major, giống khi quét cả bàn
+    if sources is None:
+        sources = sorted(board.piece_squares[ci])
+
+    if backend is None:
+        backend = ACTIVE_BACKEND["name"]
+    if backend == "reference":
+        _gen_from_table(board, buf, captures, quiets, sources, MOVE_BACKENDS[backend])
+        return
+    use_bitboard = backend == "bitboard"
+    # bitboard: ô đích của xe/pháo lọc theo màu bằng 2 mask này
+    empty_bb = ~board.occupancy if quiets else 0
+    enemy_bb = board.color_bb[ci ^ 1] if captures else 0
+
+    append = buf.append
+    # ô đích chấp nhận được: trống (nếu sinh quiets), quân địch (nếu sinh captures)
+    empty_ok = quiets
+    enemy_mask = enemy if captures else 0
+
+    for frm in sources:
+        piece = squares[frm]
+        t = piece & TYPE_MASK
+        base = frm | (piece << MOVED_SHIFT)
+
+        if use_bitboard and (t == ROOK or t == CANNON):
+            row, col = SQ_TO_RC[frm]
+            rook, cannon = slider_targets(board, row, col)
+            targets = (rook & empty_bb) | ((rook if t == ROOK else cannon) & enemy_bb)
+            while targets:
+                low = targets & -targets
+                to = BIT_TO_SQ[low.bit_length() - 1]
+                append(base | (to << 8) | (squares[to] << CAPTURED_SHIFT))
+                targets ^= low
+        elif t == ROOK or t == CANNON:
+            for step in ORTHOGONAL:
+                to = frm + step
+                target = squares[to]
+                while target == EMPTY_CODE:
+                    if empty_ok:
+                        append(base | (to << 8))
+                    to += step
+                    target = squares[to]
+                if t == ROOK:
+                    if target & enemy_mask:
+                        append(base | (to << 8) | (target << CAPTURED_SHIFT))
+                elif enemy_mask and target & COLOR_MASK:
+                    to += step
+                    target = squares[to]
+                    while target == EMPTY_CODE:
+                        to += step
+                        target = squares[to]
+                    if target & enemy_mask:
+                        append(base | (to << 8) | (target << CAPTURED_SHIFT))
+        elif t == KNIGHT or t == ELEPHANT:
+            table = KNIGHT_MOVES[frm] if t == KNIGHT else ELEPHANT_MOVES[ci][frm]
+            for to, block in table:
+                if squares[block] == EMPTY_CODE:
+                    target = squares[to]
+                    if (target == EMPTY_CODE and empty_ok) or target & enemy_mask:
+                        append(base | (to << 8) | (target << CAPTURED_SHIFT))
+        else:
+            if t == PAWN:
+                table = PAWN_MOVES[ci][frm]
+            elif t == ADVISOR:
+                table = ADVISOR_MOVES[ci][frm]
+            else:
+                table = KING_MOVES[ci][frm]
+            for to in table:
+                target = squares[to]
+                if (target == EMPTY_CODE and empty_ok) or target & enemy_mask:
+                    append(base | (to << 8) | (target << CAPTURED_SHIFT))
+
+def _gen_from_table(board: Board, buf: List[int], captures: bool, quiets: bool, sources: Iterable[int], table) -> None:
+    """Sinh nước nén qua bảng dispatch dạng tuple (backend reference)."""
+    squares = board.squares
+    for frm in sources:
+        piece = squares[frm]
+        base = frm | (piece << MOVED_SHIFT)
+        for dst in table[piece & TYPE_MASK](board, SQ_TO_RC[frm]):
+            to = to_sq(*dst)
+            target = squares[to]
+            if (captures if target else quiets):
+                buf.append(base | (to << 8) | (target << CAPTURED_SHIFT))
+
+def is_pseudo_legal(board: Board, move: int, color: str) -> bool:
+    """
+    Nước nén (vd. hash move / killer lấy từ node khác) còn đúng luật quân trên
+    bàn hiện tại không: quân đi và quân bị ăn phải khớp với mã trong nước.
+    """
+    squares = board.squares
+    frm = move & 0xFF
+    to = (move >> 8) & 0xFF
+    piece = squares[frm]
+    if piece != (move >> MOVED_SHIFT) & 0x3F or piece & COLOR_MASK != color_bit(color):
+        return False
+    target = squares[to]
+    if target != move >> CAPTURED_SHIFT:
+        return False
+
+    t = piece & TYPE_MASK
+    ci = 0 if color == "r" else 1
+    if t == ROOK or t == CANNON:
+        fr, fc = SQ_TO_RC[frm]
+        tr, tc = SQ_TO_RC[to]
+        if fr == tr:
+            step = 1 if to > frm else -1
+        elif fc == tc:
+            step = BOARD_WIDTH if to > frm else -BOARD_WIDTH
+        else:
+            return False
+        between = 0
+        for sq in range(frm + step, to, step):
+            if squares[sq] != EMPTY_CODE:
+                between += 1
+        if t == ROOK or target == EMPTY_CODE:
+            return between == 0
+        return between == 1
+    if t == KNIGHT or t == ELEPHANT:
+        table = KNIGHT_MOVES[frm] if t == KNIGHT else ELEPHANT_MOVES[ci][frm]
+        for dest, block in table:
+            if dest == to:
+                return squares[block] == EMPTY_CODE
+        return False
+    if t == PAWN:
+        return to in PAWN_MOVES[ci][frm]
+    if t == ADVISOR:
+        return to in ADVISOR_MOVES[ci][frm]
+    return to in KING_MOVES[ci][frm]
+
+def is_legal(board: Board, move: int, color: str, info: CheckInfo) -> bool:
+    """Nước giả hợp lệ có hợp lệ thật không, dùng CheckInfo để tránh đi thử khi có thể."""
+    frm = move & 0xFF
+    to = (move >> 8) & 0xFF
+    if info.checkers:
+        return info.may_evade(frm, to) and move_is_safe(board, move, color)
+    return not info.needs_trial(frm, to) or move_is_safe(board, move, color)
+
+def move_is_safe(board: Board, move: int, color: str) -> bool:
+    """Đi thử nước nén: tướng bên color không bị tấn công (kể cả lộ mặt tướng)."""
+    frm = move & 0xFF
+    to = (move >> 8) & 0xFF
+    captured = board.move_piece(frm, to)
+    try:
+        king = board.king_sq[0 if color == "r" else 1]
+        # is_square_attacked tính cả luật lộ mặt tướng -> 1 lần dò thay cho king-face + is_in_check
+        return not king or not is_square_attacked(board, king, "b" if color == "r" else "r")
+    finally:
+        board.unmove_piece(frm, to, captured)
+
+def filter_legal(board: Board, color: str, buf: List[int], start: int = 0, info: CheckInfo = None) -> None:
+    """Lọc tại chỗ buf[start:] chỉ giữ nước hợp lệ, dùng CheckInfo để tránh đi thử phần lớn nước."""
+    if info is None:
+        info = CheckInfo(board, color)
+    in_check = info.in_check
+    n = start
+    for i in range(start, len(buf)):
+        move = buf[i]
+        frm = move & 0xFF
+        to = (move >> 8) & 0xFF
+        if in_check:
+            if not info.may_evade(frm, to) or not move_is_safe(board, move, color):
+                continue
+        elif info.needs_trial(frm, to) and not move_is_safe(board, move, color):
+            continue
+        buf[n] = move
+        n += 1
+    del buf[n:]
+
+def gen_legal_moves(board: Board, color: str, buf: List[int], backend: Optional[str] = None) -> None:
+    """Append mọi nước hợp lệ của color vào buf."""
+    start = len(buf)
+    gen_pseudo_moves(board, color, buf, backend=backend)
+    filter_legal(board, color, buf, start)
+
+def generate_captures(board: Board, color: str, buf: Optional[List[int]] = None, info: Optional[CheckInfo] = None) -> List[int]:
+    """Nước ăn quân hợp lệ của color (append vào buf nếu có), không sinh nước thường."""
+    if buf is None:
+        buf = []
+    start = len(buf)
+    gen_pseudo_moves(board, color, buf, True, False)
+    filter_legal(board, color, buf, start, info)
+    return buf
+
+def generate_evasions(board: Board, color: str, buf: Optional[List[int]] = None, info: Optional[CheckInfo] = None) -> List[int]:
+    """
+    Nước giải chiếu hợp lệ của color (đang bị chiếu). Chỉ sinh nước của tướng,
+    của quân đang làm màn cho pháo chiếu, và nước của quân khác tới ô evasions
+    (ăn quân chiếu / cản đường / chặn chân mã), thay vì sinh mọi nước rồi lọc.
+    """
+    if buf is None:
+        buf = []
+    if info is None:
+        info = CheckInfo(board, color)
+    start = len(buf)
+    squares = board.squares
+    king = info.king
+    screens = info.screens
+
+    mine = sorted(board.piece_squares[0 if color == "r" else 1])
+    movers = [sq for sq in mine if sq == king or sq in screens]
+    gen_pseudo_moves(board, color, buf, sources=movers)
+    targets = sorted(info.evasions)
+    for frm in mine:
+        if frm == king or frm in screens:
+            continue
+        base = frm | (squares[frm] << MOVED_SHIFT)
+        for to in targets:
+            move = base | (to << 8) | (squares[to] << CAPTURED_SHIFT)
+            if is_pseudo_legal(board, move, color):
+                buf.append(move)
+    filter_legal(board, color, buf, start, info)
+    return buf
@@ -0,0 +1,108 @@
+# Bảng nước đi tính sẵn (1 lần lúc import) cho mã, tượng, sĩ, tướng, tốt
+from typing import List, Tuple
+
+from engine.utils.position import BOARD_SIZE, BOARD_WIDTH, ALL_SQUARES, SQ_TO_RC, in_bounds, in_palace, to_sq
+
+# các bảng đánh chỉ số theo ô mailbox; bảng theo màu dùng index 0 = đỏ, 1 = đen
+COLORS = ("r", "b")
+
+def _crossed_river(color: str, row: int) -> bool:
+    return row < 5 if color == "r" else row > 4
+
+def _on_own_side(color: str, row: int) -> bool:
+    return row >= 5 if color == "r" else row <= 4
+
+def _build_knight() -> List[Tuple[Tuple[int, int], ...]]:
+    """KNIGHT_MOVES[sq] = ((đích, chân mã), ...)"""
+    table: List[Tuple[Tuple[int, int], ...]] = [()] * BOARD_SIZE
+    offsets = [(-2,-1),(-2,1),(-1,-2),(-1,2),(1,-2),(1,2),(2,1),(2,-1)]
+    for sq in ALL_SQUARES:
+        r, c = SQ_TO_RC[sq]
+        entries = []
+        for dr, dc in offsets:
+            if not in_bounds(r + dr, c + dc):
+                continue
+            if abs(dr) == 2:
+                leg = to_sq(r + dr // 2, c)
+            else:
+                leg = to_sq(r, c + dc // 2)
+            entries.append((to_sq(r + dr, c + dc), leg))
+        table[sq] = tuple(entries)
+    return table
+
+def _build_elephant() -> List[List[Tuple[Tuple[int, int], ...]]]:
+    """ELEPHANT_MOVES[color][sq] = ((đích, mắt tượng), ...), không qua sông."""
+    tables = []
+    for color in COLORS:
+        table: List[Tuple[Tuple[int, int], ...]] = [()] * BOARD_SIZE
+        for sq in ALL_SQUARES:
+            r, c = SQ_TO_RC[sq]
+            entries = []
+            for dr, dc in [(-2,-2),(-2,2),(2,-2),(2,2)]:
+                nr, nc = r + dr, c + dc
+                if in_bounds(nr, nc) and _on_own_side(color, nr):
+                    entries.append((to_sq(nr, nc), to_sq(r + dr // 2, c + dc // 2)))
+            table[sq] = tuple(entries)
+        tables.append(table)
+    return tables
+
+def _build_palace(offsets: List[Tuple[int, int]]) -> List[List[Tuple[int, ...]]]:
+    tables = []
+    for color in COLORS:
+        table: List[Tuple[int, ...]] = [()] * BOARD_SIZE
+        for sq in ALL_SQUARES:
+            r, c = SQ_TO_RC[sq]
+            table[sq] = tuple(
+                to_sq(r + dr, c + dc) for dr, dc in offsets if in_palace(r + dr, c + dc, color)
+            )
+        tables.append(table)
+    return tables
+
+def _build_pawn() -> List[List[Tuple[int, ...]]]:
+    tables = []
+    for color in COLORS:
+        forward = -1 if color == "r" else 1
+        table: List[Tuple[int, ...]] = [()] * BOARD_SIZE
+        for sq in ALL_SQUARES:
+            r, c = SQ_TO_RC[sq]
+            offsets = [(forward, 0)]
+            if _crossed_river(color, r):
+                offsets += [(0, -1), (0, 1)]
+            table[sq] = tuple(to_sq(r + dr, c + dc) for dr, dc in offsets if in_bounds(r + dr, c + dc))
+        tables.append(table)
+    return tables
+
+KNIGHT_MOVES = _build_knight()
+ELEPHANT_MOVES = _build_elephant()
+ADVISOR_MOVES = _build_palace([(-1,-1),(-1,1),(1,-1),(1,1)])
+KING_MOVES = _build_palace([(-1,0),(1,0),(0,-1),(0,1)])
+PAWN_MOVES = _build_pawn()
+
+# bước đi trên mailbox cho xe / pháo
+NORTH = -BOARD_WIDTH
+SOUTH = BOARD_WIDTH
+WEST = -1
+EAST = 1
+ORTHOGONAL = (NORTH, SOUTH, WEST, EAST)
+
+def _build_knight_attackers() -> List[Tuple[Tuple[int, int], ...]]:
+    """KNIGHT_ATTACKERS[sq] = ((ô mã, chân mã), ...): mã đứng ở đâu thì đá được sq."""
+    table: List[List[Tuple[int, int]]] = [[] for _ in range(BOARD_SIZE)]
+    for src in ALL_SQUARES:
+        for to, leg in KNIGHT_MOVES[src]:
+            table[to].append((src, leg))
+    return [tuple(entries) for entries in table]
+
+def _build_pawn_attackers() -> List[List[Tuple[int, ...]]]:
+    """PAWN_ATTACKERS[color][sq] = các ô mà tốt màu color đứng đó sẽ ăn được sq."""
+    tables = []
+    for moves in PAWN_MOVES:
+        table: List[List[int]] = [[] for _ in range(BOARD_SIZE)]
+        for src in ALL_SQUARES:
+            for to in moves[src]:
+                table[to].append(src)
+        tables.append([tuple(entries) for entries in table])
+    return tables
+
+KNIGHT_ATTACKERS = _build_knight_attackers()
+PAWN_ATTACKERS = _build_pawn_attackers()
@@ -94,6 +94,9 @@ def load_fen(board: Board, fen: str) -> Optional[str]:
         if col != board.COLS:
             raise ValueError(f"Row {r} has {col} cols, expected {board.COLS}")
 
+    if turn is not None:
+        board.set_side_to_move(turn)
+    # board setter tính lại vị trí tướng + khoá zobrist
     board.board = new_board
     board.update_king_positions()
     return turn
@@ -0,0 +1,54 @@
+# Mã quân dạng số nguyên nhỏ, dùng trong mailbox của Board
+from typing import Dict, List
+
+from engine.utils.position import EMPTY
+
+# loại quân: 3 bit thấp
+KING = 1
+ADVISOR = 2
+ELEPHANT = 3
+KNIGHT = 4
+ROOK = 5
+CANNON = 6
+PAWN = 7
+TYPE_MASK = 7
+
+# màu: 2 bit tiếp theo
+RED = 8
+BLACK = 16
+COLOR_MASK = RED | BLACK
+
+EMPTY_CODE = 0
+OFFBOARD = 32  # ô viền: không phải quân, không có màu
+
+TYPE_CHARS: Dict[int, str] = {
+    KING: "K",
+    ADVISOR: "A",
+    ELEPHANT: "E",
+    KNIGHT: "N",
+    ROOK: "R",
+    CANNON: "C",
+    PAWN: "P",
+}
+CHAR_TO_TYPE: Dict[str, int] = {v: k for k, v in TYPE_CHARS.items()}
+
+COLOR_BITS: Dict[str, int] = {"r": RED, "b": BLACK}
+BIT_TO_COLOR: Dict[int, str] = {RED: "r", BLACK: "b"}
+
+# "rR" -> code, code -> "rR"
+CELL_TO_CODE: Dict[str, int] = {EMPTY: EMPTY_CODE}
+CODE_TO_CELL: List[str] = [EMPTY] * (OFFBOARD + 1)
+for _color, _bit in COLOR_BITS.items():
+    for _t, _ch in TYPE_CHARS.items():
+        CELL_TO_CODE[_color + _ch] = _bit | _t
+        CODE_TO_CELL[_bit | _t] = _color + _ch
+
+def color_bit(color: str) -> int:
+    return RED if color == "r" else BLACK
+
+def enemy_bit(color: str) -> int:
+    return BLACK if color == "r" else RED
+
+def color_index(code: int) -> int:
+    """0 = đỏ, 1 = đen (dùng cho các mảng theo màu)."""
+    return (code >> 4) & 1
@@ -2,6 +2,11 @@ from typing import Optional, Tuple
 
 EMPTY = "."
 
+# Mailbox có viền: mỗi hàng rộng 11 ô (1 ô viền mỗi bên) và thêm 2 hàng viền
+# trên/dưới, để bước mã/tượng (±2) từ ô hợp lệ luôn rơi vào ô viền chứ không ra ngoài mảng.
+BOARD_WIDTH = 11
+BOARD_SIZE = 14 * BOARD_WIDTH
+
 def in_bounds(row: int, col: int) -> bool:
     return 0 <= row < 10 and 0 <= col < 9
 
@@ -11,6 +16,32 @@ def in_palace(row: int, col: int, color: str) -> bool:
     else:
         return (3 <= col <= 5) and (7 <= row <= 9) 
 
+def to_sq(row: int, col: int) -> int:
+    """(row, col) -> chỉ số ô trong mailbox."""
+    return (row + 2) * BOARD_WIDTH + col + 1
+
+# chỉ số ô mailbox -> (row, col); ô viền là None
+SQ_TO_RC: Tuple[Optional[Tuple[int, int]], ...] = tuple(
+    (sq // BOARD_WIDTH - 2, sq % BOARD_WIDTH - 1)
+    if in_bounds(sq // BOARD_WIDTH - 2, sq % BOARD_WIDTH - 1) else None
+    for sq in range(BOARD_SIZE)
+)
+
+# 90 ô hợp lệ theo thứ tự row-major
+ALL_SQUARES: Tuple[int, ...] = tuple(to_sq(r, c) for r in range(10) for c in range(9))
+
+# bitboard: bit (row * 9 + col) của số nguyên 90 bit
+# SQ_BIT[sq] = 1 << (row * 9 + col), SQ_FILE_BIT[sq] = 1 << row (occupancy theo cột); ô viền = 0
+SQ_BIT: Tuple[int, ...] = tuple(
+    1 << (rc[0] * 9 + rc[1]) if rc is not None else 0 for rc in SQ_TO_RC
+)
+SQ_FILE_BIT: Tuple[int, ...] = tuple(1 << rc[0] if rc is not None else 0 for rc in SQ_TO_RC)
+# chỉ số bit -> ô mailbox
+BIT_TO_SQ: Tuple[int, ...] = ALL_SQUARES
+
+def from_sq(sq: int) -> Tuple[int, int]:
+    return SQ_TO_RC[sq]
+
 def is_empty(cell: str) -> bool:
     return cell == EMPTY
 
@@ -26,4 +57,4 @@ def same_color(a: str, b: str) -> bool:
     return ca is not None and ca == cb
 
 def enemy_color(color: str) -> str:
-    return "r" if color == "b" else "b"
\ No newline at end of file
+    return "r" if color == "b" else "b"
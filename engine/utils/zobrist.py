@@ -0,0 +1,16 @@
+# Khoá Zobrist 64 bit: XOR số ngẫu nhiên của từng (quân, ô) + bên đi
+import random
+from typing import List
+
+from engine.utils.position import BOARD_SIZE
+from engine.utils.piece_codes import OFFBOARD
+
+# seed cố định: khoá giống nhau giữa các lần chạy / các process (TT dùng chung, log, test)
+_rng = random.Random(0x5A0B1257)
+
+# ZOBRIST_PIECE[code][sq], code = mã quân (engine/utils/piece_codes.py), sq = ô mailbox
+ZOBRIST_PIECE: List[List[int]] = [
+    [_rng.getrandbits(64) for _ in range(BOARD_SIZE)] for _ in range(OFFBOARD + 1)
+]
+# XOR vào khi đen đi
+ZOBRIST_SIDE: int = _rng.getrandbits(64)
@@ -0,0 +1,49 @@
+# So sánh tốc độ sinh nước giữa các backend (reference / mailbox / bitboard)
+import time
+
+from engine.board import Board
+from engine.rules.game_rules import generate_legal_moves
+from engine.rules.movegen import gen_legal_moves
+from engine.rules.move_rules import MOVE_BACKENDS, set_move_backend
+from engine.serializer.fen import load_fen
+
+POSITIONS = [
+    "rneakaenr/9/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/9/RNEAKAENR r",
+    "r1eakae1r/9/1cn4cn/p1p1p1p1p/9/9/P1P1P1P1P/1C2C1N2/9/RNEAKAE1R b",
+    "3akae2/9/4e4/p3p3p/2p3c2/6R2/P1P1P3P/4C3N/9/2EAKAE2 b",
+]
+
+
+def bench(backend: str, repeat: int = 200) -> tuple:
+    set_move_backend(backend)
+    boards = []
+    for fen in POSITIONS:
+        b = Board()
+        turn = load_fen(b, fen) or "r"
+        boards.append((b, turn))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for b, turn in boards:
+            generate_legal_moves(b, turn)
+    tuples = time.perf_counter() - start
+
+    buf = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for b, turn in boards:
+            buf.clear()
+            gen_legal_moves(b, turn, buf)
+    return tuples, time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'backend':10s} {'tuple':>8s} {'packed':>8s}")
+    for backend in MOVE_BACKENDS:
+        tuples, packed = bench(backend)
+        print(f"{backend:10s} {tuples:7.3f}s {packed:7.3f}s")
+    set_move_backend("mailbox")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Đo số node / thời gian / nước chọn của search khi bật tắt từng kỹ thuật cắt tỉa
+import sys
+import time
+
+from engine.board import Board
+from engine.ai.search import SearchOptions
+from engine.ai.time_search import iterative_deepening
+from engine.serializer.fen import load_fen
+
+POSITIONS = [
+    "rneakaenr/9/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/9/RNEAKAENR r",
+    "r1eakae1r/9/1cn4cn/p1p1p1p1p/9/9/P1P1P1P1P/1C2C1N2/9/RNEAKAE1R b",
+    "3akae2/9/4e4/p3p3p/2p3c2/6R2/P1P1P3P/4C3N/9/2EAKAE2 b",
+    "2eakae2/9/9/4p4/9/9/4P4/9/4A4/3AK4 r",
+]
+
+CONFIGS = {
+    "none": SearchOptions(null_move=False, lmr=False, futility=False, reverse_futility=False, razoring=False),
+    "null_move": SearchOptions(null_move=True, lmr=False, futility=False, reverse_futility=False, razoring=False),
+    "lmr": SearchOptions(null_move=False, lmr=True, futility=False, reverse_futility=False, razoring=False),
+    "no_quiescence": SearchOptions(quiescence=False),
+    "no_frontier": SearchOptions(futility=False, reverse_futility=False, razoring=False),
+    "all": SearchOptions(),
+}
+
+
+def bench(options: SearchOptions, depth: int) -> None:
+    nodes = 0
+    start = time.perf_counter()
+    moves = []
+    stats = {}
+    for fen in POSITIONS:
+        b = Board()
+        turn = load_fen(b, fen) or "r"
+        result = iterative_deepening(b, turn, depth, options=options)
+        nodes += result.nodes
+        moves.append(result.best_move)
+        for k, v in result.stats.items():
+            stats[k] = stats.get(k, 0) + v
+    elapsed = time.perf_counter() - start
+    print(f"  nodes {nodes:9d}  time {elapsed:6.2f}s  {stats}")
+    print(f"  moves {moves}")
+
+
+def main() -> None:
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, options in CONFIGS.items():
+        print(name)
+        bench(options, depth)
+
+
+if __name__ == "__main__":
+    main()
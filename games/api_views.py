@@ -68,7 +68,7 @@ def game_detail(request, game_id):
     legal_moves = []
     if game.status == 'ongoing' and game.current_turn == game.player_side:
         from games.services import engine_adapter
-        legal_moves = engine_adapter.list_legal_moves(game.board_state, game.player_side)
+        legal_moves = engine_adapter.list_legal_moves(game.board_state, game.player_side, game_id=game.id)
 
     return Response({
         "ok": True,
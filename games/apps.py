@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class GamesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'games'
+
+    def ready(self):
+        from engine.rules.move_rules import set_move_backend
+        set_move_backend(getattr(settings, 'XIANGQI_MOVEGEN_BACKEND', 'mailbox'))
+        from games.services import engine_adapter
+        engine_adapter.SESSION_TT_MB = getattr(settings, 'XIANGQI_SESSION_TT_MB', engine_adapter.SESSION_TT_MB)
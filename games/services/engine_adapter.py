@@ -1,11 +1,55 @@
-from typing import List, Tuple, Dict, Any, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple, Dict, Any, Optional
+import threading
+import time
 from engine.game import Game as EngineGame
 from engine.board import Board
 from engine.enums import Color, GameStatus
 from engine.utils.position import EMPTY as ENGINE_EMPTY
+from engine.ai.ponder import PonderSearch, start_ponder
+from engine.ai.time_manager import TimeManager
+from engine.ai.transposition import TranspositionTable
 
 CONTRACT_EMPTY = ""
 
+# Session engine theo game id: giữ Game của engine (bàn cờ, lượt, trạng thái),
+# bảng chuyển vị và ponder giữa các request. Bảng chuyển vị (SESSION_TT_MB MB,
+# đặt qua setting XIANGQI_SESSION_TT_MB) chỉ được tạo ở lần tìm kiếm đầu tiên.
+# Quá MAX_SESSIONS thì bỏ session dùng lâu nhất (LRU), không dùng quá
+# SESSION_IDLE_SEC giây cũng bị bỏ. Không có session (hoặc board_state không
+# khớp session, hoặc session đang bận tìm kiếm) thì dựng lại từ board_state.
+MAX_SESSIONS = 32
+SESSION_IDLE_SEC = 30 * 60
+SESSION_TT_MB = 4
+_SESSIONS: "OrderedDict[Any, EngineSession]" = OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+
+class EngineSession:
+    """Trạng thái engine sống giữa các request của 1 game."""
+    __slots__ = ("game", "board_state", "_tt", "ponder", "last_used", "lock")
+
+    def __init__(self, game: EngineGame, board_state: List[List[str]]):
+        self.game = game
+        # board_state (dạng contract) ứng với game.board, để biết session còn khớp DB
+        self.board_state = board_state
+        self._tt: Optional[TranspositionTable] = None
+        self.ponder: Optional[PonderSearch] = None
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    @property
+    def tt(self) -> TranspositionTable:
+        """Bảng chuyển vị của game, tạo ở lần dùng đầu tiên."""
+        if self._tt is None:
+            self._tt = TranspositionTable(SESSION_TT_MB)
+        return self._tt
+
+    def close(self) -> None:
+        if self.ponder is not None:
+            self.ponder.stop()
+            self.ponder = None
+
 def _to_engine_board(board_state: List[List[str]]) -> List[List[str]]:
     """Convert contract board (empty="") to engine board (empty=".")."""
     return [[ENGINE_EMPTY if cell == CONTRACT_EMPTY else cell for cell in row] for row in board_state]
@@ -14,6 +58,79 @@ def _to_contract_board(engine_board: List[List[str]]) -> List[List[str]]:
     """Convert engine board (empty=".") to contract board (empty="")."""
     return [[CONTRACT_EMPTY if cell == ENGINE_EMPTY else cell for cell in row] for row in engine_board]
 
+def _build_game(board_state: List[List[str]], side: str) -> EngineGame:
+    """Engine Game từ board_state, side tới lượt (status đã cập nhật)."""
+    return EngineGame.from_board(Board(state=_to_engine_board(board_state)), Color(side))
+
+def _expire_sessions(now: float) -> List[EngineSession]:
+    """Lấy ra (cần giữ _SESSIONS_LOCK) các session quá hạn / thừa, để close ngoài lock."""
+    dropped = []
+    for game_id in [gid for gid, s in _SESSIONS.items() if now - s.last_used > SESSION_IDLE_SEC]:
+        dropped.append(_SESSIONS.pop(game_id))
+    while len(_SESSIONS) > MAX_SESSIONS:
+        dropped.append(_SESSIONS.popitem(last=False)[1])
+    return dropped
+
+def _get_session(game_id: Any) -> Optional[EngineSession]:
+    now = time.monotonic()
+    with _SESSIONS_LOCK:
+        dropped = _expire_sessions(now)
+        session = _SESSIONS.get(game_id)
+        if session is not None:
+            session.last_used = now
+            _SESSIONS.move_to_end(game_id)
+    for old in dropped:
+        old.close()
+    return session
+
+def _put_session(game_id: Any, session: EngineSession) -> None:
+    with _SESSIONS_LOCK:
+        old = _SESSIONS.pop(game_id, None)
+        _SESSIONS[game_id] = session
+        dropped = _expire_sessions(time.monotonic())
+    if old is not None and old is not session:
+        dropped.append(old)
+    for s in dropped:
+        s.close()
+
+def close_session(game_id: Any) -> None:
+    """Bỏ session của game (vd. game đã kết thúc), dừng ponder nếu có."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.pop(game_id, None)
+    if session is not None:
+        session.close()
+
+@contextmanager
+def _checkout(game_id: Any, board_state: List[List[str]], side: str) -> Iterator[Optional[EngineSession]]:
+    """
+    Session của game_id đã đặt về đúng board_state / side tới lượt; game_id None
+    hoặc session đang bận (request khác giữ) thì None, người gọi tự dựng lại.
+    """
+    if game_id is None:
+        yield None
+        return
+    session = _get_session(game_id)
+    if session is None:
+        session = EngineSession(_build_game(board_state, side), board_state)
+        _put_session(game_id, session)
+    if not session.lock.acquire(blocking=False):
+        yield None
+        return
+    try:
+        if session.board_state != board_state:
+            # DB đã đổi ngoài session (vd. request trước lỗi giữa chừng): dựng lại bàn cờ, giữ bảng chuyển vị
+            if session.ponder is not None:
+                session.ponder.stop()
+                session.ponder = None
+            session.game = _build_game(board_state, side)
+            session.board_state = board_state
+        elif session.game.turn != Color(side):
+            session.game.turn = Color(side)
+            session.game._update_status()
+        yield session
+    finally:
+        session.lock.release()
+
 def init_game_state() -> List[List[str]]:
     """
     Initialize game state (standard starting position).
@@ -21,49 +138,52 @@ def init_game_state() -> List[List[str]]:
     """
     game = EngineGame()
     # Engine Board internally uses "." for empty
-    # We need to expose it as "" 
+    # We need to expose it as ""
     return _to_contract_board(game.board.board)
 
 def apply_move(
-    board_state: List[List[str]], 
-    side: str, 
-    move: Dict[str, Any]
+    board_state: List[List[str]],
+    side: str,
+    move: Dict[str, Any],
+    game_id: Any = None
 ) -> Tuple[List[List[str]], Dict[str, Any]]:
     """
     Apply a move to the board state.
-    
+
     Args:
         board_state: Current 10x9 board
         side: 'r' or 'b'
         move: {'from': [r,c], 'to': [r,c]}
-        
+        game_id: dùng / cập nhật session engine của game (None: dựng lại từ board_state)
+
     Returns:
         (new_board_state, meta_info)
     """
-    # 1. Setup Engine Game with current state
-    engine_board = _to_engine_board(board_state)
-    game = EngineGame()
-    game.board = Board(state=engine_board)
-    game.turn = Color(side)
-    game._update_status() # Refresh status based on loaded board
-
-    # 2. Parse move
-    src = tuple(move['from'])
-    dst = tuple(move['to'])
-
-    # 3. Validate & Apply
-    # Engine's make_move checks legality internally
-    success = game.make_move(src, dst)
-    
-    if not success:
-        # Engine refused move (illegal)
-        raise ValueError(f"Invalid move for {side}: {src} -> {dst}")
+    with _checkout(game_id, board_state, side) as session:
+        # 1. Setup Engine Game with current state
+        game = session.game if session is not None else _build_game(board_state, side)
+
+        # 2. Parse move
+        src = tuple(move['from'])
+        dst = tuple(move['to'])
+
+        # 3. Validate & Apply
+        # Engine's make_move checks legality internally
+        success = game.make_move(src, dst)
+
+        if not success:
+            # Engine refused move (illegal)
+            raise ValueError(f"Invalid move for {side}: {src} -> {dst}")
+
+        new_board = _to_contract_board(game.board.board)
+        if session is not None:
+            session.board_state = new_board
 
     # 4. Extract metadata (captured piece, check status)
     # We can inspect the history or last move info from engine if available
     # The engine returns boolean, but stores history.
     last_move_info = game.history[-1] if game.history else None
-    
+
     meta = {
         "piece": last_move_info.moved if last_move_info else None,
         "captured": last_move_info.captured if last_move_info and last_move_info.captured != ENGINE_EMPTY else None,
@@ -71,24 +191,21 @@ def apply_move(
         "checkmate": game.status == GameStatus.CHECKMATE
     }
 
-    return _to_contract_board(game.board.board), meta
+    return new_board, meta
 
 def check_endgame(
-    board_state: List[List[str]], 
-    side_to_move: str
+    board_state: List[List[str]],
+    side_to_move: str,
+    game_id: Any = None
 ) -> Tuple[str, Optional[str], Optional[str]]:
     """
     Check if game is finished.
     Returns: (status, winner, reason)
     """
-    engine_board = _to_engine_board(board_state)
-    game = EngineGame()
-    game.board = Board(state=engine_board)
-    game.turn = Color(side_to_move)
-    game._update_status()
+    with _checkout(game_id, board_state, side_to_move) as session:
+        game = session.game if session is not None else _build_game(board_state, side_to_move)
+        st = game.status
 
-    st = game.status
-    
     if st == GameStatus.ONGOING:
         return "ongoing", None, None
     elif st == GameStatus.CHECK:
@@ -105,70 +222,109 @@ def check_endgame(
         # Valid Xiangqi rules: Stuck = Loss (unlike Western Chess Draw).
         winner = Color(side_to_move).opposite().value
         return "finished", winner, "stalemate"
-    
+
     return "ongoing", None, None
 
 def pick_ai_move(
-    board_state: List[List[str]], 
-    ai_side: str, 
-    difficulty: str
+    board_state: List[List[str]],
+    ai_side: str,
+    difficulty: str,
+    threads: int = 1,
+    game_id: Any = None,
+    ponder: bool = False,
+    ponder_time_sec: Optional[float] = None
 ) -> Dict[str, list]:
     """
     AI picks a move.
+    threads: số process tìm kiếm (Lazy SMP ở mức normal, chia nước gốc ở easy/hard).
+    game_id: dùng session của game (bảng chuyển vị; kết quả của lần ponder trước ở mức normal);
+    ponder=True thì sau khi đi tiếp tục ponder nước đáp trả đoán được, tối đa
+    ponder_time_sec giây (None: PONDER_TIME_SEC của engine/ai/ponder.py).
+    Nước đi không được áp dụng vào session (apply_move làm việc đó).
     """
-    engine_board = _to_engine_board(board_state)
-    game = EngineGame()
-    game.board = Board(state=engine_board)
-    game.turn = Color(ai_side)
-    game._update_status()
+    with _checkout(game_id, board_state, ai_side) as session:
+        game = session.game if session is not None else _build_game(board_state, ai_side)
+
+        tt = session.tt if session is not None else None
+        if difficulty == 'normal':
+            # Time search với thời gian động (tự động cấp phát)
+            result = None
+            pondered = session.ponder if session is not None else None
+            if pondered is not None:
+                session.ponder = None
+                result = pondered.finish(game.board, ai_side, TimeManager.for_board(game.board))
+            if result is not None and result.move is not None:
+                # đối thủ đi đúng nước đoán: dùng luôn kết quả ponder
+                game.last_search = result
+                src, dst = result.best_move
+                success = game.make_move(src, dst)
+            else:
+                success = game.ai_move_time(threads=threads, tt=tt)
+            if success and ponder and session is not None and game.status in (GameStatus.ONGOING, GameStatus.CHECK):
+                kwargs = {} if ponder_time_sec is None else {"time_limit_sec": ponder_time_sec}
+                session.ponder = start_ponder(game.board, ai_side, game.last_search, tt, **kwargs)
+        else:
+            # easy=2, hard=4
+            depth = 4 if difficulty == 'hard' else 2
+            success = game.ai_move_minimax(depth=depth, workers=threads, tt=tt)
+
+        if not success:
+            raise RuntimeError("AI could not find a valid move (Checkmate/Stalemate?)")
+
+        # Retrieve move from history
+        last_move = game.history[-1]
+        if session is not None:
+            # session giữ nguyên board_state cho tới khi apply_move
+            game.undo()
 
-    if difficulty == 'normal':
-        # Time search với thời gian động (tự động cấp phát)
-        success = game.ai_move_time()
-    else:
-        # easy=2, hard=4
-        depth = 4 if difficulty == 'hard' else 2
-        success = game.ai_move_minimax(depth=depth)
-    
-    if not success:
-        raise RuntimeError("AI could not find a valid move (Checkmate/Stalemate?)")
-
-    # Retrieve move from history
-    last_move = game.history[-1]
-    
     return {
         "from": [last_move.src[0], last_move.src[1]],
         "to": [last_move.dst[0], last_move.dst[1]]
     }
 
+def notify_player_move(game_id: Any, move: Dict[str, Any]) -> None:
+    """
+    Người chơi vừa đi move: đúng nước AI đã đoán thì ponder của game chuyển sang
+    hạn của 1 nước bình thường, tính cả thời gian đã ponder (ponderhit); sai thì
+    dừng ponder ngay.
+    """
+    session = _get_session(game_id)
+    pondered = session.ponder if session is not None else None
+    if pondered is None:
+        return
+    if pondered.is_predicted(move['from'], move['to']):
+        pondered.ponderhit(TimeManager.for_board(pondered.board))
+    else:
+        pondered.time_manager.stop()
+
 def list_legal_moves(
-    board_state: List[List[str]], 
-    side: str, 
-    from_pos: Optional[Tuple[int, int]] = None
+    board_state: List[List[str]],
+    side: str,
+    from_pos: Optional[Tuple[int, int]] = None,
+    game_id: Any = None
 ) -> List[Dict[str, list]]:
     """
     List legal moves.
     """
     from engine.rules.game_rules import generate_legal_moves
-    
-    engine_board = _to_engine_board(board_state)
-    game = EngineGame()
-    game.board = Board(state=engine_board)
-    # Note: generate_legal_moves requires Board, not Game
-    
-    # But we need to check if moves leave self in check?
-    # engine.rules.game_rules.generate_legal_moves DOES check `is_legal_move` which checks self-check.
-    
-    legal_moves = generate_legal_moves(game.board, side)
-    
+
+    with _checkout(game_id, board_state, side) as session:
+        board = session.game.board if session is not None else Board(state=_to_engine_board(board_state))
+        # Note: generate_legal_moves requires Board, not Game
+
+        # But we need to check if moves leave self in check?
+        # engine.rules.game_rules.generate_legal_moves DOES check `is_legal_move` which checks self-check.
+
+        legal_moves = generate_legal_moves(board, side)
+
     result = []
     for m_src, m_dst in legal_moves:
         if from_pos and m_src != from_pos:
             continue
-            
+
         result.append({
             "from": [m_src[0], m_src[1]],
             "to": [m_dst[0], m_dst[1]]
         })
-        
+
     return result
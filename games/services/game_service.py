@@ -1,4 +1,5 @@
 from django.core.exceptions import ValidationError
+from django.conf import settings
 from games.models import Game, Move
 from games.services import engine_adapter
 import logging
@@ -40,11 +41,15 @@ def apply_player_move(game_id, move_data):
         new_board, meta = engine_adapter.apply_move(
             game.board_state, 
             game.player_side, 
-            move_data
+            move_data,
+            game_id=game.id
         )
     except ValueError as e:
         raise ValueError(str(e))
 
+    # AI đang ponder nước đáp trả đoán được: bắt đầu tính giờ / dừng ngay
+    engine_adapter.notify_player_move(game.id, move_data)
+
     # Save move to history
     _save_move(game, move_data, game.player_side, meta)
 
@@ -54,12 +59,13 @@ def apply_player_move(game_id, move_data):
     game.save()
 
     # --- 2. Check Endgame (Player wins?) ---
-    status, winner, reason = engine_adapter.check_endgame(new_board, game.ai_side)
+    status, winner, reason = engine_adapter.check_endgame(new_board, game.ai_side, game_id=game.id)
     if status == 'finished':
         game.status = status
         game.winner = winner
         game.end_reason = reason
         game.save()
+        engine_adapter.close_session(game.id)
 
     return game, meta
 
@@ -80,14 +86,19 @@ def process_ai_move(game_id):
         ai_move = engine_adapter.pick_ai_move(
             game.board_state, 
             game.ai_side, 
-            game.difficulty
+            game.difficulty,
+            threads=getattr(settings, 'XIANGQI_SEARCH_THREADS', 1),
+            game_id=game.id,
+            ponder=getattr(settings, 'XIANGQI_PONDER', False),
+            ponder_time_sec=getattr(settings, 'XIANGQI_PONDER_TIME_SEC', None)
         )
         
         # Apply AI move
         new_board_ai, meta_ai = engine_adapter.apply_move(
             game.board_state, 
             game.ai_side, 
-            ai_move
+            ai_move,
+            game_id=game.id
         )
         
         # Save AI move
@@ -98,11 +109,12 @@ def process_ai_move(game_id):
         game.current_turn = game.player_side # Switch back to player
         
         # --- 4. Check Endgame (AI wins?) ---
-        status, winner, reason = engine_adapter.check_endgame(new_board_ai, game.player_side)
+        status, winner, reason = engine_adapter.check_endgame(new_board_ai, game.player_side, game_id=game.id)
         if status == 'finished':
             game.status = status
             game.winner = winner
             game.end_reason = reason
+            engine_adapter.close_session(game.id)
             
         game.save()
         logger.info(f"AI move completed for game {game_id}")
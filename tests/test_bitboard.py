@@ -0,0 +1,61 @@
+import pytest
+
+from engine.board import Board
+from engine.rules import bitboard
+from engine.rules.move_rules import rook_moves, cannon_moves, pseudo_moves, set_move_backend, get_move_backend
+from engine.rules.game_rules import generate_legal_moves
+from engine.rules.check_rules import is_in_check
+
+def test_bitboard_sliders_match_mailbox():
+    b = Board()
+    b.setup_initial()
+    b.set(5, 4, "rR")
+    b.set(4, 1, "bC")
+    for src in [(5, 4), (9, 0), (0, 8), (7, 1), (2, 7), (4, 1)]:
+        assert set(bitboard.rook_moves(b, src)) == set(rook_moves(b, src))
+        assert set(bitboard.cannon_moves(b, src)) == set(cannon_moves(b, src))
+
+def test_bitboard_occupancy_follows_moves():
+    b = Board()
+    b.setup_initial()
+    undo = b.apply_move((7, 1), (0, 1))
+    assert set(bitboard.cannon_moves(b, (0, 1))) == set(cannon_moves(b, (0, 1)))
+    b.undo_move(undo)
+    assert set(bitboard.cannon_moves(b, (7, 1))) == set(cannon_moves(b, (7, 1)))
+
+def test_bitboard_attacks():
+    b = Board()
+    b.set(9, 4, "rK")
+    b.set(5, 4, "bC")
+    assert bitboard.cannon_attacks(b, (5, 4), (9, 4)) is False
+    b.set(7, 4, "rP")
+    assert bitboard.cannon_attacks(b, (5, 4), (9, 4)) is True
+    assert bitboard.rook_attacks(b, (5, 4), (9, 4)) is False
+
+def test_select_bitboard_backend():
+    b = Board()
+    b.setup_initial()
+    expected = set(generate_legal_moves(b, "r"))
+    try:
+        set_move_backend("bitboard")
+        assert get_move_backend() == "bitboard"
+        assert set(generate_legal_moves(b, "r")) == expected
+        b.set(5, 4, "bR")
+        b.set(6, 4, ".")
+        assert is_in_check(b, "r") is True
+    finally:
+        set_move_backend("mailbox")
+
+def test_backends_agree_and_can_be_passed_per_call():
+    b = Board()
+    b.setup_initial()
+    b.apply_move((7, 1), (7, 4))
+    expected = sorted(generate_legal_moves(b, "b"))
+    for name in ("reference", "mailbox", "bitboard"):
+        assert sorted(generate_legal_moves(b, "b", name)) == expected
+    assert get_move_backend() == "mailbox"
+    assert pseudo_moves(b, (7, 4), "reference") == pseudo_moves(b, (7, 4))
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        set_move_backend("gpu")
@@ -0,0 +1,136 @@
+from engine.board import Board
+from engine.utils.position import to_sq, from_sq
+from engine.utils.piece_codes import CELL_TO_CODE, EMPTY_CODE, OFFBOARD
+from engine.serializer.fen import load_fen, board_to_fen
+from engine.serializer.json_serializer import load_json2d
+
+def test_board_state_roundtrip():
+    b = Board()
+    b.setup_initial()
+
+    b2 = Board(state=b.board)
+    assert b2.board == b.board
+    assert b2.get(9, 4) == "rK"
+    assert b2.get(4, 4) == "."
+
+def test_squares_use_piece_codes_and_offboard_border():
+    b = Board()
+    b.setup_initial()
+
+    assert b.squares[to_sq(0, 0)] == CELL_TO_CODE["bR"]
+    assert b.squares[to_sq(5, 5)] == EMPTY_CODE
+    # ô ngoài bàn (bên trái cột 0, phía trên hàng 0) là viền
+    assert b.squares[to_sq(0, 0) - 1] == OFFBOARD
+    assert b.squares[to_sq(0, 0) - 2 * 11] == OFFBOARD
+    assert from_sq(to_sq(7, 3)) == (7, 3)
+
+def test_set_tracks_king_positions():
+    b = Board()
+    b.set(9, 4, "rK")
+    b.set(0, 3, "bK")
+    assert b.red_king == (9, 4)
+    assert b.black_king == (0, 3)
+
+    b.set(9, 4, ".")
+    assert b.red_king is None
+
+def test_apply_and_undo_move_restore_board():
+    b = Board()
+    b.setup_initial()
+    before = b.board
+
+    undo = b.apply_move((7, 1), (0, 1))  # pháo đỏ ăn mã đen
+    assert undo.moved == "rC"
+    assert undo.captured == "bN"
+    assert b.get(0, 1) == "rC"
+
+    b.undo_move(undo)
+    assert b.board == before
+
+def test_king_move_updates_king_square():
+    b = Board()
+    b.set(9, 4, "rK")
+    undo = b.apply_move((9, 4), (8, 4))
+    assert b.red_king == (8, 4)
+    b.undo_move(undo)
+    assert b.red_king == (9, 4)
+
+def test_piece_lists_follow_moves_and_captures():
+    b = Board()
+    b.setup_initial()
+    assert b.piece_count() == 32
+    assert b.piece_count("r") == 16
+
+    undo = b.apply_move((7, 1), (0, 1))  # ăn mã đen
+    assert b.piece_count("b") == 15
+    assert to_sq(0, 1) in b.pieces("r")
+    assert to_sq(7, 1) not in b.pieces("r")
+
+    b.undo_move(undo)
+    assert b.piece_count() == 32
+    assert to_sq(0, 1) in b.pieces("b")
+    assert to_sq(7, 1) in b.pieces("r")
+
+def test_set_updates_piece_lists():
+    b = Board()
+    b.set(5, 4, "rR")
+    b.set(5, 4, "bC")
+    assert b.piece_count("r") == 0
+    assert b.pieces("b") == {to_sq(5, 4)}
+
+def test_zobrist_updates_incrementally_and_restores():
+    b = Board()
+    b.setup_initial()
+    start = b.zobrist
+    assert start == b.compute_zobrist()
+
+    m1 = b.apply_move((7, 1), (0, 1))  # pháo ăn mã
+    assert b.side_to_move == "b"
+    assert b.zobrist == b.compute_zobrist() != start
+    m2 = b.apply_move((0, 0), (0, 1))  # xe ăn lại
+    assert b.zobrist == b.compute_zobrist()
+
+    b.undo_move(m2)
+    b.undo_move(m1)
+    assert b.zobrist == start and b.side_to_move == "r"
+
+def test_zobrist_transpositions_and_side_to_move():
+    a = Board()
+    a.setup_initial()
+    a.apply_move((9, 1), (7, 2))
+    a.apply_move((0, 1), (2, 2))
+    a.apply_move((9, 7), (7, 6))
+
+    b = Board()
+    b.setup_initial()
+    b.apply_move((9, 7), (7, 6))
+    b.apply_move((0, 1), (2, 2))
+    b.apply_move((9, 1), (7, 2))
+    assert a.zobrist == b.zobrist
+
+    c = Board(state=a.board)  # cùng quân nhưng đỏ đi
+    assert c.zobrist != a.zobrist
+    assert Board(state=a.board, turn="b").zobrist == a.zobrist
+
+def test_zobrist_recomputed_on_load():
+    a = Board()
+    a.setup_initial()
+    a.apply_move((6, 4), (5, 4))
+
+    b = Board()
+    load_fen(b, board_to_fen(a, "b"))
+    assert b.zobrist == a.zobrist
+
+    c = Board()
+    load_json2d(c, a.board)
+    c.set_side_to_move("b")
+    assert c.zobrist == a.zobrist
+
+def test_null_move_flips_side_only():
+    b = Board()
+    b.setup_initial()
+    before = (b.board, b.zobrist)
+    b.make_null_move()
+    assert b.side_to_move == "b" and b.zobrist == b.compute_zobrist() != before[1]
+    b.unmake_null_move()
+    assert (b.board, b.zobrist) == before and b.undo_stack == []
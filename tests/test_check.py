@@ -10,6 +10,14 @@ def empty_board_with_kings():
     b.set(9, 4, "rK")
     return b
 
+def board_with(*pieces):
+    """Bàn cờ trống chỉ có các quân (hàng, cột, quân) đã cho."""
+    b = Board()
+    b.board = [["."] * 9 for _ in range(10)]
+    for r, c, cell in pieces:
+        b.set(r, c, cell)
+    return b
+
 def test_check_by_rook():
     b = empty_board_with_kings()
     # xe đen chiếu tướng đỏ theo cột 4
@@ -42,3 +50,31 @@ def test_check_by_knight_with_leg_block():
     # leg = (8,3)
     b.set(8, 3, "rP")
     assert is_in_check(b, "r") is False
+
+def test_is_square_attacked_probes_from_target():
+    from engine.rules.check_rules import is_square_attacked
+    from engine.utils.position import to_sq
+
+    b = empty_board_with_kings()
+    b.set(5, 4, "rP")  # chắn giữa 2 tướng
+    b.set(4, 2, "bN")
+    b.set(2, 6, "bC")
+    b.set(2, 2, "rP")  # màn của pháo đen theo hàng 2
+
+    # mã đen (4,2) đá được (6,3), chân mã (5,2) trống
+    assert is_square_attacked(b, to_sq(6, 3), "b") is True
+    b.set(5, 2, "rP")
+    assert is_square_attacked(b, to_sq(6, 3), "b") is False
+
+    # pháo đen (2,6) qua màn (2,2) bắn (2,0) nhưng không bắn ô trước màn (2,5)
+    assert is_square_attacked(b, to_sq(2, 0), "b") is True
+    assert is_square_attacked(b, to_sq(2, 5), "b") is False
+
+def test_is_square_attacked_flying_general():
+    from engine.rules.check_rules import is_square_attacked
+    from engine.utils.position import to_sq
+
+    b = empty_board_with_kings()
+    assert is_square_attacked(b, to_sq(9, 4), "b") is True
+    assert is_square_attacked(b, to_sq(9, 4), "b", flying_general=False) is False
+    assert is_in_check(b, "r") is False
@@ -0,0 +1,63 @@
+from engine.board import Board
+from engine.utils.position import to_sq
+from engine.rules.check_info import CheckInfo
+from engine.rules.game_rules import generate_legal_moves
+
+def board_with_kings(red=(9, 4), black=(0, 3)):
+    b = Board()
+    b.set(*red, "rK")
+    b.set(*black, "bK")
+    return b
+
+def test_rook_pin():
+    b = board_with_kings()
+    b.set(7, 4, "rN")
+    b.set(3, 4, "bR")
+    info = CheckInfo(b, "r")
+    assert not info.in_check
+    assert to_sq(7, 4) in info.pinned
+    # mã bị ghim không có nước nào hợp lệ
+    assert not [m for m in generate_legal_moves(b, "r") if m[0] == (7, 4)]
+
+def test_flying_general_pin():
+    b = board_with_kings(black=(0, 4))
+    b.set(5, 4, "rR")
+    info = CheckInfo(b, "r")
+    assert to_sq(5, 4) in info.pinned
+    moves = {dst for src, dst in generate_legal_moves(b, "r") if src == (5, 4)}
+    assert moves and all(c == 4 for _, c in moves)
+
+def test_cannon_two_screens_pin_both_and_hazard_square():
+    b = board_with_kings()
+    b.set(8, 4, "rA")
+    b.set(6, 4, "rP")
+    b.set(2, 4, "bC")
+    info = CheckInfo(b, "r")
+    assert {to_sq(8, 4), to_sq(6, 4)} <= info.pinned
+
+    b2 = board_with_kings()
+    b2.set(2, 4, "bC")
+    info2 = CheckInfo(b2, "r")
+    # ô trống giữa tướng và pháo: đi vào là tự làm màn
+    assert to_sq(5, 4) in info2.hazards
+
+def test_cannon_check_evasions_and_screen():
+    b = board_with_kings()
+    b.set(7, 4, "rN")
+    b.set(3, 4, "bC")
+    info = CheckInfo(b, "r")
+    assert info.checkers == [to_sq(3, 4)]
+    assert to_sq(7, 4) in info.screens
+    assert to_sq(5, 4) in info.evasions
+
+def test_knight_check_and_leg_pin():
+    b = board_with_kings()
+    b.set(7, 3, "bN")
+    info = CheckInfo(b, "r")
+    assert info.checkers == [to_sq(7, 3)]
+    assert to_sq(8, 3) in info.evasions  # chặn chân mã
+
+    b.set(8, 3, "rA")
+    info = CheckInfo(b, "r")
+    assert not info.in_check
+    assert to_sq(8, 3) in info.pinned
@@ -0,0 +1,52 @@
+import pytest
+
+from games.services import engine_adapter
+
+@pytest.fixture(autouse=True)
+def _clean_sessions():
+    yield
+    for game_id in list(engine_adapter._SESSIONS):
+        engine_adapter.close_session(game_id)
+
+def test_session_is_reused_between_requests():
+    board = engine_adapter.init_game_state()
+    board, _ = engine_adapter.apply_move(board, "r", {"from": [7, 1], "to": [7, 4]}, game_id=1)
+    session = engine_adapter._SESSIONS[1]
+    game = session.game
+    assert engine_adapter.check_endgame(board, "b", game_id=1) == ("ongoing", None, None)
+    assert engine_adapter.list_legal_moves(board, "b", game_id=1)
+    board, _ = engine_adapter.apply_move(board, "b", {"from": [0, 1], "to": [2, 2]}, game_id=1)
+    assert engine_adapter._SESSIONS[1] is session and session.game is game
+    # chưa tìm kiếm lần nào: chưa cấp phát bảng chuyển vị
+    assert session._tt is None
+    assert session.board_state == board
+
+def test_ai_move_leaves_session_at_board_state():
+    board = engine_adapter.init_game_state()
+    move = engine_adapter.pick_ai_move(board, "r", "easy", game_id=1)
+    assert engine_adapter._SESSIONS[1].board_state == board
+    # mức easy cũng dùng bảng chuyển vị của session
+    assert engine_adapter._SESSIONS[1].tt.probe(engine_adapter._SESSIONS[1].game.board.zobrist) is not None
+    after, _ = engine_adapter.apply_move(board, "r", move, game_id=1)
+    assert after == engine_adapter.apply_move(board, "r", move)[0]
+
+def test_mismatched_board_state_rebuilds_session():
+    board = engine_adapter.init_game_state()
+    engine_adapter.apply_move(board, "r", {"from": [7, 1], "to": [7, 4]}, game_id=1)
+    # request khác trả về bàn cờ ban đầu (vd. DB không lưu nước trước)
+    moved, _ = engine_adapter.apply_move(board, "r", {"from": [7, 7], "to": [7, 4]}, game_id=1)
+    assert moved[7][1] == "rC" and moved[7][7] == "" and moved[7][4] == "rC"
+    assert engine_adapter._SESSIONS[1].board_state == moved
+
+def test_lru_and_idle_eviction(monkeypatch):
+    monkeypatch.setattr(engine_adapter, "MAX_SESSIONS", 2)
+    board = engine_adapter.init_game_state()
+    for game_id in (1, 2):
+        engine_adapter.list_legal_moves(board, "r", game_id=game_id)
+    engine_adapter.list_legal_moves(board, "r", game_id=1)
+    engine_adapter.list_legal_moves(board, "r", game_id=3)
+    assert list(engine_adapter._SESSIONS) == [1, 3]
+
+    engine_adapter._SESSIONS[1].last_used -= engine_adapter.SESSION_IDLE_SEC + 1
+    engine_adapter.list_legal_moves(board, "r", game_id=3)
+    assert list(engine_adapter._SESSIONS) == [3]
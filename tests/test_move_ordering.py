@@ -0,0 +1,50 @@
+from engine.board import Board
+from engine.move import encode_move, move_captured
+from engine.utils.position import to_sq
+from engine.utils.piece_codes import CELL_TO_CODE
+from engine.ai.move_ordering import OrderingState, order_moves, KILLER_SCORE, COUNTERMOVE_SCORE
+from engine.ai.move_picker import pick_moves
+from engine.rules.game_rules import generate_legal_moves
+
+RN = CELL_TO_CODE["rN"]
+RR = CELL_TO_CODE["rR"]
+
+def test_update_records_killers_history_and_countermove():
+    o = OrderingState()
+    prev = encode_move(to_sq(0, 1), to_sq(2, 2), CELL_TO_CODE["bN"])
+    m1 = encode_move(to_sq(9, 1), to_sq(7, 2), RN)
+    m2 = encode_move(to_sq(9, 0), to_sq(8, 0), RR)
+    o.update(3, m1, 4, prev)
+    o.update(3, m2, 2)
+    assert o.killers_at(3) == [m2, m1]
+    assert o.countermove(prev) == m1
+    assert o.quiet_score(m2, 3) == KILLER_SCORE + 1
+    assert o.quiet_score(m1, 5, prev) == COUNTERMOVE_SCORE
+    assert o.quiet_score(m1, 5) == 16  # history = depth^2
+
+    capture = encode_move(to_sq(7, 1), to_sq(0, 1), CELL_TO_CODE["rC"], CELL_TO_CODE["bN"])
+    o.update(3, capture, 4)  # nước ăn quân không vào killer/history
+    assert o.killers_at(3) == [m2, m1]
+
+def test_order_moves_uses_history_for_quiet_moves():
+    b = Board()
+    b.setup_initial()
+    o = OrderingState()
+    favourite = encode_move(to_sq(9, 8), to_sq(8, 8), RR)
+    o.update(10, favourite, 5)
+    ordered = order_moves(b, generate_legal_moves(b, "r"), "r", o, ply=0)
+    quiet = [mv for mv in ordered if b.get(*mv[1]) == "."]
+    assert quiet[0] == ((9, 8), (8, 8))
+    # pháo ăn mã bị xe ăn lại (SEE < 0): xếp sau mọi nước thường
+    assert ordered[0] == quiet[0]
+    assert set(ordered[len(quiet):]) == {((7, 1), (0, 1)), ((7, 7), (0, 7))}
+
+def test_picker_sorts_quiets_by_history():
+    b = Board()
+    b.setup_initial()
+    o = OrderingState()
+    favourite = encode_move(to_sq(9, 8), to_sq(8, 8), RR)
+    o.update(10, favourite, 5)
+    picked = list(pick_moves(b, "r", [], [], history=o.history))
+    first_quiet = next(m for m in picked if not move_captured(m))
+    assert first_quiet == favourite
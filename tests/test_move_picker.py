@@ -0,0 +1,45 @@
+from engine.board import Board
+from engine.move import encode_move, move_captured
+from engine.utils.position import to_sq
+from engine.utils.piece_codes import CELL_TO_CODE
+from engine.rules.movegen import gen_legal_moves, is_pseudo_legal
+from engine.ai.move_picker import pick_moves
+
+def _position():
+    b = Board()
+    b.setup_initial()
+    b.apply_move((7, 1), (7, 4))
+    b.apply_move((2, 7), (2, 4))
+    return b
+
+def test_picker_yields_every_legal_move_once():
+    b = _position()
+    legal = []
+    gen_legal_moves(b, "r", legal)
+    picked = list(pick_moves(b, "r", [], []))
+    assert sorted(picked) == sorted(legal)
+
+def test_picker_order_hash_captures_killers():
+    b = _position()
+    hash_move = encode_move(to_sq(9, 0), to_sq(8, 0), CELL_TO_CODE["rR"])
+    killer = encode_move(to_sq(9, 1), to_sq(7, 2), CELL_TO_CODE["rN"])
+    picked = list(pick_moves(b, "r", [], [], hash_move, (killer, 0)))
+
+    assert picked[0] == hash_move
+    assert move_captured(picked[1])  # pháo ăn tốt / pháo
+    assert picked.count(hash_move) == 1 and picked.count(killer) == 1
+    first_quiet = next(i for i, m in enumerate(picked[1:], 1) if not move_captured(m))
+    assert picked[first_quiet] == killer
+
+def test_picker_skips_stale_hash_move():
+    b = _position()
+    stale = encode_move(to_sq(9, 0), to_sq(5, 0), CELL_TO_CODE["rR"])  # bị tốt chặn
+    assert not is_pseudo_legal(b, stale, "r")
+    assert stale not in list(pick_moves(b, "r", [], [], stale))
+
+def test_picker_is_lazy():
+    b = _position()
+    captures, quiets = [], []
+    gen = pick_moves(b, "r", captures, quiets)
+    assert move_captured(next(gen))
+    assert quiets == []  # chưa tới giai đoạn nước thường
@@ -0,0 +1,69 @@
+from engine.board import Board
+from engine.move import encode_move, move_from, move_to, move_moved, move_captured, move_to_tuple
+from engine.utils.position import to_sq
+from engine.utils.piece_codes import CELL_TO_CODE
+from engine.rules.game_rules import generate_legal_moves
+from engine.rules.movegen import gen_legal_moves, generate_captures, generate_evasions
+
+def test_encode_decode_move():
+    m = encode_move(to_sq(7, 1), to_sq(0, 1), CELL_TO_CODE["rC"], CELL_TO_CODE["bN"])
+    assert move_from(m) == to_sq(7, 1)
+    assert move_to(m) == to_sq(0, 1)
+    assert move_moved(m) == CELL_TO_CODE["rC"]
+    assert move_captured(m) == CELL_TO_CODE["bN"]
+    assert move_to_tuple(m) == ((7, 1), (0, 1))
+
+def test_make_unmake_uses_undo_stack():
+    b = Board()
+    b.setup_initial()
+    before = b.board
+
+    b.make_move(encode_move(to_sq(7, 1), to_sq(0, 1)))
+    b.make_move(encode_move(to_sq(0, 0), to_sq(0, 1)))  # xe đen ăn lại pháo
+    assert len(b.undo_stack) == 2
+    assert move_captured(b.undo_stack[-1]) == CELL_TO_CODE["rC"]
+
+    b.unmake_move()
+    b.unmake_move()
+    assert b.board == before
+    assert b.undo_stack == []
+
+def test_packed_generator_matches_tuple_generator_and_reuses_buffer():
+    b = Board()
+    b.setup_initial()
+    b.apply_move((7, 1), (7, 4))
+
+    buf = [123]  # buffer cũ: chỉ append phía sau
+    gen_legal_moves(b, "b", buf)
+    assert buf[0] == 123
+    assert [move_to_tuple(m) for m in buf[1:]] == generate_legal_moves(b, "b")
+
+def test_generate_captures_only_returns_legal_captures():
+    b = Board()
+    b.setup_initial()
+    b.apply_move((7, 1), (7, 4))
+
+    legal = []
+    gen_legal_moves(b, "r", legal)
+    captures = generate_captures(b, "r")
+    assert captures and all(move_captured(m) for m in captures)
+    assert sorted(captures) == sorted(m for m in legal if move_captured(m))
+
+def test_generate_evasions_matches_legal_moves_in_check():
+    b = Board()
+    b.board = [["."] * 9 for _ in range(10)]
+    b.set(9, 4, "rK")
+    b.set(9, 3, "rA")
+    b.set(7, 0, "rR")
+    b.set(6, 6, "rN")
+    b.set(0, 3, "bK")
+    b.set(2, 4, "bR")  # xe đen chiếu theo cột 4
+
+    legal = []
+    gen_legal_moves(b, "r", legal)
+    evasions = generate_evasions(b, "r")
+    assert sorted(evasions) == sorted(legal)
+    assert any(move_to_tuple(m) == ((7, 0), (7, 4)) for m in evasions)  # xe cản
+    for m in evasions:
+        src, dst = move_to_tuple(m)
+        assert src == (9, 4) or (dst[1] == 4 and 2 <= dst[0] <= 8)  # đi tướng hoặc ăn / cản xe
@@ -0,0 +1,54 @@
+import pytest
+
+from engine.board import Board
+from engine.game import Game
+from engine.ai.search import SearchOptions, SearchState, find_best_move, search_root
+import engine.ai.parallel_root as parallel_root
+from engine.ai.parallel_root import parallel_search_root
+
+EXACT = SearchOptions(
+    null_move=False, lmr=False, quiescence=False, futility=False, reverse_futility=False, razoring=False,
+)
+
+def _positions():
+    b = Board()
+    b.setup_initial()
+    yield b, "r"
+    b = Board()
+    b.setup_initial()
+    b.apply_move((7, 1), (7, 4))
+    b.apply_move((0, 1), (2, 2))
+    b.apply_move((9, 1), (7, 2))
+    yield b, "b"
+
+def test_parallel_root_matches_serial_search_with_exact_options():
+    for b, color in _positions():
+        assert parallel_search_root(b, color, 3, workers=2, options=EXACT) == search_root(b, color, 3, state=SearchState(options=EXACT))
+        assert find_best_move(b, color, 3, options=EXACT, workers=2) == find_best_move(b, color, 3, options=EXACT)
+
+def test_ai_move_minimax_with_workers():
+    g = Game()
+    assert g.ai_move_minimax(depth=2, workers=2)
+    assert len(g.history) == 1
+
+def test_single_root_move_does_not_start_a_pool(monkeypatch):
+    b = Board()
+    b.board = [["."] * 9 for _ in range(10)]
+    b.set(9, 3, "rK")
+    b.set(0, 4, "bK")
+    b.set(5, 4, "bR")
+    monkeypatch.setattr(parallel_root, "get_pool", lambda workers: pytest.fail("pool created"))
+    _, move = parallel_search_root(b, "r", 2, workers=2)
+    assert move is not None
+
+def test_worker_table_ages_per_search(monkeypatch):
+    # chạy thân worker ngay trong process test
+    monkeypatch.setattr(parallel_root, "_WORKER_TT", None)
+    monkeypatch.setattr(parallel_root, "_WORKER_GENERATION", 0)
+    parallel_root._init_worker(1)
+    b = Board()
+    b.setup_initial()
+    move = search_root(b, "r", 1, state=SearchState(options=EXACT))[1]
+    for generation, age in ((1, 1), (1, 1), (2, 2)):
+        parallel_root._search_move(b.board, "r", move, 2, 0, EXACT, generation)
+        assert parallel_root._WORKER_TT.age == age
@@ -0,0 +1,72 @@
+import time
+
+from engine.board import Board
+from engine.move import move_to_tuple
+from engine.rules.movegen import gen_legal_moves
+from engine.ai.ponder import PonderSearch, start_ponder
+from engine.ai.time_manager import TimeManager
+from engine.ai.time_search import iterative_deepening
+
+def _after_ai_move():
+    b = Board()
+    b.setup_initial()
+    result = iterative_deepening(b, "r", 3)
+    b.make_move(result.move)
+    b.set_side_to_move("b")
+    return b, result
+
+def test_ponderhit_returns_the_ponder_result():
+    b, result = _after_ai_move()
+    pondered = start_ponder(b, "r", result, time_limit_sec=60.0, max_depth=20)
+    assert pondered is not None and pondered.thread.is_alive()
+    assert pondered.is_predicted(*move_to_tuple(result.pv[1]))
+    b.make_move(result.pv[1])
+    start = time.perf_counter()
+    found = pondered.finish(b, "r", TimeManager(0.05, 0.2))
+    assert time.perf_counter() - start < 2.0
+    assert found is not None and found.move is not None and found.depth >= 1
+
+def test_ponderhit_is_not_slower_than_a_cold_search():
+    b = Board()
+    b.setup_initial()
+    result = iterative_deepening(b, "r", 20, time_manager=TimeManager(0.05, 0.1))
+    b.make_move(result.move)
+    b.set_side_to_move("b")
+    pondered = start_ponder(b, "r", result, time_limit_sec=60.0)
+    # người chơi nghĩ lâu hơn hạn mềm của nước sau
+    time.sleep(0.5)
+    b.make_move(result.pv[1])
+
+    start = time.perf_counter()
+    found = pondered.finish(b, "r", TimeManager(0.3, 1.0))
+    ponder_latency = time.perf_counter() - start
+    start = time.perf_counter()
+    iterative_deepening(b, "r", 20, time_manager=TimeManager(0.3, 1.0))
+    cold_latency = time.perf_counter() - start
+    assert found is not None and found.move is not None
+    assert ponder_latency <= cold_latency
+
+def test_ponder_depth_is_capped_at_search_depth():
+    b, result = _after_ai_move()
+    pondered = start_ponder(b, "r", result, time_limit_sec=60.0, max_depth=20)
+    assert pondered.max_depth == result.max_depth == 3
+    pondered.stop()
+
+def test_ponder_miss_stops_and_keeps_tt():
+    b, result = _after_ai_move()
+    pondered = start_ponder(b, "r", result, time_limit_sec=60.0, max_depth=20)
+    moves = []
+    gen_legal_moves(b, "b", moves)
+    other = next(m for m in moves if m != result.pv[1])
+    assert not pondered.is_predicted(*move_to_tuple(other))
+    b.make_move(other)
+    assert pondered.finish(b, "r", TimeManager(0.05, 0.2)) is None
+    assert not pondered.thread.is_alive()
+    assert pondered.tt.probe(pondered.key) is not None
+
+def test_ponder_budget_is_bounded():
+    b, result = _after_ai_move()
+    pondered = PonderSearch(b, "r", result.pv[1], time_limit_sec=0.1, max_depth=20).start()
+    pondered.thread.join(5.0)
+    assert not pondered.thread.is_alive()
+    assert pondered.result.move is not None
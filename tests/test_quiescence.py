@@ -0,0 +1,51 @@
+import random
+
+from engine.board import Board
+from engine.rules.movegen import gen_legal_moves
+from engine.ai.evaluator import evaluate_board, evaluate_board_full, MATE_SCORE
+from engine.ai.quiescence import quiescence
+from engine.ai.search import SearchState, INF
+from tests.test_check import board_with
+
+def test_incremental_eval_matches_full_eval():
+    rng = random.Random(7)
+    b = Board()
+    b.setup_initial()
+    color = "r"
+    for _ in range(60):
+        moves = []
+        gen_legal_moves(b, color, moves)
+        if not moves:
+            break
+        b.make_move(rng.choice(moves))
+        color = "b" if color == "r" else "r"
+        assert evaluate_board(b, "r") == evaluate_board_full(b, "r")
+        assert evaluate_board(b, "b") == evaluate_board_full(b, "b")
+    while b.undo_stack:
+        b.unmake_move()
+    assert evaluate_board(b, "r") == evaluate_board_full(b, "r") == 0
+
+def test_quiescence_takes_hanging_piece():
+    b = board_with((9, 3, "rK"), (0, 5, "bK"), (5, 4, "rR"), (4, 4, "bC"))
+    stand_pat = evaluate_board(b, "r")
+    assert quiescence(b, "r", -INF, INF) > stand_pat + 300
+
+def test_quiescence_skips_losing_capture():
+    # xe ăn pháo được xe đen bảo vệ: đứng yên tốt hơn
+    b = board_with((9, 3, "rK"), (0, 5, "bK"), (5, 4, "rR"), (4, 4, "bC"), (0, 4, "bR"))
+    state = SearchState()
+    assert quiescence(b, "r", -INF, INF, state=state) == evaluate_board(b, "r")
+    assert state.stats["q_see_pruned"] == 1
+
+def test_quiescence_detects_mate_when_in_check():
+    b = board_with((9, 4, "rK"), (0, 3, "bK"), (9, 0, "bR"), (8, 0, "bR"))
+    assert quiescence(b, "r", -INF, INF) == -MATE_SCORE
+
+def test_quiescence_delta_pruning():
+    # ăn tốt không thể kéo điểm lên tới alpha -> bỏ qua, không đi thử
+    b = board_with((9, 3, "rK"), (0, 5, "bK"), (5, 4, "rR"), (4, 4, "bP"))
+    state = SearchState()
+    alpha = evaluate_board(b, "r") + 500
+    quiescence(b, "r", alpha, alpha + 1, state=state)
+    assert state.stats["q_delta_pruned"] == 1
+    assert state.stats["qnodes"] == 1
@@ -0,0 +1,121 @@
+from engine.board import Board
+from engine.rules.movegen import gen_legal_moves
+from engine.ai.evaluator import evaluate_board
+from engine.ai.search import (
+    SearchState, SearchOptions, has_null_move_material, negamax, search_root, aspiration_search, find_best_move, INF,
+)
+from engine.ai.evaluator import mate_in, mated_in
+from engine.ai.transposition import TranspositionTable
+from engine.ai.time_search import iterative_deepening
+
+def _plain_negamax(board, color, depth):
+    """Negamax không cắt tỉa, để đối chiếu."""
+    if depth == 0:
+        return evaluate_board(board, color)
+    moves = []
+    gen_legal_moves(board, color, moves)
+    if not moves:
+        return None
+    them = "b" if color == "r" else "r"
+    best = -INF
+    for m in moves:
+        board.make_move(m)
+        score = _plain_negamax(board, them, depth - 1)
+        board.unmake_move()
+        best = max(best, -score)
+    return best
+
+def _position():
+    b = Board()
+    b.setup_initial()
+    b.apply_move((7, 1), (7, 4))
+    b.apply_move((0, 1), (2, 2))
+    return b
+
+EXACT = SearchOptions(
+    null_move=False, lmr=False, quiescence=False, futility=False, reverse_futility=False, razoring=False,
+)
+
+def test_pvs_matches_plain_negamax():
+    b = _position()
+    for depth in (1, 2, 3):
+        expected = _plain_negamax(b, "r", depth)
+        assert negamax(b, "r", depth, -INF, INF, state=SearchState(options=EXACT)) == expected
+        assert negamax(b, "r", depth, -INF, INF, state=SearchState(tt=TranspositionTable(1), options=EXACT)) == expected
+
+def test_aspiration_window_gives_full_window_score():
+    b = _position()
+    full, _ = search_root(b, "r", 3, state=SearchState(options=EXACT))
+    state = SearchState(tt=TranspositionTable(1), options=EXACT)
+    for guess in (full, full + 500, full - 500):
+        assert aspiration_search(b, "r", 3, guess, state)[0] == full
+
+def test_finds_mate_in_one():
+    b = Board()
+    b.board = [["."] * 9 for _ in range(10)]
+    b.set(0, 4, "bK")
+    b.set(9, 3, "rK")
+    b.set(2, 0, "rR")
+    b.set(1, 8, "rR")
+    assert find_best_move(b, "r", 2) == ((2, 0), (0, 0))
+    score, _ = search_root(b, "r", 2)
+    assert score == mate_in(1)
+
+def test_prefers_the_shortest_mate():
+    b = Board()
+    b.board = [["."] * 9 for _ in range(10)]
+    b.set(0, 4, "bK")
+    b.set(9, 3, "rK")
+    b.set(2, 0, "rR")
+    b.set(1, 8, "rR")
+    # sâu hơn thì có thêm nhiều đường chiếu hết dài hơn, vẫn phải chọn chiếu hết ngay
+    result = iterative_deepening(b, "r", 5)
+    assert result.best_move == ((2, 0), (0, 0))
+    assert result.score == mate_in(1)
+    # bên bị chiếu hết ở ply 1 nhận điểm mated_in(1)
+    b.apply_move((2, 0), (0, 0))
+    assert negamax(b, "b", 2, -INF, INF, ply=1) == mated_in(1) == -mate_in(1)
+
+def test_iterative_deepening_carries_pv_and_node_counts():
+    b = _position()
+    result = iterative_deepening(b, "r", 3)
+    assert result.depth == 3
+    assert result.best_move == find_best_move(b, "r", 3)
+    assert result.pv[0] == result.move and len(result.pv) >= 2
+    assert result.root_moves[0].move == result.move
+    assert sum(rm.nodes for rm in result.root_moves) <= result.nodes
+
+def test_iterative_deepening_returns_a_move_when_out_of_time():
+    b = _position()
+    result = iterative_deepening(b, "r", 6, deadline=0.0)
+    assert result.depth == 0 and result.move is not None
+
+def test_null_move_and_lmr_are_switchable():
+    b = _position()
+    off = iterative_deepening(b, "r", 4, options=EXACT)
+    on = iterative_deepening(b, "r", 4, options=SearchOptions())
+    assert off.stats["null_move_tries"] == 0 and off.stats["lmr_reductions"] == 0
+    assert on.stats["lmr_reductions"] > 0
+    assert on.nodes < off.nodes
+
+def test_frontier_pruning_is_switchable():
+    b = _position()
+    frontier_off = SearchOptions(futility=False, reverse_futility=False, razoring=False)
+    off = iterative_deepening(b, "r", 4, options=frontier_off)
+    on = iterative_deepening(b, "r", 4, options=SearchOptions())
+    for key in ("futility_pruned", "reverse_futility_cutoffs", "razoring_cutoffs"):
+        assert off.stats[key] == 0
+    assert on.stats["futility_pruned"] + on.stats["reverse_futility_cutoffs"] + on.stats["razoring_cutoffs"] > 0
+    only_rfp = iterative_deepening(b, "r", 4, options=SearchOptions(futility=False, razoring=False))
+    assert only_rfp.stats["futility_pruned"] == only_rfp.stats["razoring_cutoffs"] == 0
+
+def test_null_move_needs_attacking_material():
+    b = Board()
+    b.board = [["."] * 9 for _ in range(10)]
+    b.set(9, 4, "rK")
+    b.set(0, 3, "bK")
+    b.set(6, 4, "rP")
+    b.set(9, 3, "rA")
+    assert not has_null_move_material(b, "r")
+    b.set(7, 0, "rC")
+    assert has_null_move_material(b, "r")
@@ -0,0 +1,65 @@
+from engine.move import encode_move
+from engine.utils.position import to_sq
+from engine.ai.see import see, see_ge
+from tests.test_check import board_with
+
+def _board(*pieces):
+    return board_with((9, 3, "rK"), (0, 5, "bK"), *pieces)
+
+def _capture(b, src, dst):
+    return encode_move(to_sq(*src), to_sq(*dst), b.squares[to_sq(*src)], b.squares[to_sq(*dst)])
+
+def test_see_undefended_and_defended():
+    b = _board((4, 0, "rR"), (4, 4, "bP"))
+    move = _capture(b, (4, 0), (4, 4))
+    assert see(b, move) == 100
+    b.set(0, 4, "bR")
+    assert see(b, move) == 100 - 600
+    assert not see_ge(b, move)
+
+def test_see_cannon_needs_screen():
+    # pháo đỏ (7,4) ăn lại qua màn tốt (6,4)
+    b = _board((4, 0, "rR"), (4, 4, "bP"), (0, 4, "bR"), (7, 4, "rC"), (6, 4, "rP"))
+    move = _capture(b, (4, 0), (4, 4))
+    assert see(b, move) == 100
+    b.set(6, 4, ".")
+    assert see(b, move) == 100 - 600
+
+def test_see_screen_appears_after_capture():
+    # pháo đỏ (8,4) lúc đầu có 2 quân chắn (tốt 7,4 và xe 6,4); xe đi ăn thì pháo có màn
+    b = _board((6, 4, "rR"), (4, 4, "bN"), (3, 4, "bR"), (8, 4, "rC"), (7, 4, "rP"))
+    move = _capture(b, (6, 4), (4, 4))
+    # xe ăn mã, xe đen ăn xe, pháo đỏ ăn lại xe đen
+    assert see(b, move) == 350 - 600 + 600
+
+def test_see_knight_leg_blocks_recapture():
+    b = _board((4, 0, "rR"), (4, 4, "bP"), (2, 5, "bN"))
+    move = _capture(b, (4, 0), (4, 4))
+    assert see(b, move) == 100 - 600
+    b.set(3, 5, "bP")  # chặn chân mã
+    assert see(b, move) == 100
+
+def test_see_advisor_stays_in_palace():
+    b = _board((6, 0, "bR"), (6, 4, "rP"), (7, 3, "rA"))
+    assert see(b, _capture(b, (6, 0), (6, 4))) == 100
+
+def test_see_king_only_recaptures_undefended_square():
+    b = _board((5, 3, "bR"), (8, 3, "rA"))
+    move = _capture(b, (5, 3), (8, 3))
+    assert see(b, move) == 250 - 600
+    b.set(4, 3, "bR")  # xe thứ 2 phía sau bảo vệ
+    assert see(b, move) == 250
+
+def test_see_restores_board():
+    b = _board((4, 0, "rR"), (4, 4, "bP"), (0, 4, "bR"), (7, 4, "rC"), (6, 4, "rP"))
+    before = (bytes(b.squares), b.zobrist, b.compute_zobrist())
+    see(b, _capture(b, (4, 0), (4, 4)))
+    assert (bytes(b.squares), b.zobrist, b.compute_zobrist()) == before
+
+def test_see_ge_xray_behind_mover():
+    # xe đen (8,0) nằm sau xe đỏ (5,0): xe đỏ ăn tốt thì bị ăn lại
+    b = _board((5, 0, "rR"), (3, 0, "bP"), (8, 0, "bR"))
+    move = _capture(b, (5, 0), (3, 0))
+    assert see(b, move) == 100 - 600
+    assert not see_ge(b, move, 0)
+    assert b.squares[to_sq(5, 0)] and b.squares[to_sq(3, 0)]
@@ -0,0 +1,41 @@
+import os
+
+from engine.board import Board
+from engine.rules.game_rules import generate_legal_moves
+from engine.ai import smp
+from engine.ai.smp import lazy_smp_search
+from engine.ai.time_search import iterative_deepening
+from engine.ai.transposition import TranspositionTable
+
+def _shm_entries():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+def test_lazy_smp_reuses_helpers_and_frees_shared_memory():
+    b = Board()
+    b.setup_initial()
+    before = _shm_entries()
+    result = lazy_smp_search(b, "r", 3, threads=2)
+    assert result.depth == 3
+    assert result.best_move in generate_legal_moves(b, "r")
+    processes = [p.pid for pool in smp._POOLS.values() for p in pool.processes]
+    b.apply_move((7, 1), (7, 4))
+    result = lazy_smp_search(b, "b", 3, threads=2)
+    assert result.best_move in generate_legal_moves(b, "b")
+    assert [p.pid for pool in smp._POOLS.values() for p in pool.processes] == processes
+    smp.shutdown_helpers()
+    assert _shm_entries() == before
+
+def test_lazy_smp_with_one_thread_is_plain_search():
+    b = Board()
+    b.setup_initial()
+    assert lazy_smp_search(b, "r", 3, threads=1).best_move == iterative_deepening(b, "r", 3).best_move
+
+def test_lazy_smp_reuses_callers_table():
+    b = Board()
+    b.setup_initial()
+    tt = TranspositionTable(1)
+    age = tt.age
+    lazy_smp_search(b, "r", 3, threads=2, tt=tt)
+    # kết quả trong bảng chung được chép về bảng của người gọi
+    assert tt.probe(b.zobrist) is not None
+    assert tt.age == age + 1
@@ -0,0 +1,24 @@
+from engine.utils.position import to_sq
+from engine.rules.tables import KNIGHT_MOVES, ELEPHANT_MOVES, ADVISOR_MOVES, KING_MOVES, PAWN_MOVES
+
+def test_knight_table_has_leg_squares():
+    entries = dict(KNIGHT_MOVES[to_sq(5, 4)])
+    assert len(entries) == 8
+    # (5,4) -> (3,3): chân mã ở (4,4)
+    assert entries[to_sq(3, 3)] == to_sq(4, 4)
+    # góc bàn chỉ còn 2 đích
+    assert len(KNIGHT_MOVES[to_sq(0, 0)]) == 2
+
+def test_elephant_table_stays_on_own_side():
+    red = dict(ELEPHANT_MOVES[0][to_sq(5, 2)])
+    assert to_sq(3, 0) not in red
+    assert red[to_sq(7, 4)] == to_sq(6, 3)
+
+def test_palace_tables():
+    assert set(ADVISOR_MOVES[0][to_sq(7, 3)]) == {to_sq(8, 4)}
+    assert set(KING_MOVES[1][to_sq(0, 4)]) == {to_sq(1, 4), to_sq(0, 3), to_sq(0, 5)}
+
+def test_pawn_table_sideways_after_river():
+    assert PAWN_MOVES[0][to_sq(6, 4)] == (to_sq(5, 4),)
+    assert set(PAWN_MOVES[0][to_sq(4, 4)]) == {to_sq(3, 4), to_sq(4, 3), to_sq(4, 5)}
+    assert set(PAWN_MOVES[1][to_sq(9, 0)]) == {to_sq(9, 1)}
@@ -0,0 +1,63 @@
+import time
+
+from engine.board import Board
+from engine.ai import search
+from engine.ai.search import SearchState, negamax, INF
+from engine.ai.time_manager import TimeManager, STABLE_ITERATIONS, SCORE_DROP
+from engine.ai.time_search import iterative_deepening
+from tests.test_check import board_with
+
+def test_stable_best_move_stops_before_soft_limit():
+    tm = TimeManager(1.0, 2.0)
+    tm.start = time.perf_counter() - 0.6
+    stops = [tm.iteration_done(7, 30) for _ in range(STABLE_ITERATIONS + 1)]
+    assert stops == [False] * STABLE_ITERATIONS + [True]
+
+def test_score_drop_extends_soft_limit():
+    tm = TimeManager(1.0, 1.5)
+    assert not tm.iteration_done(7, 100)
+    tm.start = time.perf_counter() - 1.2
+    assert not tm.iteration_done(8, 100 - SCORE_DROP)
+    assert tm.soft_limit == 1.5
+    tm.start = time.perf_counter() - 1.6
+    assert tm.iteration_done(8, 100 - SCORE_DROP)
+
+def test_phase_limits():
+    b = Board()
+    b.setup_initial()
+    tm = TimeManager.for_board(b)
+    assert (tm.soft_limit, tm.hard_limit) == (2.0, 5.0)
+    tm = TimeManager.for_board(board_with((9, 4, "rK"), (0, 4, "bK")))
+    assert (tm.soft_limit, tm.hard_limit) == (0.6, 1.5)
+
+def test_clock_checked_every_n_nodes(monkeypatch):
+    calls = []
+    real = time.perf_counter
+
+    class Clock:
+        @staticmethod
+        def perf_counter():
+            calls.append(1)
+            return real()
+
+    monkeypatch.setattr(search, "time", Clock)
+    b = Board()
+    b.setup_initial()
+    state = SearchState(deadline=real() + 60, check_every=256)
+    negamax(b, "r", 3, -INF, INF, state=state)
+    assert state.nodes > 256
+    assert len(calls) == state.nodes // 256 + 1
+
+def test_expired_deadline_stops_at_first_check():
+    b = Board()
+    b.setup_initial()
+    tm = TimeManager(0.0, 0.0)
+    result = iterative_deepening(b, "r", 4, time_manager=tm)
+    assert result.depth == 0 and result.move is not None
+
+def test_single_legal_move_stops_after_first_depth():
+    # tướng bị xe chiếu, chỉ còn 1 ô tránh
+    b = board_with((9, 4, "rK"), (0, 3, "bK"), (9, 0, "bR"))
+    result = iterative_deepening(b, "r", 5, time_manager=TimeManager(60.0))
+    assert len(result.root_moves) == 1
+    assert result.depth == 1
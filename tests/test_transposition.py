@@ -0,0 +1,62 @@
+from engine.board import Board
+from engine.ai.search import find_best_move
+from engine.ai.evaluator import MATE_SCORE
+from engine.ai.transposition import (
+    TranspositionTable, ENTRY_BYTES, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, score_to_tt, score_from_tt,
+)
+
+def test_store_and_probe():
+    tt = TranspositionTable(size_mb=0.01)
+    assert tt.probe(12345) is None
+    tt.store(12345, 3, BOUND_LOWER, 250, 777)
+    assert tt.probe(12345) == (3, BOUND_LOWER, 250, 777)
+    assert tt.best_move(12345) == 777
+
+    tt.store(12345, 4, BOUND_EXACT, -MATE_SCORE, 0)  # không có move -> giữ move cũ
+    assert tt.probe(12345) == (4, BOUND_EXACT, -MATE_SCORE, 777)
+
+def test_memory_is_bounded():
+    tt = TranspositionTable(size_mb=0.01)
+    assert tt.size * ENTRY_BYTES <= 0.01 * 1024 * 1024
+    for key in range(1, 10000):
+        tt.store(key * 0x9E3779B97F4A7C15 & (2**64 - 1), 1, BOUND_UPPER, key, 0)
+    assert len(tt.buffer) == tt.size * ENTRY_BYTES
+
+def test_replacement_prefers_deep_and_current_entries():
+    tt = TranspositionTable(size_mb=0.01)
+    base = 5
+    a, b, c = base, base + (tt.mask + 1), base + 2 * (tt.mask + 1)  # cùng bucket
+    tt.store(a, 6, BOUND_EXACT, 1, 0)
+    tt.store(b, 2, BOUND_EXACT, 2, 0)
+    tt.store(c, 4, BOUND_EXACT, 3, 0)  # thay b (nông hơn)
+    assert tt.probe(a) is not None and tt.probe(b) is None and tt.probe(c) is not None
+
+    tt.new_search()
+    tt.store(b, 1, BOUND_EXACT, 2, 0)  # entry lượt cũ bị thay trước dù sâu hơn
+    assert tt.probe(b) is not None
+    assert (tt.probe(a) is None) != (tt.probe(c) is None)
+
+def test_search_with_shared_table_matches_fresh_search():
+    b = Board()
+    b.setup_initial()
+    b.apply_move((7, 1), (7, 4))
+    tt = TranspositionTable(size_mb=1)
+    for depth in (1, 2, 3):
+        assert find_best_move(b, "b", depth, tt=tt) == find_best_move(b, "b", depth)
+    assert tt.best_move(b.zobrist)
+
+def test_mate_scores_are_stored_relative_to_the_node():
+    # chiếu hết ở ply 7 (từ gốc), thế cờ lưu ở ply 3 -> còn 4 ply
+    stored = score_to_tt(MATE_SCORE - 7, 3)
+    assert stored == MATE_SCORE - 4
+    # gặp lại cùng thế cờ ở ply 5 -> chiếu hết ở ply 9
+    assert score_from_tt(stored, 5) == MATE_SCORE - 9
+    assert score_from_tt(score_to_tt(-(MATE_SCORE - 6), 2), 4) == -(MATE_SCORE - 8)
+    assert score_to_tt(1234, 3) == score_from_tt(1234, 3) == 1234
+
+def test_torn_entry_is_ignored():
+    tt = TranspositionTable(size_mb=0.01)
+    tt.store(4242, 5, BOUND_EXACT, 77, 99)
+    slot = next(j for j in range(tt.size) if tt.data[j])
+    tt.scores[slot] = 78  # như thể process khác đang ghi dở ô này
+    assert tt.probe(4242) is None
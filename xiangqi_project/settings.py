@@ -124,3 +124,16 @@ STATICFILES_DIRS = [BASE_DIR / 'static'] if (BASE_DIR / 'static').exists() else
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Engine
+# Backend sinh nước của engine: "mailbox" (mặc định), "bitboard" hoặc "reference"
+XIANGQI_MOVEGEN_BACKEND = 'mailbox'
+# Số process tìm kiếm của AI (Lazy SMP ở mức normal, chia nước gốc ở easy/hard); 1 = không song song
+XIANGQI_SEARCH_THREADS = 1
+# Suy nghĩ tiếp trong giờ của người chơi (mức normal), đoán đúng nước thì AI trả lời gần như ngay.
+# Tắt mặc định: ponder chạy bằng 1 thread trong process web, tranh GIL với request
+XIANGQI_PONDER = False
+# Thời gian tối đa (giây) của 1 lần ponder, trước khi người chơi đi
+XIANGQI_PONDER_TIME_SEC = 5.0
+# Bảng chuyển vị (MB) của mỗi game đang chơi, tạo ở lần AI tìm nước đầu tiên
+XIANGQI_SESSION_TT_MB = 4